@@ -30,7 +30,9 @@ def process_symbol(item, days_back):
     return f"Filter3 Finished {symbol} ({len(data)} rows)"
 
 
-def update_missing_data(items, days_back):
+def update_missing_data(items, days_back, on_symbol_done=None):
+    # on_symbol_done(symbol, done, total) is called from this thread
+    # after each symbol finished, e.g. to invalidate caches.
     print("Filter 3: Parallel downloading\n")
 
     MAX_WORKERS = 80  
@@ -40,7 +42,16 @@ def update_missing_data(items, days_back):
             for item in items
         }
 
-        for future in as_completed(tasks):
-            print(future.result())
+        total = len(tasks)
+        try:
+            for done, future in enumerate(as_completed(tasks), start=1):
+                print(future.result())
+
+                if on_symbol_done is not None:
+                    on_symbol_done(tasks[future], done, total)
+        except BaseException:
+            # e.g. the callback stopping the run: drop the downloads not started yet
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
 
     print("Filter 3 finished")
@@ -2,9 +2,9 @@ from app.filters.filter1_symbols import get_symbols
 from app.filters.filter2_lastdate import check_last_dates
 from app.filters.filter3_download import update_missing_data
 
-def run_pipe_binance(coin_limit, days_back):
+def run_pipe_binance(coin_limit, days_back, on_symbol_done=None):
 
     symbols = get_symbols(limit=coin_limit)
     dated = check_last_dates(symbols)
-    update_missing_data(dated, days_back=days_back)
+    update_missing_data(dated, days_back=days_back, on_symbol_done=on_symbol_done)
 
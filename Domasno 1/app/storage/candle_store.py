@@ -0,0 +1,202 @@
+# Memory-mapped candle files, one per (symbol, interval):
+#
+#   <CANDLE_STORE_DIR>/<interval>/<SYMBOL>.candles
+#
+# Layout (little-endian):
+#   header, 64 bytes: magic b"OHLC", version u2, column count u2,
+#                     reserved u4, row count i8, capacity i8, padding
+#   then one contiguous block of `capacity` values per column, in COLUMNS
+#   order: date as int64 nanoseconds since the epoch, the rest float64.
+#
+# Rows are only ever appended (dates strictly increasing). New values are
+# written past the row count first and the count is updated last, so a
+# reader that reads the count and then slices the columns never sees a
+# half-written row. When the capacity runs out the file is rewritten to a
+# new one twice the size and swapped in with os.replace; readers notice
+# the new inode and re-map. One writer per file (the pipe downloads each
+# symbol on one thread).
+#
+# This module is the only writer. Reading (memory-mapped, zero-copy views)
+# is signal_service/app/candle_store.py, which the signals service and the
+# web app use; keep the two in sync.
+
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"OHLC"
+VERSION = 1
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+DTYPES = (np.int64,) + (np.float64,) * 5
+
+HEADER = struct.Struct("<4sHHIqq")
+HEADER_SIZE = 64
+COUNT_OFFSET = 12
+
+MIN_CAPACITY = 1024
+
+
+def store_dir():
+    # None -> the store is disabled
+    return os.getenv("CANDLE_STORE_DIR") or None
+
+
+def candle_path(root, symbol, interval="daily"):
+    return os.path.join(root, interval, f"{symbol}.candles")
+
+
+def _read_header(buf):
+    magic, version, ncols, _, count, capacity = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or ncols != len(COLUMNS):
+        raise ValueError("Not a candle file (or an unsupported version)")
+    return count, capacity
+
+
+def _column_offset(i, capacity):
+    return HEADER_SIZE + i * capacity * 8
+
+
+def _last_date(data, count, capacity):
+    # Newest stored date as int64 nanoseconds (the file has count > 0 rows)
+    return data[_column_offset(0, capacity):_column_offset(1, capacity)].view(np.int64)[count - 1]
+
+
+def _create(path, capacity, columns=None):
+    # New file holding `columns` (arrays of equal length, or nothing),
+    # written to a temporary name and swapped in.
+    count = len(columns["date"]) if columns else 0
+    tmp = f"{path}.tmp{os.getpid()}"
+
+    with open(tmp, "wb") as f:
+        f.truncate(_column_offset(len(COLUMNS), capacity))
+        f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), 0, count, capacity))
+        if count:
+            for i, (name, dtype) in enumerate(zip(COLUMNS, DTYPES)):
+                f.seek(_column_offset(i, capacity))
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
+
+
+class CandleStore:
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, symbol, interval="daily"):
+        return candle_path(self.root, symbol, interval)
+
+    def last_date(self, symbol, interval="daily"):
+        # Date of the newest stored candle, or None (no file / no candles)
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+
+        data = np.memmap(path, mode="r")
+        count, capacity = _read_header(data)
+        if not count:
+            return None
+        return np.datetime64(int(_last_date(data, count, capacity)), "ns").astype("datetime64[D]").item()
+
+    def append(self, symbol, rows, interval="daily"):
+        # Append (date, open, high, low, close, volume) rows; rows not newer
+        # than the last stored candle are skipped. Returns rows appended.
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        new = {name: [] for name in COLUMNS}
+        for row in sorted(rows, key=lambda r: r[0]):
+            for name, value in zip(COLUMNS, row):
+                new[name].append(value)
+
+        new["date"] = np.array(new["date"], dtype="datetime64[D]").astype("datetime64[ns]").view(np.int64)
+        for name in COLUMNS[1:]:
+            new[name] = np.array(new[name], dtype=np.float64)
+
+        if not os.path.exists(path):
+            _create(path, MIN_CAPACITY)
+
+        data = np.memmap(path, mode="r+")
+        count, capacity = _read_header(data)
+
+        if count:
+            keep = new["date"] > _last_date(data, count, capacity)
+            new = {name: values[keep] for name, values in new.items()}
+        # Strictly increasing dates only
+        if len(new["date"]) > 1:
+            keep = np.concatenate([[True], np.diff(new["date"]) > 0])
+            new = {name: values[keep] for name, values in new.items()}
+
+        added = len(new["date"])
+        if not added:
+            return 0
+
+        if count + added > capacity:
+            old = {
+                name: data[_column_offset(i, capacity):_column_offset(i, capacity) + count * 8].view(dtype)
+                for i, (name, dtype) in enumerate(zip(COLUMNS, DTYPES))
+            }
+            columns = {name: np.concatenate([old[name], new[name]]) for name in COLUMNS}
+            del data, old
+            _create(path, max(capacity * 2, count + added), columns)
+            return added
+
+        for i, (name, dtype) in enumerate(zip(COLUMNS, DTYPES)):
+            start = _column_offset(i, capacity) + count * 8
+            data[start:start + added * 8] = new[name].astype(dtype).view(np.uint8)
+        data.flush()
+
+        # Publish the rows
+        data[COUNT_OFFSET:COUNT_OFFSET + 8] = np.array([count + added], dtype=np.int64).view(np.uint8)
+        data.flush()
+        return added
+
+
+_SYNC_QUERY = """
+    SELECT date, open, high, low, close, volume
+    FROM ohlcv
+    WHERE symbol = %s AND (%s::date IS NULL OR date > %s::date)
+    ORDER BY date;
+"""
+
+
+def sync_symbol(cur, symbol, root=None):
+    # Append the daily candles of `symbol` newer than its file (all of
+    # them if there is no file yet) from the ohlcv table.
+    root = root or store_dir()
+    if root is None:
+        return 0
+
+    store = CandleStore(root)
+    last = store.last_date(symbol)
+    cur.execute(_SYNC_QUERY, (symbol, last, last))
+    rows = [
+        (r[0], float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5] or 0))
+        for r in cur.fetchall()
+    ]
+    return store.append(symbol, rows)
+
+
+def sync_all(root=None):
+    # Bring every symbol's file up to date with the ohlcv table.
+    from app.storage.db import get_connection
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT DISTINCT symbol FROM ohlcv;")
+        symbols = [row[0] for row in cur.fetchall()]
+        for symbol in symbols:
+            added = sync_symbol(cur, symbol, root)
+            print(f"Candle store: {symbol} +{added}")
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    if store_dir() is None:
+        raise SystemExit("Set CANDLE_STORE_DIR")
+    sync_all()
@@ -1,7 +1,11 @@
 import psycopg2
+import psycopg2.extras
 import os
 from dotenv import load_dotenv
 
+from app.storage.candle_store import store_dir, sync_symbol
+from app.storage.rollups import refresh_rollups
+
 load_dotenv()
 
 def get_connection():
@@ -19,8 +23,9 @@ def save_ohlcv(symbol, records):
 
     query = """
         INSERT INTO ohlcv (date, symbol, open, high, low, close, volume)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT DO NOTHING;
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING date;
     """
 
     batch = [
@@ -29,13 +34,33 @@ def save_ohlcv(symbol, records):
     ]
 
     try:
-        cur.executemany(query, batch)
-        conn.commit()
-        print(f"Inserted {len(batch)} rows for {symbol}")
+        try:
+            inserted = psycopg2.extras.execute_values(cur, query, batch, page_size=1000, fetch=True)
+            conn.commit()
+            print(f"Inserted {len(inserted)} rows for {symbol}")
+        except Exception as e:
+            conn.rollback()
+            print("DB error:", e)
+            return
+
+        # Own transaction, so the daily candles are kept even if the rollup
+        # tables (created by the Django migrations) are missing. Only rollup
+        # buckets from the first new candle onwards can change.
+        if inserted:
+            try:
+                refresh_rollups(cur, symbol=symbol, since=min(row[0] for row in inserted))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Rollup refresh failed for {symbol} (repair with manage.py rebuild_rollups):", e)
 
-    except Exception as e:
-        conn.rollback()
-        print("DB error:", e)
+        # Memory-mapped copy for the signals service and the web app
+        if inserted and store_dir() is not None:
+            try:
+                sync_symbol(cur, symbol)
+            except Exception as e:
+                conn.rollback()
+                print(f"Candle store sync failed for {symbol} (repair with python -m app.storage.candle_store):", e)
 
     finally:
         cur.close()
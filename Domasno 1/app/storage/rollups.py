@@ -0,0 +1,44 @@
+# Weekly / monthly OHLCV rollups (tables ohlcv_weekly, ohlcv_monthly).
+#
+# Buckets are labelled like pandas' resample rules used by the web app:
+#   weekly  -> "W"  (weeks end on Sunday, labelled with the Sunday)
+#   monthly -> "ME" (labelled with the last day of the month)
+#
+# Only buckets touching `since` or later are recomputed, so a daily sync
+# rewrites just the current week and month.
+
+ROLLUPS = {
+    "ohlcv_weekly": ("week", "interval '6 days'"),
+    "ohlcv_monthly": ("month", "interval '1 month - 1 day'"),
+}
+
+_QUERY = """
+    INSERT INTO {table} (symbol, date, open, high, low, close, volume)
+    SELECT
+        symbol,
+        (date_trunc('{unit}', date::timestamp) + {offset})::date AS bucket,
+        (array_agg(open ORDER BY date))[1],
+        max(high),
+        min(low),
+        (array_agg(close ORDER BY date DESC))[1],
+        sum(volume)
+    FROM ohlcv
+    WHERE (%(symbol)s::text IS NULL OR symbol = %(symbol)s::text)
+      AND (%(since)s::date IS NULL OR date >= date_trunc('{unit}', %(since)s::date::timestamp))
+    GROUP BY symbol, bucket
+    ON CONFLICT (symbol, date) DO UPDATE SET
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume;
+"""
+
+
+def refresh_rollups(cur, symbol=None, since=None):
+    # Recompute rollup buckets from the daily ohlcv table.
+    # symbol=None -> all symbols, since=None -> full history.
+    params = {"symbol": symbol, "since": since}
+
+    for table, (unit, offset) in ROLLUPS.items():
+        cur.execute(_QUERY.format(table=table, unit=unit, offset=offset), params)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from app.storage.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly/monthly OHLCV rollup tables from the daily ohlcv table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbol", help="Only rebuild this symbol.")
+        parser.add_argument("--since", help="Only rebuild buckets from this date (YYYY-MM-DD) on.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cur:
+            refresh_rollups(cur, symbol=options["symbol"], since=options["since"])
+
+        self.stdout.write(self.style.SUCCESS("Rollups rebuilt."))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.pipeline_jobs import claim_next_job, expire_stale_jobs, run_job
+from core.utils.signal_cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = "Run queued pipeline jobs (submitted from the Fetch Data page) in the background."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run at most one job and exit.")
+        parser.add_argument("--poll", type=float, default=5.0, help="Seconds between queue polls.")
+
+    def handle(self, *args, **options):
+        try:
+            require_shared_cache()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        self.stdout.write("Pipeline worker started.")
+
+        while True:
+            expire_stale_jobs()
+            job = claim_next_job()
+
+            if job is not None:
+                self.stdout.write(f"Running pipeline job {job.pk}")
+                run_job(job)
+                job.refresh_from_db()
+                self.stdout.write(f"Pipeline job {job.pk} finished: {job.state}")
+
+            if options["once"]:
+                return
+
+            if job is None:
+                time.sleep(options["poll"])
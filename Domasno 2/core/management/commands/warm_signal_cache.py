@@ -0,0 +1,50 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core.constants import ALLOWED_TIMEFRAMES
+from core.models import MarketSnapshot
+from core.views import aget_symbol_context
+
+
+class Command(BaseCommand):
+    help = "Pre-populate the symbol_detail signal cache for the top symbols by 24h quote volume."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Number of symbols to warm.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Symbols warmed in parallel.")
+        parser.add_argument(
+            "--timeframe",
+            action="append",
+            choices=sorted(ALLOWED_TIMEFRAMES),
+            help="Timeframe to warm (repeatable). Defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        timeframes = options["timeframe"] or ["daily", "weekly", "monthly"]
+
+        symbols = list(
+            MarketSnapshot.objects
+            .annotate(quote_volume=F("price") * F("volume_24h"))
+            .order_by("-quote_volume")
+            .values_list("symbol", flat=True)[:options["limit"]]
+        )
+
+        jobs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        warmed = async_to_sync(self._warm)(jobs, options["concurrency"])
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} cache entries."))
+
+    async def _warm(self, jobs, concurrency):
+        # One event loop for the whole run, so the signals client keeps
+        # its connections alive across symbols
+        sem = asyncio.Semaphore(concurrency)
+
+        async def warm_one(symbol, timeframe):
+            async with sem:
+                await aget_symbol_context(symbol, timeframe)
+
+        await asyncio.gather(*(warm_one(s, tf) for s, tf in jobs))
+        return len(jobs)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:22
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def fill_combined_signal(apps, schema_editor):
+    from core.utils.signals import majority_vote_3
+
+    MarketSnapshot = apps.get_model("core", "MarketSnapshot")
+    rows = list(MarketSnapshot.objects.all())
+    for r in rows:
+        r.combined_signal = majority_vote_3(r.daily_signal, r.weekly_signal, r.monthly_signal)
+    MarketSnapshot.objects.bulk_update(rows, ["combined_signal"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_marketsnapshot_price_marketsnapshot_volume_24h'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='marketsnapshot',
+            name='combined_signal',
+            field=models.CharField(default='N/A', max_length=10),
+        ),
+        migrations.RunPython(fill_combined_signal, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='marketsnapshot',
+            index=models.Index(fields=['combined_signal', 'symbol'], name='snapshot_signal_symbol_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketsnapshot',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['symbol'], name='snapshot_symbol_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
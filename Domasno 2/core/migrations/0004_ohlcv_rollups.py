@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_marketsnapshot_combined_signal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CryptoOHLCVMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('symbol', models.TextField()),
+                ('open', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('high', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('low', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('close', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('volume', models.DecimalField(decimal_places=8, max_digits=30)),
+            ],
+            options={
+                'db_table': 'ohlcv_monthly',
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'date'), name='ohlcv_monthly_symbol_date_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CryptoOHLCVWeekly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('symbol', models.TextField()),
+                ('open', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('high', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('low', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('close', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('volume', models.DecimalField(decimal_places=8, max_digits=30)),
+            ],
+            options={
+                'db_table': 'ohlcv_weekly',
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'date'), name='ohlcv_weekly_symbol_date_uniq')],
+            },
+        ),
+    ]
@@ -1,5 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from core.constants import SIGNAL_NA
+from core.utils.signals import majority_vote_3
+
+
 class CryptoOHLCV(models.Model):
     date = models.DateField()
     symbol = models.TextField()
@@ -13,6 +18,37 @@ class CryptoOHLCV(models.Model):
         db_table = "ohlcv"
         managed = False
 
+class OHLCVRollup(models.Model):
+    """
+    Pre-aggregated candles for a higher timeframe. Maintained by the
+    ingestion pipe (see app.storage.rollups); `date` is the bucket label,
+    matching pandas' "W" / "ME" resample rules.
+    """
+    date = models.DateField()
+    symbol = models.TextField()
+    open = models.DecimalField(max_digits=20, decimal_places=8)
+    high = models.DecimalField(max_digits=20, decimal_places=8)
+    low = models.DecimalField(max_digits=20, decimal_places=8)
+    close = models.DecimalField(max_digits=20, decimal_places=8)
+    volume = models.DecimalField(max_digits=30, decimal_places=8)
+
+    class Meta:
+        abstract = True
+
+class CryptoOHLCVWeekly(OHLCVRollup):
+    class Meta:
+        db_table = "ohlcv_weekly"
+        constraints = [
+            models.UniqueConstraint(fields=["symbol", "date"], name="ohlcv_weekly_symbol_date_uniq"),
+        ]
+
+class CryptoOHLCVMonthly(OHLCVRollup):
+    class Meta:
+        db_table = "ohlcv_monthly"
+        constraints = [
+            models.UniqueConstraint(fields=["symbol", "date"], name="ohlcv_monthly_symbol_date_uniq"),
+        ]
+
 class MarketSnapshot(models.Model):
     symbol = models.CharField(max_length=20, unique=True)
 
@@ -23,5 +59,85 @@ class MarketSnapshot(models.Model):
     weekly_signal = models.CharField(max_length=10)
     monthly_signal = models.CharField(max_length=10)
 
+    # Majority vote of the three above, kept in sync on every save so the
+    # analyze page can filter on it in SQL.
+    combined_signal = models.CharField(max_length=10, default=SIGNAL_NA)
+
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["combined_signal", "symbol"], name="snapshot_signal_symbol_idx"),
+            GinIndex(fields=["symbol"], opclasses=["gin_trgm_ops"], name="snapshot_symbol_trgm_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.combined_signal = majority_vote_3(
+            self.daily_signal, self.weekly_signal, self.monthly_signal
+        )
+        super().save(*args, **kwargs)
+
+
+class PipelineJob(models.Model):
+    """
+    One run of the ingestion pipeline + snapshot rebuild, executed by the
+    run_pipeline_worker command. At most one job per kind can be queued or
+    running at a time (enforced by the database).
+    """
+    STATE_QUEUED = "queued"
+    STATE_RUNNING = "running"
+    STATE_DONE = "done"
+    STATE_FAILED = "failed"
+
+    STATE_CHOICES = [
+        (STATE_QUEUED, "Queued"),
+        (STATE_RUNNING, "Running"),
+        (STATE_DONE, "Done"),
+        (STATE_FAILED, "Failed"),
+    ]
+    ACTIVE_STATES = (STATE_QUEUED, STATE_RUNNING)
+
+    STAGE_DOWNLOAD = "download"
+    STAGE_SNAPSHOTS = "snapshots"
+
+    kind = models.CharField(max_length=20, default="binance")
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=STATE_QUEUED)
+
+    stage = models.CharField(max_length=20, blank=True)
+    stage_done = models.IntegerField(default=0)
+    stage_total = models.IntegerField(default=0)
+
+    symbols_downloaded = models.IntegerField(default=0)
+    snapshots_created = models.IntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind"],
+                condition=models.Q(state__in=["queued", "running"]),
+                name="one_active_pipeline_job",
+            ),
+        ]
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "state": self.state,
+            "stage": self.stage,
+            "stage_done": self.stage_done,
+            "stage_total": self.stage_total,
+            "symbols_downloaded": self.symbols_downloaded,
+            "snapshots_created": self.snapshots_created,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -5,8 +5,12 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("analyze/", views.analyze, name="analyze"),
     path("run-pipeline/", views.run_pipeline, name="run_pipeline"),
+    path("run-pipeline/status/", views.pipeline_status, name="pipeline_status_latest"),
+    path("run-pipeline/status/<int:job_id>/", views.pipeline_status, name="pipeline_status"),
     path("data/", views.data_overview, name="data_overview"),
     path("data/<str:symbol>/", views.symbol_detail, name="symbol_detail"),
+    path("api/ohlcv/<str:symbol>/", views.ohlcv_api, name="ohlcv_api"),
+    path("api/signals/nodes/", views.signals_nodes, name="signals_nodes"),
     path("learn/", views.learn, name="learn"),
     path("about/", views.about, name="about"),
     path("contact/", views.contact, name="contact"),
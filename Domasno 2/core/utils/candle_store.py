@@ -0,0 +1,35 @@
+from typing import Optional
+
+import pandas as pd
+from django.conf import settings
+
+from signal_service.app.candle_store import CandleStore
+
+_stores = {}
+
+
+def stored_daily(symbol: str, last: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    Daily candles of `symbol` from the pipe's memory-mapped files, oldest
+    first, in queryset_to_df's shape; the `last` most recent only if given.
+    None when settings.CANDLE_STORE_DIR is not set or the symbol has no
+    file yet (load from the ohlcv table then).
+    """
+    root = settings.CANDLE_STORE_DIR
+    if not root:
+        return None
+
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = CandleStore(root)
+
+    columns = store.read(symbol)
+    if columns is None:
+        return None
+
+    if last is not None:
+        columns = {name: values[-last:] for name, values in columns.items()}
+
+    df = pd.DataFrame(columns)
+    df.insert(1, "symbol", symbol)
+    return df
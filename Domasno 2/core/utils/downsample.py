@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+def bucket_ohlcv(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Downsample candles to at most `max_points` rows with min/max bucket
+    aggregation: consecutive candles are merged into one
+    (open=first, high=max, low=min, close=last, volume=sum), so highs and
+    lows survive no matter how far the series is reduced.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+
+    # Start index of every bucket, as evenly sized as possible
+    starts = np.linspace(0, n, num=max_points, endpoint=False).astype(np.int64)
+
+    out = {
+        "date": df["date"].to_numpy()[starts],
+        "open": df["open"].to_numpy(dtype=float)[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts),
+        "close": df["close"].to_numpy(dtype=float)[np.append(starts[1:], n) - 1],
+    }
+    if "volume" in df.columns:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(dtype=float), starts)
+
+    return pd.DataFrame(out)
@@ -0,0 +1,143 @@
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from core.models import PipelineJob
+from core.utils import signal_cache
+from core.utils.snapshot_builder import rebuild_market_snapshots
+
+from app.pipes.pipe_binance import run_pipe_binance
+
+COIN_LIMIT = 1000
+DAYS_BACK = 3650
+
+# A running job that has not reported progress for this long is assumed
+# dead (worker killed / machine restarted) and no longer blocks new runs.
+STALE_AFTER = timedelta(minutes=15)
+
+# How often a running job's heartbeat is refreshed, independent of progress
+# (listing symbols or one snapshot batch can take longer than STALE_AFTER).
+HEARTBEAT_INTERVAL = 60.0
+
+
+class PipelineAlreadyRunning(Exception):
+    pass
+
+
+class JobExpired(Exception):
+    """The job is no longer running (expired as stale); stop working on it."""
+
+
+def expire_stale_jobs() -> int:
+    cutoff = timezone.now() - STALE_AFTER
+    return PipelineJob.objects.filter(
+        state=PipelineJob.STATE_RUNNING,
+        heartbeat_at__lt=cutoff,
+    ).update(
+        state=PipelineJob.STATE_FAILED,
+        error="Worker stopped reporting progress.",
+        finished_at=timezone.now(),
+    )
+
+
+def submit_pipeline_job() -> PipelineJob:
+    """
+    Queue a pipeline run for the worker. Raises PipelineAlreadyRunning if
+    another run is queued or in progress.
+    """
+    expire_stale_jobs()
+    try:
+        with transaction.atomic():
+            return PipelineJob.objects.create()
+    except IntegrityError:
+        raise PipelineAlreadyRunning()
+
+
+def claim_next_job():
+    """Move the oldest queued job to running and return it (or None)."""
+    with transaction.atomic():
+        job = (
+            PipelineJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(state=PipelineJob.STATE_QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        now = timezone.now()
+        job.state = PipelineJob.STATE_RUNNING
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(update_fields=["state", "started_at", "heartbeat_at"])
+        return job
+
+
+def _report(job: PipelineJob, **fields) -> None:
+    """
+    Update a running job. Raises JobExpired if it is not running any more,
+    so a job that was expired is never written to again.
+    """
+    fields["heartbeat_at"] = timezone.now()
+    updated = PipelineJob.objects.filter(pk=job.pk, state=PipelineJob.STATE_RUNNING).update(**fields)
+    if not updated:
+        raise JobExpired()
+
+
+def _heartbeat(job: PipelineJob, stop: threading.Event) -> None:
+    # Runs in its own thread (and DB connection) for the whole run
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                _report(job)
+            except JobExpired:
+                return
+    finally:
+        connection.close()
+
+
+def run_job(job: PipelineJob) -> None:
+    def on_symbol_done(symbol, done, total):
+        signal_cache.invalidate_symbol(symbol)
+        _report(job, stage_done=done, stage_total=total, symbols_downloaded=done)
+
+    def on_snapshot_progress(done, total):
+        _report(job, stage_done=done, stage_total=total)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, stop), daemon=True)
+    heartbeat.start()
+
+    try:
+        _report(job, stage=PipelineJob.STAGE_DOWNLOAD, stage_done=0, stage_total=0)
+        run_pipe_binance(COIN_LIMIT, DAYS_BACK, on_symbol_done=on_symbol_done)
+
+        _report(job, stage=PipelineJob.STAGE_SNAPSHOTS, stage_done=0, stage_total=0)
+        created = rebuild_market_snapshots(on_progress=on_snapshot_progress)
+
+        _report(
+            job,
+            state=PipelineJob.STATE_DONE,
+            snapshots_created=created,
+            finished_at=timezone.now(),
+        )
+    except JobExpired:
+        # Already marked failed by expire_stale_jobs; leave it that way
+        pass
+    except Exception:
+        try:
+            _report(
+                job,
+                state=PipelineJob.STATE_FAILED,
+                error=traceback.format_exc(),
+                finished_at=timezone.now(),
+            )
+        except JobExpired:
+            pass
+    finally:
+        stop.set()
+        heartbeat.join()
@@ -3,6 +3,9 @@ import pandas as pd
 def queryset_to_df(queryset):
     df = pd.DataFrame.from_records(queryset.values())
 
+    if df.empty:
+        return pd.DataFrame(columns=["date", "symbol", "open", "high", "low", "close", "volume"])
+
     df["date"] = pd.to_datetime(df["date"])
     df = df.sort_values("date")
 
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Max
+
+from core.constants import ALLOWED_TIMEFRAMES
+from core.models import CryptoOHLCV
+
+# Sentinel stored for symbols that have no candles, so the pointer lookup
+# is cached for them too (None means "not cached" to the cache API).
+_NO_DATA = ""
+
+
+def _latest_key(symbol: str) -> str:
+    return f"ohlcv:latest:{symbol}"
+
+
+def detail_key(symbol: str, timeframe: str, last_date) -> str:
+    return f"signals:detail:{symbol}:{timeframe}:{last_date}"
+
+
+def latest_candle_date(symbol: str):
+    """
+    Date of the newest daily candle for a symbol (as ISO string), or None.
+    Cached, so repeat lookups do not hit the ohlcv table.
+    """
+    key = _latest_key(symbol)
+    value = cache.get(key)
+
+    if value is None:
+        last = CryptoOHLCV.objects.filter(symbol=symbol).aggregate(last=Max("date"))["last"]
+        value = last.isoformat() if last else _NO_DATA
+        cache.set(key, value, settings.SIGNALS_CACHE_TIMEOUT)
+
+    return value or None
+
+
+def get_detail(symbol: str, timeframe: str, last_date):
+    return cache.get(detail_key(symbol, timeframe, last_date))
+
+
+def set_detail(symbol: str, timeframe: str, last_date, ctx: dict) -> None:
+    cache.set(detail_key(symbol, timeframe, last_date), ctx, settings.SIGNALS_CACHE_TIMEOUT)
+
+
+def invalidate_symbol(symbol: str) -> None:
+    """
+    Drop everything cached for a symbol. Called by the pipeline after new
+    candles were written for it.
+    """
+    key = _latest_key(symbol)
+    keys = [key]
+
+    last_date = cache.get(key)
+    if last_date:
+        keys += [detail_key(symbol, tf, last_date) for tf in ALLOWED_TIMEFRAMES]
+
+    cache.delete_many(keys)
+
+
+def require_shared_cache() -> None:
+    """
+    Raise ImproperlyConfigured if the cache is local to this process, so
+    invalidate_symbol() from another process (the pipeline worker) would
+    never reach the web workers and they would serve stale signals.
+    """
+    if isinstance(caches["default"], LocMemCache):
+        raise ImproperlyConfigured(
+            "The pipeline worker invalidates cached signals, which needs a cache "
+            "shared with the web processes. Set REDIS_URL (see CACHES in settings)."
+        )
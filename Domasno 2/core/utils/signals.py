@@ -0,0 +1,23 @@
+from core.constants import SIGNAL_NA, SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD
+
+
+def majority_vote_3(daily: str, weekly: str, monthly: str) -> str:
+    """
+    Combine daily/weekly/monthly signals into one by majority vote.
+    Ignores N/A values. If tie, returns HOLD.
+    """
+    vals = [daily, weekly, monthly]
+    valid = [v for v in vals if v in (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD)]
+
+    if not valid:
+        return SIGNAL_NA
+
+    b = valid.count(SIGNAL_BUY)
+    s = valid.count(SIGNAL_SELL)
+    h = valid.count(SIGNAL_HOLD)
+
+    if b > s and b > h:
+        return SIGNAL_BUY
+    if s > b and s > h:
+        return SIGNAL_SELL
+    return SIGNAL_HOLD
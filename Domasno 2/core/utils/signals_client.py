@@ -0,0 +1,488 @@
+import asyncio
+import bisect
+import hashlib
+import time
+import weakref
+from collections import deque
+
+import httpx
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from signal_service.app import wire
+
+# Most recent candles sent per request
+MAX_CANDLES = 500
+
+# Daily candles sent when the service resamples to weekly/monthly itself:
+# MAX_CANDLES whole weeks plus the (possibly partial) week in front
+TIMEFRAMES_DAILY_CANDLES = MAX_CANDLES * 7 + 7
+
+# Latencies kept per service instance for stats()
+LATENCY_WINDOW = 1000
+
+# Answers to a binary request that mean "send JSON": a service without the
+# wire format rejects the body (415, or 400/422 from its JSON parsing).
+# Any other error is a failure like for JSON requests.
+UNSUPPORTED_FORMAT_STATUSES = (400, 415, 422)
+
+# Seconds a node that needed JSON gets JSON before binary is tried again
+# (it may have been upgraded since)
+BINARY_RETRY_AFTER = 300.0
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker. After `failure_threshold`
+    consecutive failures calls are refused for `reset_timeout` seconds,
+    then a single trial call decides whether to close again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+
+        if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+            return False
+
+        # Half-open: let one request through
+        self._trial_running = True
+        return True
+
+    def release(self) -> None:
+        """Call finished without a verdict on the service's health."""
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_running = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class _UnsupportedFormat(Exception):
+    pass
+
+
+class SignalsNode:
+    """One service instance: its URLs, breaker, health and latency stats."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker, window: int = LATENCY_WINDOW):
+        self.url = url.rstrip("/")
+        self.batch_url = self.url + "/batch"
+        self.health_url = str(httpx.URL(self.url).join("/health"))
+        self.breaker = breaker
+        self.healthy = True
+        # monotonic time until which requests to this node are sent as JSON
+        self.json_until = None
+        self.requests = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.requests += 1
+        if ok:
+            self._latencies.append(seconds)
+        else:
+            self.failures += 1
+
+    def accepts_binary(self) -> bool:
+        return self.json_until is None or time.monotonic() >= self.json_until
+
+    def stats(self) -> dict:
+        latencies = np.asarray(self._latencies) * 1000
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "breaker_open": self.breaker.is_open,
+            "requests": self.requests,
+            "failures": self.failures,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+        }
+
+
+class HashRing:
+    """
+    Consistent hashing of symbols onto nodes: every node owns `replicas`
+    points on a ring, a symbol goes to the first point after its own hash.
+    Adding or removing a node only moves the symbols of that node.
+    """
+
+    def __init__(self, nodes: list, replicas: int = 100):
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node.url}#{i}"), n)
+            for n, node in enumerate(self.nodes)
+            for i in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [n for _, n in points]
+
+    def nodes_for(self, key: str) -> list:
+        """Every node, in ring order from the owner of `key`."""
+        if len(self.nodes) == 1:
+            return self.nodes
+
+        out, seen = [], set()
+        start = bisect.bisect(self._hashes, _hash(key))
+        for i in range(len(self._owners)):
+            n = self._owners[(start + i) % len(self._owners)]
+            if n not in seen:
+                seen.add(n)
+                out.append(self.nodes[n])
+                if len(out) == len(self.nodes):
+                    break
+        return out
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class SignalsClient:
+    """
+    Shared keep-alive client for the signals microservice instances.
+
+    httpx.AsyncClient is bound to the event loop it was first used on, so
+    one client is kept per running loop and closed when that loop shuts
+    down. Under ASGI that is one keep-alive client per process; under WSGI
+    (async_to_sync, a new loop per call) one per request. Failures never
+    raise: callers get None and fall back to N/A.
+
+    Requests for a symbol go to its node on the hash ring; when that node
+    is down (health check, open breaker or a failed call) the next node on
+    the ring takes it. Batches are split by node and sent concurrently.
+
+    Single snapshots are sent in the binary wire format when enabled. A
+    node that rejects the format (older service) is retried with JSON and
+    sent JSON for BINARY_RETRY_AFTER seconds.
+    """
+
+    def __init__(self, urls: list, timeout: httpx.Timeout, limits: httpx.Limits, breaker_factory, binary: bool = False,
+                 replicas: int = 100, health_interval: float = 10.0, health_timeout: float = 1.0):
+        self.nodes = [SignalsNode(url, breaker_factory()) for url in urls]
+        self.ring = HashRing(self.nodes, replicas)
+        self.timeout = timeout
+        self.limits = limits
+        self.binary = binary
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._health_checked_at = None
+        self._clients = weakref.WeakKeyDictionary()
+        # Strong references to the _close_with_loop tasks while they run
+        self._closers = set()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._clients[loop] = client
+            closer = loop.create_task(self._close_with_loop(loop, client))
+            self._closers.add(closer)
+            closer.add_done_callback(self._closers.discard)
+        return client
+
+    async def _close_with_loop(self, loop, client: httpx.AsyncClient) -> None:
+        # Waits until the loop shuts down: asyncio.run (which async_to_sync
+        # and ASGI servers use) cancels the tasks left at the end, and the
+        # client is closed while the loop still runs.
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._clients.pop(loop, None)
+            await client.aclose()
+
+    async def check_health(self) -> None:
+        """GET /health on every node, concurrently."""
+        async def check(node):
+            try:
+                resp = await self._client().get(node.health_url, timeout=self.health_timeout)
+                node.healthy = resp.status_code == 200
+            except httpx.HTTPError:
+                node.healthy = False
+
+        self._health_checked_at = time.monotonic()
+        await asyncio.gather(*(check(node) for node in self.nodes))
+
+    async def _refresh_health(self) -> None:
+        # Only worth it with somewhere to fail over to
+        if len(self.nodes) < 2:
+            return
+        if self._health_checked_at is None or time.monotonic() - self._health_checked_at >= self.health_interval:
+            await self.check_health()
+
+    def _candidates(self, key: str) -> list:
+        nodes = self.ring.nodes_for(key)
+        healthy = [node for node in nodes if node.healthy]
+        # All marked down: the health check may be stale, try them anyway
+        return healthy or nodes
+
+    async def _route(self, key: str, call):
+        """call(node) on the node of `key`, failing over along the ring."""
+        await self._refresh_health()
+        for node in self._candidates(key):
+            data = await call(node)
+            if data is not None:
+                return data
+        return None
+
+    async def post(self, node: SignalsNode, payload: dict = None, url: str = None, timeout=None, content: bytes = None, headers: dict = None):
+        if not node.breaker.allow():
+            return None
+
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        if content is not None:
+            kwargs.update(content=content, headers=headers)
+        else:
+            kwargs["json"] = payload
+
+        start = time.perf_counter()
+        try:
+            resp = await self._client().post(url or node.url, **kwargs)
+            if content is not None and resp.status_code in UNSUPPORTED_FORMAT_STATUSES:
+                # Possibly an older service that only speaks JSON; the
+                # caller retries with JSON before counting a failure.
+                node.breaker.release()
+                raise _UnsupportedFormat()
+            resp.raise_for_status()
+            data = resp.json()
+        except (httpx.HTTPError, ValueError):
+            node.breaker.record_failure()
+            node.record(time.perf_counter() - start, ok=False)
+            return None
+
+        node.breaker.record_success()
+        node.record(time.perf_counter() - start, ok=True)
+        return data
+
+    async def fetch_snapshot(self, timeframe: str, df: pd.DataFrame, symbol: str = None):
+        """
+        Signals snapshot for the candles in df, or None if unavailable.
+        Routed by `symbol` (any node if not given).
+        """
+        async def call(node):
+            rejected = False
+            if self.binary and node.accepts_binary():
+                try:
+                    return await self.post(
+                        node,
+                        content=wire.encode_frame(df.tail(MAX_CANDLES), timeframe=timeframe),
+                        headers={"Content-Type": wire.CONTENT_TYPE},
+                    )
+                except _UnsupportedFormat:
+                    rejected = True
+
+            data = await self.post(node, {"timeframe": timeframe, "candles": candles_payload(df)})
+            if rejected and data is not None:
+                # JSON works where binary did not: use JSON on this node for a while
+                node.json_until = time.monotonic() + BINARY_RETRY_AFTER
+            return data
+
+        return await self._route(symbol or "", call)
+
+    async def _post_batch(self, jobs: list, payload_job):
+        """
+        POST /signals/batch with the jobs of each node (by the symbol, the
+        first item of each job), concurrently. Returns the results of
+        every node that answered, or None if none did.
+        """
+        await self._refresh_health()
+        groups = {}
+        for job in jobs:
+            owner = self._candidates(job[0])[0]
+            groups.setdefault(owner.url, []).append(job)
+
+        timeout = httpx.Timeout(settings.SIGNALS_BATCH_TIMEOUT, connect=settings.SIGNALS_CONNECT_TIMEOUT)
+
+        async def send(group):
+            payload = {"jobs": [payload_job(job) for job in group]}
+            for node in self._candidates(group[0][0]):
+                data = await self.post(node, payload, url=node.batch_url, timeout=timeout)
+                if data is not None:
+                    return data.get("results", [])
+            return None
+
+        answers = await asyncio.gather(*(send(group) for group in groups.values()))
+        answered = [results for results in answers if results is not None]
+        if not answered:
+            return None
+        return [r for results in answered for r in results]
+
+    async def fetch_batch(self, jobs: list):
+        """
+        Snapshots for many (symbol, timeframe, df) jobs.
+        Returns {(symbol, timeframe): snapshot}, or None if unavailable.
+        """
+        results = await self._post_batch(
+            jobs,
+            lambda job: {"symbol": job[0], "timeframe": job[1], **candles_columns(job[2])},
+        )
+        if results is None:
+            return None
+
+        return {(r["symbol"], r["timeframe"]): r for r in results}
+
+    async def fetch_batch_timeframes(self, jobs: list, timeframes):
+        """
+        Snapshots of every timeframe for many (symbol, daily df) jobs: each
+        symbol's daily candles are sent once and the service resamples
+        them. Returns {(symbol, timeframe): snapshot}, or None if
+        unavailable.
+        """
+        results = await self._post_batch(
+            jobs,
+            lambda job: {
+                "symbol": job[0],
+                "timeframes": list(timeframes),
+                **candles_columns(job[1], TIMEFRAMES_DAILY_CANDLES),
+            },
+        )
+        if results is None:
+            return None
+
+        return {
+            (r["symbol"], tf): snap
+            for r in results
+            for tf, snap in r.get("timeframes", {}).items()
+        }
+
+    def stats(self) -> list:
+        """Per-node health, breaker state and latency (this process)."""
+        return [node.stats() for node in self.nodes]
+
+
+class EmbeddedSignals:
+    """
+    Same interface as SignalsClient, but runs the signals engine in this
+    process (core.indicators.indicators). Computation happens in a worker
+    thread so the event loop stays free.
+    """
+
+    async def fetch_snapshot(self, timeframe: str, df: pd.DataFrame, symbol: str = None):
+        return await sync_to_async(self._compute, thread_sensitive=False)(timeframe, df)
+
+    async def fetch_batch(self, jobs: list):
+        return await sync_to_async(self._compute_batch, thread_sensitive=False)(jobs)
+
+    async def fetch_batch_timeframes(self, jobs: list, timeframes):
+        return await sync_to_async(self._compute_timeframes, thread_sensitive=False)(jobs, timeframes)
+
+    def stats(self) -> list:
+        return []
+
+    def _compute(self, timeframe, df):
+        from core.indicators.indicators import compute_snapshot_df
+
+        candles = df.tail(MAX_CANDLES)[["date", "open", "high", "low", "close", "volume"]]
+        try:
+            return compute_snapshot_df(candles, timeframe)
+        except Exception:
+            return None
+
+    def _compute_batch(self, jobs):
+        results = {}
+        for symbol, timeframe, df in jobs:
+            snap = self._compute(timeframe, df)
+            if snap is not None:
+                results[(symbol, timeframe)] = snap
+        return results
+
+    def _compute_timeframes(self, jobs, timeframes):
+        from core.indicators.indicators import compute_timeframes_df
+
+        results = {}
+        for symbol, df in jobs:
+            candles = df.tail(TIMEFRAMES_DAILY_CANDLES)[["date", "open", "high", "low", "close", "volume"]]
+            try:
+                snaps = compute_timeframes_df(candles, timeframes)
+            except Exception:
+                continue
+            for timeframe, snap in snaps.items():
+                results[(symbol, timeframe)] = snap
+        return results
+
+
+def candles_payload(df: pd.DataFrame, max_candles: int = MAX_CANDLES) -> list:
+    """Last max_candles rows of df in the /signals request format."""
+    df = df.tail(max_candles)
+
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    dates = [d.isoformat() if pd.notna(d) else None for d in dates]
+
+    def column(name, missing):
+        values = df[name].to_numpy(dtype=float)
+        return [missing if np.isnan(v) else v for v in values.tolist()]
+
+    opens = column("open", 0.0)
+    highs = column("high", 0.0)
+    lows = column("low", 0.0)
+    closes = column("close", 0.0)
+    volumes = column("volume", None) if "volume" in df.columns else [None] * len(df)
+
+    return [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    ]
+
+
+def candles_columns(df: pd.DataFrame, max_candles: int = MAX_CANDLES) -> dict:
+    """
+    Last max_candles rows of df in the columnar /signals format (one array
+    per field), which the service validates much faster than a list of
+    candle objects.
+    """
+    df = df.tail(max_candles)
+
+    dates = pd.to_datetime(df["date"], errors="coerce")
+
+    def column(name, missing):
+        values = df[name].to_numpy(dtype=float)
+        return [missing if np.isnan(v) else v for v in values.tolist()]
+
+    return {
+        "date": [d.isoformat() if pd.notna(d) else None for d in dates],
+        "open": column("open", 0.0),
+        "high": column("high", 0.0),
+        "low": column("low", 0.0),
+        "close": column("close", 0.0),
+        "volume": column("volume", None) if "volume" in df.columns else None,
+    }
+
+
+def _make_client():
+    if settings.SIGNALS_ENGINE == "embedded":
+        return EmbeddedSignals()
+
+    return SignalsClient(
+        urls=settings.SIGNALS_URLS,
+        timeout=httpx.Timeout(settings.SIGNALS_TIMEOUT, connect=settings.SIGNALS_CONNECT_TIMEOUT, pool=settings.SIGNALS_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=settings.SIGNALS_MAX_CONNECTIONS, max_keepalive_connections=settings.SIGNALS_MAX_CONNECTIONS),
+        breaker_factory=lambda: CircuitBreaker(settings.SIGNALS_BREAKER_THRESHOLD, settings.SIGNALS_BREAKER_RESET),
+        binary=settings.SIGNALS_WIRE_FORMAT == "binary",
+        replicas=settings.SIGNALS_RING_REPLICAS,
+        health_interval=settings.SIGNALS_HEALTH_INTERVAL,
+        health_timeout=settings.SIGNALS_HEALTH_TIMEOUT,
+    )
+
+
+signals_client = _make_client()
@@ -1,97 +1,176 @@
+import asyncio
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 import pandas as pd
-import requests
 
 from core.models import CryptoOHLCV, MarketSnapshot
+from core.utils.candle_store import stored_daily
 from core.utils.queryset_to_df import queryset_to_df
-from core.utils.timeframes import resample_timeframe
+from core.utils.timeframes import timeframe_model, timeframe_queryset
+from core.utils.signals import majority_vote_3
+from core.utils.signals_client import MAX_CANDLES, TIMEFRAMES_DAILY_CANDLES, signals_client
 from core.constants import MIN_CANDLES, SIGNAL_NA
 
-SIGNALS_URL = "http://127.0.0.1:8001/signals"
-
+TIMEFRAMES = ("daily", "weekly", "monthly")
 
-def compute_signal_for_timeframe(df: pd.DataFrame, timeframe: str) -> str:
-    # Resample if needed
-    if timeframe != "daily":
-        df = resample_timeframe(df, timeframe)
-    else:
-        df = df.copy()
-
-    min_required = MIN_CANDLES.get(timeframe, 120)
-    if len(df) < min_required:
-        return SIGNAL_NA
-
-    df_send = df.tail(500).copy()
-
-    candles = []
-    for _, row in df_send.iterrows():
-        date_val = None
-        if "date" in df_send.columns and pd.notna(row.get("date")):
-            date_val = pd.to_datetime(row["date"], errors="coerce")
-            date_val = date_val.isoformat() if pd.notna(date_val) else None
-
-        candles.append({
-            "date": date_val,
-            "open": float(row["open"]) if pd.notna(row.get("open")) else 0.0,
-            "high": float(row["high"]) if pd.notna(row.get("high")) else 0.0,
-            "low": float(row["low"]) if pd.notna(row.get("low")) else 0.0,
-            "close": float(row["close"]) if pd.notna(row.get("close")) else 0.0,
-            "volume": float(row["volume"]) if "volume" in df_send.columns and pd.notna(row.get("volume")) else None,
-        })
-
-    try:
-        resp = requests.post(
-            SIGNALS_URL,
-            json={"timeframe": timeframe, "candles": candles},
-            timeout=20
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("overall", SIGNAL_NA)
-    except Exception:
-        return SIGNAL_NA
+# Symbols per /signals/batch request, and batches in flight at once
+# (one being computed by the service while the next one is loaded)
+BATCH_SYMBOLS = 50
+BATCH_CONCURRENCY = 2
 
 
-@transaction.atomic
-def rebuild_market_snapshots():
+def rebuild_market_snapshots(on_progress=None, mode=None) -> int:
     """
     Rebuild snapshot table safely and atomically.
     Uses the Signals microservice for daily/weekly/monthly overall signals.
+
+    Signals are computed first, outside any transaction; the table is then
+    swapped in a single short transaction. In "batch" mode symbols go to
+    the service BATCH_SYMBOLS at a time per /signals/batch call, each as
+    one daily series the service resamples to weekly/monthly, and
+    on_progress(done, total) is called after each batch. In "panel" mode
+    the whole market is computed in-process in one vectorized pass per
+    timeframe. `mode` defaults to settings.SNAPSHOT_REBUILD_MODE.
+    Returns the number of snapshots created.
     """
-    MarketSnapshot.objects.all().delete()
+    mode = mode or settings.SNAPSHOT_REBUILD_MODE
 
-    symbols = (
-        CryptoOHLCV.objects
-        .values_list("symbol", flat=True)
-        .distinct()
-    )
+    if mode == "panel":
+        snapshots = _build_snapshots_panel(on_progress)
+    else:
+        symbols = list(
+            CryptoOHLCV.objects
+            .values_list("symbol", flat=True)
+            .distinct()
+        )
+        snapshots = async_to_sync(_build_snapshots)(symbols, on_progress)
 
-    created = 0
+    with transaction.atomic():
+        MarketSnapshot.objects.all().delete()
+        MarketSnapshot.objects.bulk_create(snapshots, batch_size=500)
 
-    for symbol in symbols:
-        qs = CryptoOHLCV.objects.filter(symbol=symbol).order_by("date")
-        df = queryset_to_df(qs)
+    created = len(snapshots)
+    print(f"Snapshots created: {created}")
+    return created
+
+
+async def _build_snapshots(symbols, on_progress):
+    # Runs on one event loop so the signals client reuses its connections;
+    # candle loading stays on Django's sync thread.
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    total = len(symbols)
+    done = 0
+
+    async def build_batch(batch):
+        nonlocal done
+        async with sem:
+            snapshots = await _build_batch(batch)
+
+        done += len(batch)
+        if on_progress is not None:
+            await sync_to_async(on_progress)(done, total)
+        return snapshots
+
+    batches = [symbols[i:i + BATCH_SYMBOLS] for i in range(0, total, BATCH_SYMBOLS)]
+    results = await asyncio.gather(*(build_batch(b) for b in batches))
+    return [s for batch in results for s in batch]
 
-        if len(df) < MIN_CANDLES["daily"]:
+
+def _load_frames(symbols) -> dict:
+    """{symbol: recent daily df} for symbols with enough daily history."""
+    frames = {}
+    for symbol in symbols:
+        daily = stored_daily(symbol, last=TIMEFRAMES_DAILY_CANDLES)
+        if daily is None:
+            recent = timeframe_queryset(symbol, "daily").order_by("-date")[:TIMEFRAMES_DAILY_CANDLES]
+            daily = queryset_to_df(recent)
+        if len(daily) < MIN_CANDLES["daily"]:
             continue
 
-        latest = df.iloc[-1]
-        price = latest.get("close")
-        volume_24h = latest.get("volume")
+        frames[symbol] = daily
+    return frames
+
+
+async def _build_batch(symbols):
+    frames = await sync_to_async(_load_frames)(symbols)
 
-        daily_signal = compute_signal_for_timeframe(df, "daily")
-        weekly_signal = compute_signal_for_timeframe(df, "weekly")
-        monthly_signal = compute_signal_for_timeframe(df, "monthly")
+    # The service resamples and leaves timeframes below MIN_CANDLES N/A
+    jobs = list(frames.items())
+    results = await signals_client.fetch_batch_timeframes(jobs, TIMEFRAMES) if jobs else {}
+    results = results or {}
 
-        MarketSnapshot.objects.create(
+    snapshots = []
+    for symbol, daily in frames.items():
+        signals = {
+            tf: results.get((symbol, tf), {}).get("overall", SIGNAL_NA)
+            for tf in TIMEFRAMES
+        }
+
+        latest = daily.iloc[-1]
+
+        # bulk_create skips save(), so fill the stored vote here
+        snapshots.append(MarketSnapshot(
             symbol=symbol,
-            price=price,
-            volume_24h=volume_24h,
-            daily_signal=daily_signal,
-            weekly_signal=weekly_signal,
-            monthly_signal=monthly_signal,
-        )
+            price=latest.get("close"),
+            volume_24h=latest.get("volume"),
+            daily_signal=signals["daily"],
+            weekly_signal=signals["weekly"],
+            monthly_signal=signals["monthly"],
+            combined_signal=majority_vote_3(signals["daily"], signals["weekly"], signals["monthly"]),
+        ))
+
+    return snapshots
+
+
+def _load_latest_candles(timeframe: str) -> pd.DataFrame:
+    """Last MAX_CANDLES candles of every symbol at `timeframe`, in one query."""
+    columns = ["symbol", "date", "open", "high", "low", "close", "volume"]
+    rows = (
+        timeframe_model(timeframe).objects
+        .annotate(recent=Window(RowNumber(), partition_by=[F("symbol")], order_by=F("date").desc()))
+        .filter(recent__lte=MAX_CANDLES)
+        .values_list(*columns)
+    )
 
-        created += 1
+    df = pd.DataFrame.from_records(list(rows), columns=columns)
+    numeric_cols = ["open", "high", "low", "close", "volume"]
+    df[numeric_cols] = df[numeric_cols].astype(float)
+    return df
 
-    print(f"Snapshots created: {created}")
+
+def _build_snapshots_panel(on_progress):
+    from core.indicators.indicators import panel_from_long, panel_overall
+
+    panels = {
+        tf: panel_from_long(_load_latest_candles(tf), max_candles=MAX_CANDLES)
+        for tf in TIMEFRAMES
+    }
+    signals = {
+        tf: panel_overall(panel, min_candles=MIN_CANDLES[tf])
+        for tf, panel in panels.items()
+    }
+
+    daily = panels["daily"]
+    snapshots = []
+    for i, symbol in enumerate(daily.symbols):
+        if daily.lengths[i] < MIN_CANDLES["daily"]:
+            continue
+
+        by_tf = {tf: signals[tf].get(symbol, SIGNAL_NA) for tf in TIMEFRAMES}
+        snapshots.append(MarketSnapshot(
+            symbol=symbol,
+            price=daily.prices["close"][i, -1],
+            volume_24h=daily.prices["volume"][i, -1],
+            daily_signal=by_tf["daily"],
+            weekly_signal=by_tf["weekly"],
+            monthly_signal=by_tf["monthly"],
+            combined_signal=majority_vote_3(by_tf["daily"], by_tf["weekly"], by_tf["monthly"]),
+        ))
+
+    if on_progress is not None:
+        on_progress(len(daily.symbols), len(daily.symbols))
+    return snapshots
@@ -1,5 +1,6 @@
 import pandas as pd
 from core.constants import ALLOWED_TIMEFRAMES
+from core.models import CryptoOHLCV, CryptoOHLCVWeekly, CryptoOHLCVMonthly
 
 
 _TIMEFRAME_TO_RULE = {
@@ -8,6 +9,27 @@ _TIMEFRAME_TO_RULE = {
     "monthly": "ME",
 }
 
+# Higher timeframes are maintained as rollup tables by the ingestion pipe,
+# so reads never have to resample.
+_TIMEFRAME_TO_MODEL = {
+    "daily": CryptoOHLCV,
+    "weekly": CryptoOHLCVWeekly,
+    "monthly": CryptoOHLCVMonthly,
+}
+
+
+def timeframe_model(timeframe: str):
+    """Model holding the candles of `timeframe`."""
+    if timeframe not in ALLOWED_TIMEFRAMES:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    return _TIMEFRAME_TO_MODEL[timeframe]
+
+
+def timeframe_queryset(symbol: str, timeframe: str):
+    """Candles of `symbol` at `timeframe`, oldest first."""
+    return timeframe_model(timeframe).objects.filter(symbol=symbol).order_by("date")
+
 
 def resample_timeframe(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     if timeframe not in ALLOWED_TIMEFRAMES:
@@ -1,30 +1,35 @@
 import os
 import csv
+import hashlib
+from datetime import datetime, date, timezone
+
 import pandas as pd
-import requests
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.core.paginator import Paginator
+from django.views.decorators.http import condition, require_GET
 
-from core.models import CryptoOHLCV, MarketSnapshot
+from core.models import MarketSnapshot, PipelineJob
+from core.utils.candle_store import stored_daily
 from core.utils.queryset_to_df import queryset_to_df
-from core.utils.timeframes import resample_timeframe
-from core.utils.snapshot_builder import rebuild_market_snapshots
+from core.utils.timeframes import timeframe_queryset
+from core.utils.downsample import bucket_ohlcv
+from core.utils.pipeline_jobs import submit_pipeline_job, PipelineAlreadyRunning
+from core.utils import signal_cache
+from core.utils.signals_client import signals_client
 
 from core.constants import (
     MIN_CANDLES,
     ALLOWED_TIMEFRAMES,
     SIGNAL_NA,
-    SIGNAL_BUY,
-    SIGNAL_SELL,
-    SIGNAL_HOLD,
 )
 
-from app.pipes.pipe_binance import run_pipe_binance
-
 
-SIGNALS_URL = "http://127.0.0.1:8001/signals"
+OHLCV_API_DEFAULT_POINTS = 1000
+OHLCV_API_MAX_POINTS = 5000
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -37,28 +42,6 @@ DATA_FILE = os.path.join(
 )
 
 
-def majority_vote_3(daily: str, weekly: str, monthly: str) -> str:
-    """
-    Combine daily/weekly/monthly signals into one by majority vote.
-    Ignores N/A values. If tie, returns HOLD.
-    """
-    vals = [daily, weekly, monthly]
-    valid = [v for v in vals if v in (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD)]
-
-    if not valid:
-        return SIGNAL_NA
-
-    b = valid.count(SIGNAL_BUY)
-    s = valid.count(SIGNAL_SELL)
-    h = valid.count(SIGNAL_HOLD)
-
-    if b > s and b > h:
-        return SIGNAL_BUY
-    if s > b and s > h:
-        return SIGNAL_SELL
-    return SIGNAL_HOLD
-
-
 def home(request):
     return render(request, "home.html")
 
@@ -76,16 +59,32 @@ def contact(request):
 
 
 def run_pipeline(request):
+    """
+    Queue a pipeline run; the run_pipeline_worker command executes it and
+    the page polls pipeline_status for progress.
+    """
     message = None
     if request.method == "POST":
         try:
-            run_pipe_binance(1000, 3650)
-            rebuild_market_snapshots()
-            message = "Pipeline + snapshots finished successfully!"
-        except Exception as e:
-            message = f"Error: {e}"
+            submit_pipeline_job()
+            message = "Pipeline queued."
+        except PipelineAlreadyRunning:
+            message = "A pipeline run is already in progress."
+
+    job = PipelineJob.objects.order_by("-created_at").first()
+    return render(request, "run_pipeline.html", {"message": message, "job": job})
+
+
+def pipeline_status(request, job_id=None):
+    if job_id is None:
+        job = PipelineJob.objects.order_by("-created_at").first()
+    else:
+        job = PipelineJob.objects.filter(pk=job_id).first()
 
-    return render(request, "run_pipeline.html", {"message": message})
+    if job is None:
+        return JsonResponse({"error": "No such job."}, status=404)
+
+    return JsonResponse(job.as_dict())
 
 
 def analyze(request):
@@ -99,33 +98,21 @@ def analyze(request):
     signal_filter = request.GET.get("signal", "all")   # buy | sell | hold | all
     search = request.GET.get("search", "").strip()     # text search
 
-    snapshots = list(MarketSnapshot.objects.all())
-
-    # Attach combined signal (daily + weekly + monthly)
-    for r in snapshots:
-        r.combined_signal = majority_vote_3(
-            r.daily_signal, r.weekly_signal, r.monthly_signal
-        )
+    # Combined signal is stored on the row at write time, so everything
+    # below runs in SQL and only the requested page is fetched.
+    snapshots = MarketSnapshot.objects.only("symbol", "combined_signal")
 
-    # SEARCH (symbol contains text)
+    # SEARCH (symbol contains text) - symbols are stored upper-case,
+    # so a plain LIKE can use the trigram index
     if search:
-        snapshots = [
-            r for r in snapshots
-            if search.lower() in r.symbol.lower()
-        ]
+        snapshots = snapshots.filter(symbol__contains=search.upper())
 
     # FILTER by signal
     if signal_filter in ("buy", "sell", "hold"):
-        snapshots = [
-            r for r in snapshots
-            if r.combined_signal.lower() == signal_filter
-        ]
+        snapshots = snapshots.filter(combined_signal=signal_filter.upper())
 
     # SORT by symbol
-    snapshots.sort(
-        key=lambda x: x.symbol,
-        reverse=(sort == "desc")
-    )
+    snapshots = snapshots.order_by("-symbol" if sort == "desc" else "symbol")
 
     paginator = Paginator(snapshots, 50)
     page_number = request.GET.get("page")
@@ -156,13 +143,22 @@ def data_overview(request):
     return render(request, "data_overview.html", {"symbols": sorted(symbols)})
 
 
-def symbol_detail(request, symbol):
-    timeframe = request.GET.get("tf", "daily")
-    if timeframe not in ALLOWED_TIMEFRAMES:
-        timeframe = "daily"
+def _load_candles(symbol, timeframe):
+    df = stored_daily(symbol) if timeframe == "daily" else None
+    if df is None:
+        df = queryset_to_df(timeframe_queryset(symbol, timeframe))
 
-    qs = CryptoOHLCV.objects.filter(symbol=symbol).order_by("date")
-    df = queryset_to_df(qs)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    return df.sort_values("date")
+
+
+async def abuild_symbol_context(symbol, timeframe):
+    """
+    Load candles, call the signals service and build the symbol_detail
+    template context. Returns (ctx, cacheable).
+    """
+    df = await sync_to_async(_load_candles)(symbol, timeframe)
 
     # Default context so template never crashes
     base_ctx = {
@@ -178,44 +174,20 @@ def symbol_detail(request, symbol):
     }
 
     if df.empty:
-        return render(request, "symbol_detail.html", base_ctx)
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df = df.sort_values("date")
-
-    if timeframe != "daily":
-        df = resample_timeframe(df, timeframe)
+        return base_ctx, False
 
     min_required = MIN_CANDLES[timeframe]
     if len(df) < min_required:
         base_ctx["min_required"] = min_required
         base_ctx["actual_candles"] = len(df)
-        return render(request, "symbol_detail.html", base_ctx)
+        return base_ctx, True
 
     # CALL SIGNALS MICROSERVICE
-    df_send = df.tail(500).copy()
-
-    candles = []
-    for _, row in df_send.iterrows():
-        candles.append({
-            "date": row["date"].isoformat() if pd.notna(row["date"]) else None,
-            "open": float(row["open"]) if pd.notna(row.get("open")) else 0.0,
-            "high": float(row["high"]),
-            "low": float(row["low"]),
-            "close": float(row["close"]),
-            "volume": float(row["volume"]) if "volume" in df_send.columns and pd.notna(row.get("volume")) else None,
-        })
+    snapshot = await signals_client.fetch_snapshot(timeframe, df, symbol=symbol)
 
-    try:
-        resp = requests.post(
-            SIGNALS_URL,
-            json={"timeframe": timeframe, "candles": candles},
-            timeout=15
-        )
-        resp.raise_for_status()
-        snapshot = resp.json()
-    except Exception:
+    # Service down or breaker open - don't pin N/A in the cache
+    cacheable = snapshot is not None
+    if snapshot is None:
         snapshot = {"overall": SIGNAL_NA, "latest": {}, "signals": {}, "values": {}}
 
     ctx = {
@@ -229,4 +201,116 @@ def symbol_detail(request, symbol):
         "values": snapshot.get("values", {}),
     }
 
+    return ctx, cacheable
+
+
+async def aget_symbol_context(symbol, timeframe):
+    """
+    symbol_detail context, cached per (symbol, timeframe, latest candle date).
+    """
+    last_date = await sync_to_async(signal_cache.latest_candle_date)(symbol)
+    if last_date is not None:
+        ctx = await sync_to_async(signal_cache.get_detail)(symbol, timeframe, last_date)
+        if ctx is not None:
+            return ctx
+
+    ctx, cacheable = await abuild_symbol_context(symbol, timeframe)
+    if cacheable and last_date is not None:
+        await sync_to_async(signal_cache.set_detail)(symbol, timeframe, last_date, ctx)
+
+    return ctx
+
+
+async def symbol_detail(request, symbol):
+    timeframe = request.GET.get("tf", "daily")
+    if timeframe not in ALLOWED_TIMEFRAMES:
+        timeframe = "daily"
+
+    ctx = await aget_symbol_context(symbol, timeframe)
     return render(request, "symbol_detail.html", ctx)
+
+
+def _ohlcv_api_params(request):
+    """Parse and validate /api/ohlcv/ query params. Raises ValueError."""
+    timeframe = request.GET.get("tf", "daily")
+    if timeframe not in ALLOWED_TIMEFRAMES:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    start = request.GET.get("start")
+    end = request.GET.get("end")
+    start = date.fromisoformat(start) if start else None
+    end = date.fromisoformat(end) if end else None
+
+    max_points = int(request.GET.get("max_points", OHLCV_API_DEFAULT_POINTS))
+    if not 2 <= max_points <= OHLCV_API_MAX_POINTS:
+        raise ValueError(f"max_points must be between 2 and {OHLCV_API_MAX_POINTS}")
+
+    return timeframe, start, end, max_points
+
+
+def _ohlcv_etag(request, symbol):
+    # Every timeframe is derived from the daily candles, so the latest daily
+    # candle identifies the data version; the query string the response shape.
+    last_date = signal_cache.latest_candle_date(symbol)
+    if last_date is None:
+        return None
+
+    raw = f"{symbol}|{last_date}|{request.GET.urlencode()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _ohlcv_last_modified(request, symbol):
+    last_date = signal_cache.latest_candle_date(symbol)
+    if last_date is None:
+        return None
+
+    return datetime.combine(date.fromisoformat(last_date), datetime.min.time(), tzinfo=timezone.utc)
+
+
+@require_GET
+def signals_nodes(request):
+    """
+    Signals service instances as seen by this process: health, breaker
+    state, request / failure counts and latency percentiles.
+    """
+    return JsonResponse({"engine": settings.SIGNALS_ENGINE, "nodes": signals_client.stats()})
+
+
+@require_GET
+@condition(etag_func=_ohlcv_etag, last_modified_func=_ohlcv_last_modified)
+def ohlcv_api(request, symbol):
+    """
+    Chart data for a symbol as column arrays, downsampled server-side to at
+    most `max_points` candles.
+
+    Query params: tf (daily|weekly|monthly), start / end (YYYY-MM-DD),
+    max_points.
+    """
+    try:
+        timeframe, start, end, max_points = _ohlcv_api_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    qs = timeframe_queryset(symbol, timeframe)
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+
+    df = queryset_to_df(qs.only("date", "open", "high", "low", "close", "volume"))
+    total = len(df)
+    df = bucket_ohlcv(df, max_points)
+
+    return JsonResponse({
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "total": total,
+        "points": len(df),
+        "downsampled": len(df) < total,
+        "date": [d.date().isoformat() for d in pd.to_datetime(df["date"])],
+        "open": df["open"].astype(float).tolist(),
+        "high": df["high"].astype(float).tolist(),
+        "low": df["low"].astype(float).tolist(),
+        "close": df["close"].astype(float).tolist(),
+        "volume": df["volume"].astype(float).tolist(),
+    })
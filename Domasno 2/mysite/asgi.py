@@ -3,6 +3,14 @@ ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run the site under ASGI so the async views (symbol_detail) share one event
+loop, and with it one keep-alive signals client, per process:
+
+    uvicorn mysite.asgi:application --workers 4
+
+Under WSGI (runserver, gunicorn) every async view call gets its own event
+loop and signals client.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
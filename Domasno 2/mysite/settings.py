@@ -28,6 +28,11 @@ DOMASNO1_PATH = os.path.join(PROJECT_ROOT, "Domasno 1")
 
 sys.path.insert(0,DOMASNO1_PATH)
 
+# Signals service sources, importable as signal_service.app.*
+DOMASNO4_PATH = os.path.join(PROJECT_ROOT, "Domasno 4")
+
+sys.path.insert(0,DOMASNO4_PATH)
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -100,6 +105,79 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory by default; point REDIS_URL at a Redis instance to share the
+# cache between workers and with the pipeline process. run_pipeline_worker
+# refuses to start without a shared cache: its invalidations would never
+# reach the web processes.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "crypitibapitiboo",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# How long symbol_detail results (and the latest-candle pointer they are keyed
+# on) may live in the cache. The pipeline invalidates symbols explicitly (in
+# the shared cache), this only bounds staleness if an invalidation is lost.
+SIGNALS_CACHE_TIMEOUT = 6 * 60 * 60
+
+
+# Signals microservice
+# SIGNALS_ENGINE = "remote" calls the service over HTTP; "embedded" runs the
+# same engine in-process (no serialization / HTTP hop).
+
+SIGNALS_ENGINE = os.getenv("SIGNALS_ENGINE", "remote")
+
+# One keep-alive connection pool per process; after SIGNALS_BREAKER_THRESHOLD
+# consecutive failures calls to an instance fail fast for SIGNALS_BREAKER_RESET
+# seconds (and go to the next instance, or to N/A if there is none).
+
+SIGNALS_URL = os.getenv("SIGNALS_URL", "http://127.0.0.1:8001/signals")
+
+# Service instances, comma-separated /signals URLs. Requests are routed by
+# consistent hashing on the symbol, so each instance keeps the caches and
+# stream states of its own symbols warm; adding an instance only moves the
+# symbols it takes over. Instances failing GET /health (checked at most every
+# SIGNALS_HEALTH_INTERVAL seconds) are skipped for the next one on the ring.
+SIGNALS_URLS = [u.strip() for u in os.getenv("SIGNALS_URLS", SIGNALS_URL).split(",") if u.strip()]
+SIGNALS_RING_REPLICAS = 100
+SIGNALS_HEALTH_INTERVAL = 10.0
+SIGNALS_HEALTH_TIMEOUT = 1.0
+
+SIGNALS_TIMEOUT = 15.0
+SIGNALS_BATCH_TIMEOUT = 120.0
+SIGNALS_CONNECT_TIMEOUT = 2.0
+SIGNALS_MAX_CONNECTIONS = 20
+SIGNALS_BREAKER_THRESHOLD = 5
+SIGNALS_BREAKER_RESET = 30.0
+
+# "binary" sends candles in the columnar format from signal_service.app.wire,
+# falling back to JSON automatically if the service does not accept it.
+SIGNALS_WIRE_FORMAT = "binary"
+
+# How rebuild_market_snapshots computes signals: "batch" sends symbols to the
+# service in /signals/batch requests; "panel" loads the whole market and
+# computes every symbol at once in-process, in vectorized passes.
+SNAPSHOT_REBUILD_MODE = os.getenv("SNAPSHOT_REBUILD_MODE", "batch")
+
+
+# Memory-mapped candle files written by the ingestion pipe (same variable as
+# the pipe and the signals service). When set, daily candles are read from
+# them instead of the ohlcv table; unset, or a symbol without a file, falls
+# back to the table.
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR") or None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
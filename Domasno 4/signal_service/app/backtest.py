@@ -0,0 +1,329 @@
+"""
+Backtests of the signal engine over stored history: how every strategy and
+the overall vote would have traded each symbol and timeframe.
+
+Everything is vectorized over a whole series. Indicators and signals come
+from one compute_indicators + SignalEngine.evaluate pass (the same
+vectorized path as /signals/history), positions from a forward fill of
+the signal codes, and returns, equity and drawdown from NumPy
+accumulations. Every strategy is one row of a (strategies, candles) array
+and is simulated at once.
+
+Trading rule: the position is decided at each candle's close and held
+over the next candle. BUY goes long and SELL goes flat (short with
+short=True). HOLD and N/A keep the current position. `fee` is charged per
+unit of position change. A signal's hit means the close `horizon` candles
+later moved its way: up after BUY, down after SELL.
+
+Indicators are computed from the first stored candle on, unlike the
+snapshots, which use the last MAX_CANDLES. Recursive indicators (EMA,
+MACD, ADX) can differ slightly from a snapshot taken on the same day.
+
+run_backtest() spreads the symbols of a candle store (app.candle_store)
+over worker processes. Each worker maps the files itself, so only symbol
+names are sent to it. From signal_service/:
+
+    python -m app.backtest --store /data/candles --workers 8 --output backtest.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CandleStore
+from .compute import MIN_CANDLES
+from .indicator_calculator import compute_indicators
+from .indicators import DEFAULT_SIGNAL_ENGINE, SignalEngine
+from .indicators.base import CODE_BUY, CODE_SELL
+from .resample import TIMEFRAMES, resample
+
+OVERALL = "overall"
+BUY_AND_HOLD = "buy & hold"
+
+
+@dataclass(frozen=True)
+class BacktestOptions:
+    fee: float = 0.001   # per unit of position change (0.1%)
+    horizon: int = 1     # candles after a signal its hit is judged on
+    short: bool = False  # SELL goes short instead of flat
+
+
+def positions(codes: np.ndarray, short: bool = False) -> np.ndarray:
+    """
+    Position after each candle (last axis) from signal codes: 1 after BUY,
+    0 (-1 with short) after SELL, unchanged on HOLD / N/A, flat before
+    the first BUY or SELL.
+    """
+    target = np.where(codes == CODE_BUY, 1.0, np.where(codes == CODE_SELL, -1.0 if short else 0.0, np.nan))
+
+    # Index of the latest BUY/SELL at or before each candle (-1: none yet)
+    idx = np.where(np.isnan(target), -1, np.arange(codes.shape[-1]))
+    idx = np.maximum.accumulate(idx, axis=-1)
+
+    held = np.take_along_axis(target, np.maximum(idx, 0), axis=-1)
+    return np.where(idx < 0, 0.0, held)
+
+
+def candle_returns(close: np.ndarray) -> np.ndarray:
+    """Close-to-close return of every candle (0 for the first)."""
+    out = np.zeros_like(close, dtype=float)
+    out[1:] = close[1:] / close[:-1] - 1
+    return out
+
+
+def strategy_returns(position: np.ndarray, close: np.ndarray, fee: float) -> np.ndarray:
+    """Return of each candle for the position held into it, after fees."""
+    held = np.zeros_like(position)
+    held[..., 1:] = position[..., :-1]
+    turnover = np.abs(np.diff(position, axis=-1, prepend=0.0))
+    return held * candle_returns(close) - fee * turnover
+
+
+def max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall of the equity curve (<= 0), per row."""
+    equity = np.cumprod(1 + returns, axis=-1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    return (equity / peak - 1).min(axis=-1)
+
+
+def strategy_metrics(codes: np.ndarray, position: np.ndarray, returns: np.ndarray, close: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """
+    Backtest metrics per row of (strategies, candles) arrays; signals are
+    scored against the close `horizon` candles later.
+    """
+    forward = np.full(len(close), np.nan)
+    if horizon < len(close):
+        forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+
+    buy = (codes == CODE_BUY) & ~np.isnan(forward)
+    sell = (codes == CODE_SELL) & ~np.isnan(forward)
+    hits = (buy & (forward > 0)) | (sell & (forward < 0))
+
+    return {
+        "total_return": np.prod(1 + returns, axis=-1) - 1,
+        "max_drawdown": max_drawdown(returns),
+        "signals": (buy | sell).sum(axis=-1),
+        "hits": hits.sum(axis=-1),
+        "trades": (np.diff(position, axis=-1, prepend=0.0) != 0).sum(axis=-1),
+        "exposure": (position != 0).mean(axis=-1),
+    }
+
+
+def backtest_candles(
+    candles: Dict[str, np.ndarray],
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+    options: BacktestOptions = BacktestOptions(),
+) -> Dict[str, Dict[str, float]]:
+    """
+    {strategy label | "overall" | "buy & hold": metrics} for one candle
+    series ("date" plus open/high/low/close[/volume] arrays, oldest first).
+    """
+    df = compute_indicators(pd.DataFrame(candles), columns=engine.required_columns)
+    close = df["close"].to_numpy(dtype=float)
+    prices = {col: df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close", "volume") if col in df.columns}
+    values = {col: df[col].to_numpy(dtype=float, na_value=np.nan) for col in engine.required_columns}
+
+    signals, overall = engine.evaluate(prices, values)
+    labels = list(signals) + [OVERALL]
+    codes = np.stack(list(signals.values()) + [overall])
+
+    position = positions(codes, options.short)
+    # Buy & hold: long from the first candle on
+    position = np.vstack([position, np.ones(len(close))])
+    codes = np.vstack([codes, np.zeros(len(close), dtype=codes.dtype)])
+    labels.append(BUY_AND_HOLD)
+
+    returns = strategy_returns(position, close, options.fee)
+    metrics = strategy_metrics(codes, position, returns, close, options.horizon)
+
+    out = {}
+    for i, label in enumerate(labels):
+        row = {name: column[i].item() for name, column in metrics.items()}
+        row["hit_rate"] = row["hits"] / row["signals"] if row["signals"] else None
+        out[label] = row
+    return out
+
+
+def backtest_symbol(
+    daily: Dict[str, np.ndarray],
+    timeframes: Sequence[str] = TIMEFRAMES,
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+    options: BacktestOptions = BacktestOptions(),
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {timeframe: {"candles", "start", "end", "strategies"}} from one daily
+    series (see compute.daily_columns), resampled to each timeframe.
+    Timeframes with fewer than MIN_CANDLES candles get no "strategies".
+    """
+    out = {}
+    for timeframe in timeframes:
+        candles = resample(daily, timeframe)
+        count = len(candles["date"])
+        result = {
+            "candles": count,
+            "start": str(candles["date"][0])[:10] if count else None,
+            "end": str(candles["date"][-1])[:10] if count else None,
+        }
+        if count >= MIN_CANDLES[timeframe]:
+            result["strategies"] = backtest_candles(candles, engine, options)
+        out[timeframe] = result
+    return out
+
+
+# -- the whole store, in worker processes ----------------------------------
+
+_stores: Dict[str, CandleStore] = {}
+
+
+def _backtest_chunk(root: str, symbols: List[str], timeframes, engine, options) -> Dict[str, Any]:
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = CandleStore(root)
+
+    out = {}
+    for symbol in symbols:
+        daily = store.read(symbol)
+        if daily is None or not len(daily["date"]):
+            continue
+        out[symbol] = backtest_symbol(daily, timeframes, engine, options)
+    return out
+
+
+def stored_symbols(root: str) -> List[str]:
+    """Symbols with a daily candle file in the store."""
+    directory = os.path.join(root, "daily")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".candles")] for name in os.listdir(directory) if name.endswith(".candles"))
+
+
+def run_backtest(
+    root: str,
+    symbols: Optional[Sequence[str]] = None,
+    timeframes: Sequence[str] = TIMEFRAMES,
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+    options: BacktestOptions = BacktestOptions(),
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {symbol: backtest_symbol result} for `symbols` (default: all) of the
+    candle store at `root`, computed in `workers` processes (default:
+    one per core; 1 runs in this process).
+    """
+    symbols = list(symbols) if symbols is not None else stored_symbols(root)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(symbols) < 2:
+        return _backtest_chunk(root, symbols, timeframes, engine, options)
+
+    # A few chunks per worker, so one slow chunk does not hold up the end
+    size = max(1, math.ceil(len(symbols) / (workers * 4)))
+    chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_backtest_chunk, root, chunk, timeframes, engine, options) for chunk in chunks]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def summarize(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    {timeframe: {strategy: aggregate}} over the symbols of run_backtest:
+    mean / median return, hit rate over all signals, mean and worst
+    drawdown, trades per symbol.
+    """
+    rows = [
+        (timeframe, label, metrics)
+        for by_timeframe in results.values()
+        for timeframe, result in by_timeframe.items()
+        for label, metrics in result.get("strategies", {}).items()
+    ]
+    if not rows:
+        return {}
+
+    table = pd.DataFrame(
+        [{"timeframe": tf, "strategy": label, **metrics} for tf, label, metrics in rows]
+    )
+    grouped = table.groupby(["timeframe", "strategy"], sort=False)
+    agg = grouped.agg(
+        symbols=("total_return", "size"),
+        mean_return=("total_return", "mean"),
+        median_return=("total_return", "median"),
+        signals=("signals", "sum"),
+        hits=("hits", "sum"),
+        mean_drawdown=("max_drawdown", "mean"),
+        worst_drawdown=("max_drawdown", "min"),
+        trades=("trades", "mean"),
+        exposure=("exposure", "mean"),
+    )
+    agg["hit_rate"] = agg["hits"] / agg["signals"].where(agg["signals"] > 0)
+
+    counts = ("symbols", "signals", "hits")
+    out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (timeframe, label), row in agg.iterrows():
+        out.setdefault(timeframe, {})[label] = {
+            k: None if pd.isna(v) else int(v) if k in counts else float(v)
+            for k, v in row.items()
+        }
+    return out
+
+
+def _report(summary: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    def pct(value):
+        return "-" if value is None else f"{value:.1%}"
+
+    for timeframe, strategies in summary.items():
+        print(f"\n{timeframe}")
+        print(f"{'strategy':<24}{'symbols':>8}{'mean ret':>11}{'median':>10}{'hit rate':>10}{'mean dd':>10}{'worst dd':>10}{'trades':>8}")
+        ranked = sorted(strategies.items(), key=lambda item: item[1]["median_return"], reverse=True)
+        for label, s in ranked:
+            print(
+                f"{label:<24}{s['symbols']:>8}{pct(s['mean_return']):>11}{pct(s['median_return']):>10}"
+                f"{pct(s['hit_rate']):>10}{pct(s['mean_drawdown']):>10}{pct(s['worst_drawdown']):>10}{s['trades']:>8.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the signal engine over a candle store.")
+    parser.add_argument("--store", default=os.getenv("CANDLE_STORE_DIR"), help="candle store directory (default: CANDLE_STORE_DIR)")
+    parser.add_argument("--symbols", help="comma-separated (default: every symbol in the store)")
+    parser.add_argument("--timeframes", default=",".join(TIMEFRAMES))
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--fee", type=float, default=BacktestOptions.fee)
+    parser.add_argument("--horizon", type=int, default=BacktestOptions.horizon)
+    parser.add_argument("--short", action="store_true", help="SELL goes short instead of flat")
+    parser.add_argument("--output", help="write per-symbol results and the summary as JSON")
+    args = parser.parse_args()
+    if not args.store:
+        parser.error("--store (or CANDLE_STORE_DIR) is required")
+
+    options = BacktestOptions(fee=args.fee, horizon=args.horizon, short=args.short)
+    symbols = args.symbols.split(",") if args.symbols else None
+    timeframes = tuple(tf for tf in args.timeframes.split(",") if tf)
+
+    start = time.perf_counter()
+    results = run_backtest(args.store, symbols, timeframes, options=options, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results)
+    _report(summary)
+    print(f"\n{len(results)} symbols in {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"options": asdict(options), "summary": summary, "symbols": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Server-side candle loading for the symbol-addressed endpoints.
+
+PostgresCandles reads daily candles from the `ohlcv` table through a pooled
+asyncpg connection, configured with the same DB_* environment variables as
+the ingestion pipe. Recently used symbols keep their arrays in memory: after
+SIGNALS_HOT_REFRESH seconds only rows newer than the last cached candle are
+fetched and appended (the pipe only ever inserts new dates).
+
+StoreCandles reads the memory-mapped candle files instead (app.candle_store),
+when CANDLE_STORE_DIR is set: no per-process copy and no database round trip.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+
+from .candle_store import CandleFileError, CandleStore
+
+HOT_SYMBOLS = int(os.getenv("SIGNALS_HOT_SYMBOLS", "256"))
+HOT_REFRESH = float(os.getenv("SIGNALS_HOT_REFRESH", "60"))
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+_MIN_DATE = np.datetime64("1900-01-01").item()
+
+_QUERY = """
+    SELECT date, open::float8, high::float8, low::float8, close::float8, volume::float8
+    FROM ohlcv
+    WHERE symbol = $1 AND date > $2
+    ORDER BY date
+"""
+
+
+class CandleSourceError(Exception):
+    """The candle store could not be reached."""
+
+
+class _HotSeries:
+    __slots__ = ("columns", "checked_at")
+
+    def __init__(self, columns: Dict[str, np.ndarray], checked_at: float):
+        self.columns = columns
+        self.checked_at = checked_at
+
+
+def _to_columns(rows) -> Dict[str, np.ndarray]:
+    if not rows:
+        return {
+            "date": np.array([], dtype="datetime64[ns]"),
+            **{name: np.array([], dtype=float) for name in COLUMNS[1:]},
+        }
+
+    dates, *values = zip(*rows)
+    out = {"date": np.array(dates, dtype="datetime64[ns]")}
+    for name, column in zip(COLUMNS[1:], values):
+        out[name] = np.array(column, dtype=float)
+    return out
+
+
+class PostgresCandles:
+    def __init__(self, dsn: Dict[str, str], hot_symbols: int = HOT_SYMBOLS, refresh_after: float = HOT_REFRESH):
+        self.dsn = dsn
+        self.hot_symbols = hot_symbols
+        self.refresh_after = refresh_after
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+        self._hot: "OrderedDict[str, _HotSeries]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def from_env(cls) -> "PostgresCandles":
+        return cls({
+            "host": os.getenv("DB_HOST", "localhost"),
+            "port": os.getenv("DB_PORT", "5432"),
+            "database": os.getenv("DB_NAME"),
+            "user": os.getenv("DB_USER"),
+            "password": os.getenv("DB_PASSWORD"),
+        })
+
+    async def _get_pool(self):
+        async with self._pool_lock:
+            if self._pool is None:
+                import asyncpg
+
+                self._pool = await asyncpg.create_pool(
+                    min_size=1,
+                    max_size=int(os.getenv("SIGNALS_DB_POOL_SIZE", "10")),
+                    **{k: v for k, v in self.dsn.items() if v is not None},
+                )
+        return self._pool
+
+    async def _fetch(self, symbol: str, after) -> Dict[str, np.ndarray]:
+        try:
+            pool = await self._get_pool()
+            rows = await pool.fetch(_QUERY, symbol, after)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise CandleSourceError(str(e)) from e
+        except Exception as e:
+            if type(e).__module__.startswith("asyncpg"):
+                raise CandleSourceError(str(e)) from e
+            raise
+        return _to_columns(rows)
+
+    async def daily(self, symbol: str) -> Dict[str, np.ndarray]:
+        """All daily candles of `symbol`, oldest first (empty if unknown)."""
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            hot = self._hot.get(symbol)
+
+            if hot is None:
+                hot = _HotSeries(await self._fetch(symbol, _MIN_DATE), now)
+            elif now - hot.checked_at >= self.refresh_after:
+                dates = hot.columns["date"]
+                after = dates[-1].astype("datetime64[D]").item() if len(dates) else _MIN_DATE
+                new = await self._fetch(symbol, after)
+                if len(new["date"]):
+                    hot.columns = {k: np.concatenate([hot.columns[k], new[k]]) for k in COLUMNS}
+                hot.checked_at = now
+
+            self._hot[symbol] = hot
+            self._hot.move_to_end(symbol)
+            while len(self._hot) > self.hot_symbols:
+                evicted, _ = self._hot.popitem(last=False)
+                self._locks.pop(evicted, None)
+
+            return hot.columns
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+class StoreCandles:
+    """Daily candles from the pipe's memory-mapped files (see app.candle_store)."""
+
+    def __init__(self, root: str):
+        self.store = CandleStore(root)
+
+    async def daily(self, symbol: str) -> Dict[str, np.ndarray]:
+        """All daily candles of `symbol`, oldest first (empty if unknown)."""
+        try:
+            columns = self.store.read(symbol)
+        except (OSError, CandleFileError) as e:
+            raise CandleSourceError(str(e)) from e
+        return columns if columns is not None else _to_columns([])
+
+    async def close(self) -> None:
+        pass
+
+
+def from_env():
+    """StoreCandles if CANDLE_STORE_DIR is set, else PostgresCandles."""
+    root = os.getenv("CANDLE_STORE_DIR")
+    if root:
+        return StoreCandles(root)
+    return PostgresCandles.from_env()
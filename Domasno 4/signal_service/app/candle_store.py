@@ -0,0 +1,83 @@
+"""
+Read side of the memory-mapped candle files the ingestion pipe writes
+(Domasno 1, app/storage/candle_store.py, which documents the layout; keep
+the two in sync): <root>/<interval>/<SYMBOL>.candles, a 64-byte header
+and one contiguous int64/float64 block per column.
+
+Columns come back as read-only views of the mapping, so loading a symbol
+copies nothing and every process that maps the file (uvicorn workers,
+pool workers, Django) shares the one page-cached copy. A date range is
+found by binary search on the sorted date column.
+"""
+from __future__ import annotations
+
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"OHLC"
+VERSION = 1
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+DTYPES = (np.int64,) + (np.float64,) * 5
+
+HEADER = struct.Struct("<4sHHIqq")
+HEADER_SIZE = 64
+
+
+class CandleFileError(Exception):
+    """Not a candle file, or a version this reader does not know."""
+
+
+def _read_header(buf) -> Tuple[int, int]:
+    magic, version, ncols, _, count, capacity = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or ncols != len(COLUMNS):
+        raise CandleFileError("Not a candle file (or an unsupported version)")
+    return count, capacity
+
+
+class CandleStore:
+    def __init__(self, root: str):
+        self.root = root
+        # path -> (inode, mapping). The writer swaps in a new file when it
+        # runs out of room, which shows as a new inode.
+        self._maps: Dict[str, Tuple[int, np.memmap]] = {}
+
+    def path(self, symbol: str, interval: str = "daily") -> str:
+        return os.path.join(self.root, interval, f"{symbol}.candles")
+
+    def _mapping(self, path: str) -> Optional[np.memmap]:
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            self._maps.pop(path, None)
+            return None
+
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != inode:
+            cached = self._maps[path] = (inode, np.memmap(path, mode="r"))
+        return cached[1]
+
+    def read(self, symbol: str, interval: str = "daily", start=None, end=None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        {column: array} of the candles with start <= date <= end (both
+        optional, anything np.datetime64 takes), oldest first; None if the
+        symbol has no file. "date" is datetime64[ns].
+        """
+        data = self._mapping(self.path(symbol, interval))
+        if data is None:
+            return None
+
+        # The row count is read first: rows past it may be mid-append
+        count, capacity = _read_header(data)
+        columns = {}
+        for i, (name, dtype) in enumerate(zip(COLUMNS, DTYPES)):
+            offset = HEADER_SIZE + i * capacity * 8
+            columns[name] = data[offset:offset + count * 8].view(np.ndarray).view(dtype)
+        columns["date"] = columns["date"].view("datetime64[ns]")
+
+        dates = columns["date"]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "ns"), "left"))
+        hi = count if end is None else int(np.searchsorted(dates, np.datetime64(end, "ns"), "right"))
+        return {name: values[lo:hi] for name, values in columns.items()}
@@ -0,0 +1,163 @@
+# Library entry point of the signals engine. Modules below app/ (except
+# main.py) use relative imports so the package can also be imported
+# in-process as signal_service.app (see the Django SIGNALS_ENGINE setting).
+from typing import Any, Dict, List, Sequence
+import numpy as np
+import pandas as pd
+
+from .indicators import DEFAULT_SIGNAL_ENGINE, SignalEngine
+from .indicator_calculator import compute_indicators
+from .metrics import stage
+from .resample import TIMEFRAMES, bucket_labels, resample
+
+# Fewest candles for a meaningful snapshot (same as core.constants in Django)
+MIN_CANDLES = {
+    "daily": 120,
+    "weekly": 60,
+    "monthly": 48,
+}
+
+# Most recent candles used per snapshot when the service picks the window
+MAX_CANDLES = 500
+
+
+def compute_snapshot(candles: List[Dict[str, Any]], timeframe: str, engine: SignalEngine = DEFAULT_SIGNAL_ENGINE) -> Dict[str, Any]:
+    """Indicators + signal snapshot for one candle series (oldest first)."""
+    return compute_snapshot_df(candles_frame(candles), timeframe, engine)
+
+
+def candles_frame(candles: List[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(candles)
+
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
+
+
+def columns_frame(columns: Dict[str, Any]) -> pd.DataFrame:
+    """Candles given as one array per field ({"date": [...], "open": [...], ...})."""
+    df = pd.DataFrame({
+        name: np.asarray(values, dtype=float)
+        for name, values in columns.items()
+        if name != "date" and values is not None
+    })
+
+    if columns.get("date") is not None:
+        df.insert(0, "date", pd.to_datetime(pd.Series(columns["date"], dtype=object), errors="coerce"))
+    return df
+
+
+def compute_snapshot_df(df: pd.DataFrame, timeframe: str, engine: SignalEngine = DEFAULT_SIGNAL_ENGINE) -> Dict[str, Any]:
+    """
+    Same as compute_snapshot, for candles already in a DataFrame. Only the
+    indicators the engine's strategies read are computed, for the last row.
+    """
+    df = compute_indicators(df, columns=engine.required_columns, latest_only=True)
+    snap = engine.build_snapshot(df)
+
+    snap["timeframe"] = timeframe
+    snap["candles_used"] = len(df)
+    return snap
+
+
+def daily_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Daily candles as arrays for app.resample: sorted by date, rows without
+    a date or without high/low/close dropped.
+    """
+    df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+    df = df.dropna(subset=["date", "high", "low", "close"]).sort_values("date", kind="stable")
+
+    columns = {"date": df["date"].to_numpy("datetime64[ns]")}
+    for name in ("open", "high", "low", "close", "volume"):
+        if name in df.columns:
+            columns[name] = df[name].to_numpy(dtype=float)
+    return columns
+
+
+def compute_timeframes(
+    daily: Dict[str, np.ndarray],
+    timeframes: Sequence[str] = TIMEFRAMES,
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {timeframe: snapshot} from one daily series (daily_columns), resampled
+    to each timeframe. Each snapshot uses the last MAX_CANDLES candles;
+    timeframes with fewer than MIN_CANDLES candles are N/A.
+    """
+    out = {}
+    for timeframe in timeframes:
+        with stage("resample"):
+            candles = resample(daily, timeframe)
+        count = len(candles["date"])
+
+        if count < MIN_CANDLES[timeframe]:
+            snap = engine.build_snapshot(None)
+            snap["timeframe"] = timeframe
+            snap["candles_used"] = count
+        else:
+            df = pd.DataFrame({name: values[-MAX_CANDLES:] for name, values in candles.items()})
+            snap = compute_snapshot_df(df, timeframe, engine)
+        out[timeframe] = snap
+    return out
+
+
+def timeframe_window(daily: Dict[str, np.ndarray], timeframe: str) -> Dict[str, np.ndarray]:
+    """
+    The tail of a daily series (daily_columns) that compute_timeframes
+    reads for `timeframe`: the days of its last MAX_CANDLES buckets. Cut
+    on a bucket boundary, so the snapshot is the same as for the whole
+    series.
+    """
+    labels = bucket_labels(daily["date"], timeframe)
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if len(labels) else labels
+    if len(starts) <= MAX_CANDLES:
+        return daily
+    first = starts[-MAX_CANDLES]
+    return {name: values[first:] for name, values in daily.items()}
+
+
+def compute_timeframes_df(
+    df: pd.DataFrame,
+    timeframes: Sequence[str] = TIMEFRAMES,
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+) -> Dict[str, Dict[str, Any]]:
+    """compute_timeframes for daily candles in a DataFrame."""
+    return compute_timeframes(daily_columns(df), timeframes, engine)
+
+
+def compute_history_df(df: pd.DataFrame, timeframe: str, engine: SignalEngine = DEFAULT_SIGNAL_ENGINE) -> Dict[str, Any]:
+    """
+    Signal history of a candle series: every strategy's signal and the
+    overall vote for every candle, as columns, evaluated in one vectorized
+    pass (SignalEngine.build_history).
+    """
+    df = compute_indicators(df, columns=engine.required_columns)
+    history = engine.build_history(df)
+
+    dates = history.pop("date") if "date" in history.columns else pd.Series([None] * len(history))
+    return {
+        "timeframe": timeframe,
+        "candles_used": len(history),
+        "dates": [None if pd.isna(d) else str(d) for d in dates],
+        "overall": history.pop("overall").tolist(),
+        "signals": {label: history[label].tolist() for label in history.columns},
+    }
+
+
+def compute_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """One /signals/batch job. Errors are reported per job, not raised."""
+    result = {"symbol": job["symbol"], "timeframe": job["timeframe"]}
+    try:
+        if "columns" in job:
+            df = columns_frame(job["columns"])
+        else:
+            df = candles_frame(job["candles"])
+
+        if job.get("timeframes"):
+            result["timeframes"] = compute_timeframes_df(df, job["timeframes"])
+        else:
+            result.update(compute_snapshot_df(df, job["timeframe"]))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
@@ -0,0 +1,37 @@
+"""
+JSON responses with orjson. NumPy arrays and scalars are written natively
+(no per-value conversion as in fastapi's jsonable_encoder), NaN and
+infinity become null (the standard encoder refuses them), and anything
+else orjson does not know (pd.Timestamp, pd.NA, Decimal, np.datetime64) goes
+through _default, converted the way jsonable_encoder would.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, date):
+        # Subclasses such as pd.Timestamp; orjson only takes the exact types
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
@@ -1,7 +1,9 @@
+from typing import Iterable, Optional
+
 import pandas as pd
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.trend import MACD, ADXIndicator, CCIIndicator, SMAIndicator, EMAIndicator, WMAIndicator
-from ta.volatility import BollingerBands
+
+from . import kernels
+from .metrics import stage
 
 SIGNAL_NA = "N/A"
 SIGNAL_BUY = "BUY"
@@ -16,40 +18,37 @@ def _ensure_numeric(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df = _ensure_numeric(df)
-    df = df.dropna(subset=["high", "low", "close"])
-
-    df["rsi"] = RSIIndicator(close=df["close"], window=14).rsi()
-
-    macd = MACD(close=df["close"])
-    df["macd"] = macd.macd()
-    df["macd_signal"] = macd.macd_signal()
-    df["macd_hist"] = macd.macd_diff()
-
-    stoch = StochasticOscillator(high=df["high"], low=df["low"], close=df["close"])
-    df["stoch_k"] = stoch.stoch()
-    df["stoch_d"] = stoch.stoch_signal()
-
-    adx = ADXIndicator(high=df["high"], low=df["low"], close=df["close"], window=14)
-    df["adx"] = adx.adx()
-
-    df["cci"] = CCIIndicator(high=df["high"], low=df["low"], close=df["close"], window=20).cci()
-
-    df["sma_20"] = SMAIndicator(close=df["close"], window=20).sma_indicator()
-    df["ema_20"] = EMAIndicator(close=df["close"], window=20).ema_indicator()
-    df["wma_20"] = WMAIndicator(close=df["close"], window=20).wma()
-
-    bb = BollingerBands(close=df["close"], window=20, window_dev=2)
-    df["bb_upper"] = bb.bollinger_hband()
-    df["bb_middle"] = bb.bollinger_mavg()
-    df["bb_lower"] = bb.bollinger_lband()
-
-    if "volume" in df.columns:
-        df["vol_sma_20"] = SMAIndicator(close=df["volume"], window=20).sma_indicator()
-    else:
-        df["vol_sma_20"] = pd.NA
-
-    return df
-
+def compute_indicators(
+    df: pd.DataFrame,
+    columns: Optional[Iterable[str]] = None,
+    latest_only: bool = False,
+) -> pd.DataFrame:
+    """
+    Candles with indicator columns added. `columns` limits the work to
+    those indicators (default: all of kernels.COLUMNS); with latest_only
+    only the last row is filled in, which lets windowed indicators skip
+    all but the trailing candles.
+    """
+    with stage("indicators:prepare"):
+        df = df.copy()
+        df = _ensure_numeric(df)
+        df = df.dropna(subset=["high", "low", "close"])
+
+        columns = kernels.COLUMNS if columns is None else tuple(columns)
+        arrays = {
+            name: df[name].to_numpy(dtype=float)
+            for name in kernels.PRICE_COLUMNS
+            if name in df.columns
+        }
+
+    # e.g. vol_sma_20 without a volume column
+    available = [c for c in columns if kernels.price_inputs([c]) <= arrays.keys()]
+    result = kernels.compute(arrays, available, last=1 if latest_only else None)
+    for col in columns:
+        if col not in result:
+            result[col] = pd.NA
+
+    # One block instead of a column insert per indicator
+    with stage("indicators:assemble"):
+        df = df.drop(columns=[c for c in result if c in df.columns])
+        return pd.concat([df, pd.DataFrame(result, index=df.index)], axis=1)
@@ -1,5 +1,10 @@
-from app.indicators.service import SignalEngine
-from app.indicators.strategies import (
+import json
+import os
+from typing import Any, Dict, List
+
+from .service import SignalEngine
+from .strategies import (
+    STRATEGIES,
     RSISignal,
     MACDSignal,
     StochasticSignal,
@@ -10,15 +15,58 @@ from app.indicators.strategies import (
     VolumeSMASignal,
 )
 
-DEFAULT_SIGNAL_ENGINE = SignalEngine(strategies=[
-    RSISignal(),
-    MACDSignal(),
-    StochasticSignal(),
-    ADXSignal(),
-    CCISignal(),
-    MASignal("SMA (20)", "sma_20"),
-    MASignal("EMA (20)", "ema_20"),
-    MASignal("WMA (20)", "wma_20"),
-    BollingerSignal(),
-    VolumeSMASignal(),
-])
+__all__ = [
+    "DEFAULT_SIGNAL_ENGINE",
+    "DEFAULT_STRATEGIES",
+    "STRATEGIES",
+    "SignalEngine",
+    "build_engine",
+    "RSISignal",
+    "MACDSignal",
+    "StochasticSignal",
+    "ADXSignal",
+    "CCISignal",
+    "MASignal",
+    "BollingerSignal",
+    "VolumeSMASignal",
+]
+
+# [{"strategy": class name, "params": {constructor arguments}}, ...]
+DEFAULT_STRATEGIES: List[Dict[str, Any]] = [
+    {"strategy": "RSISignal", "params": {}},
+    {"strategy": "MACDSignal", "params": {}},
+    {"strategy": "StochasticSignal", "params": {}},
+    {"strategy": "ADXSignal", "params": {}},
+    {"strategy": "CCISignal", "params": {}},
+    {"strategy": "MASignal", "params": {"kind": "sma", "window": 20}},
+    {"strategy": "MASignal", "params": {"kind": "ema", "window": 20}},
+    {"strategy": "MASignal", "params": {"kind": "wma", "window": 20}},
+    {"strategy": "BollingerSignal", "params": {}},
+    {"strategy": "VolumeSMASignal", "params": {}},
+]
+
+
+def build_engine(config: List[Dict[str, Any]]) -> SignalEngine:
+    """SignalEngine from a strategy list like DEFAULT_STRATEGIES."""
+    strategies = []
+    for entry in config:
+        cls = STRATEGIES.get(entry["strategy"])
+        if cls is None:
+            raise ValueError(f"Unknown strategy {entry['strategy']!r}")
+        strategies.append(cls(**entry.get("params", {})))
+    return SignalEngine(strategies=strategies)
+
+
+def _load_strategies() -> List[Dict[str, Any]]:
+    # SIGNALS_STRATEGIES: a JSON file in the DEFAULT_STRATEGIES format, e.g.
+    # the --save-best output of app.sweep. Streaming snapshots only keep the
+    # default indicator columns current, so strategies on other windows
+    # read N/A there.
+    path = os.getenv("SIGNALS_STRATEGIES")
+    if not path:
+        return DEFAULT_STRATEGIES
+    with open(path) as f:
+        return json.load(f)
+
+
+DEFAULT_SIGNAL_ENGINE = build_engine(_load_strategies())
@@ -1,9 +1,26 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+import numpy as np
 import pandas as pd
 
+# Vectorized signal columns hold these codes; SIGNAL_LABELS[code] is the
+# signal string (N/A, BUY, SELL, HOLD).
+CODE_NA, CODE_BUY, CODE_SELL, CODE_HOLD = 0, 1, 2, 3
+SIGNAL_LABELS = np.array(["N/A", "BUY", "SELL", "HOLD"], dtype=object)
+SIGNAL_CODES = {label: code for code, label in enumerate(SIGNAL_LABELS)}
+
+
+def signal_codes(missing, buy, sell, hold=None) -> np.ndarray:
+    """
+    Code column from boolean columns: N/A where `missing`, then HOLD where
+    `hold`, then BUY / SELL, HOLD otherwise (the order compute() checks in).
+    """
+    conditions = [missing] + ([] if hold is None else [hold]) + [buy, sell]
+    choices = [CODE_NA] + ([] if hold is None else [CODE_HOLD]) + [CODE_BUY, CODE_SELL]
+    return np.select(conditions, choices, default=CODE_HOLD).astype(np.int8)
+
 
 class SignalStrategy(ABC):
     """
@@ -11,6 +28,14 @@ class SignalStrategy(ABC):
     and computed indicator values.
     """
 
+    # Indicator columns compute() reads from `values`; the engine only
+    # computes these (see kernels.INDICATORS for the available columns).
+    requires: Tuple[str, ...] = ()
+
+    # Constructor arguments (thresholds, windows); part of the engine's
+    # config_key and what build_engine() takes back.
+    params: Dict[str, Any] = {}
+
     @property
     @abstractmethod
     def label(self) -> str:
@@ -21,3 +46,17 @@ class SignalStrategy(ABC):
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
         """Return one of: BUY / SELL / HOLD / N/A"""
         raise NotImplementedError
+
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        compute() for every row at once: price and indicator columns in,
+        int8 signal codes out. The default calls compute() row by row;
+        strategies override it with NumPy expressions.
+        """
+        n = len(prices["close"])
+        out = np.empty(n, dtype=np.int8)
+        for i in range(n):
+            latest = pd.Series({k: v[i] for k, v in prices.items()})
+            row = {k: v[i] for k, v in values.items()}
+            out[i] = SIGNAL_CODES.get(self.compute(latest, row), CODE_NA)
+        return out
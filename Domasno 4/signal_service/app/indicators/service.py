@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+import numpy as np
 import pandas as pd
 
-from app.indicators.base import SignalStrategy
+from ..metrics import stage
+from .base import CODE_BUY, CODE_HOLD, CODE_NA, CODE_SELL, SIGNAL_LABELS, SignalStrategy
 
 SIGNAL_NA = "N/A"
 SIGNAL_BUY = "BUY"
@@ -30,11 +32,42 @@ def majority_vote(signals: List[str]) -> str:
     return SIGNAL_HOLD
 
 
+def majority_vote_codes(codes: np.ndarray) -> np.ndarray:
+    """majority_vote over axis 0 of a (strategies, ...) array of signal codes."""
+    buy = (codes == CODE_BUY).sum(axis=0)
+    sell = (codes == CODE_SELL).sum(axis=0)
+    hold = (codes == CODE_HOLD).sum(axis=0)
+
+    out = np.full(codes.shape[1:], CODE_HOLD, dtype=np.int8)
+    out[(buy > sell) & (buy > hold)] = CODE_BUY
+    out[(sell > buy) & (sell > hold)] = CODE_SELL
+    out[buy + sell + hold == 0] = CODE_NA
+    return out
+
+
 class SignalEngine:
     """Runs registered SignalStrategy objects to produce signals + overall vote."""
     def __init__(self, strategies: List[SignalStrategy]):
         self._strategies = strategies
 
+        # Union of what the strategies read, in first-use order
+        self.required_columns = tuple(dict.fromkeys(
+            col for strategy in strategies for col in strategy.requires
+        ))
+
+    @property
+    def config_key(self) -> str:
+        """Identifies the strategy set, e.g. for caching its results."""
+        return "|".join(
+            f"{type(s).__name__}:{s.label}:{','.join(s.requires)}:{sorted(s.params.items())}"
+            for s in self._strategies
+        )
+
+    @property
+    def config(self) -> List[Dict[str, Any]]:
+        """The strategies as build_engine() takes them."""
+        return [{"strategy": type(s).__name__, "params": dict(s.params)} for s in self._strategies]
+
     def build_snapshot(self, df: pd.DataFrame) -> Dict[str, Any]:
         if df is None or df.empty:
             return {"values": {}, "signals": {}, "overall": SIGNAL_NA, "latest": {}}
@@ -50,27 +83,51 @@ class SignalEngine:
             "volume": last.get("volume"),
         }
 
-        # Values used by strategies (same keys as your current implementation)
-        values = {
-            "rsi": last.get("rsi"),
-            "macd": last.get("macd"),
-            "macd_signal": last.get("macd_signal"),
-            "stoch_k": last.get("stoch_k"),
-            "stoch_d": last.get("stoch_d"),
-            "adx": last.get("adx"),
-            "cci": last.get("cci"),
-            "sma_20": last.get("sma_20"),
-            "ema_20": last.get("ema_20"),
-            "wma_20": last.get("wma_20"),
-            "bb_lower": last.get("bb_lower"),
-            "bb_upper": last.get("bb_upper"),
-            "vol_sma_20": last.get("vol_sma_20"),
-        }
+        # Values used by strategies
+        values = {col: last.get(col) for col in self.required_columns}
 
-        signals: Dict[str, str] = {
-            strategy.label: strategy.compute(last, values)
-            for strategy in self._strategies
-        }
+        signals: Dict[str, str] = {}
+        for strategy in self._strategies:
+            with stage("strategy:" + strategy.label):
+                signals[strategy.label] = strategy.compute(last, values)
 
         overall = majority_vote(list(signals.values()))
         return {"latest": latest, "values": values, "signals": signals, "overall": overall}
+
+    def evaluate(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Vectorized signals for every row: ({label: codes}, overall codes)
+        from price and indicator columns (see base.SIGNAL_LABELS).
+        """
+        signals = {}
+        for strategy in self._strategies:
+            with stage("strategy:" + strategy.label):
+                signals[strategy.label] = strategy.compute_series(prices, values)
+        if not signals:
+            return signals, np.full(len(prices["close"]), CODE_NA, dtype=np.int8)
+
+        overall = majority_vote_codes(np.stack(list(signals.values())))
+        return signals, overall
+
+    def build_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Signal of every strategy plus the overall vote for every row of a
+        DataFrame with indicator columns (see compute_indicators).
+        """
+        prices = {
+            col: _column(df, col)
+            for col in ("open", "high", "low", "close", "volume")
+        }
+        values = {col: _column(df, col) for col in self.required_columns}
+        signals, overall = self.evaluate(prices, values)
+
+        out = {"date": df["date"].to_numpy()} if "date" in df.columns else {}
+        out.update({label: SIGNAL_LABELS[codes] for label, codes in signals.items()})
+        out["overall"] = SIGNAL_LABELS[overall]
+        return pd.DataFrame(out, index=df.index)
+
+
+def _column(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[col].to_numpy(dtype=float, na_value=np.nan)
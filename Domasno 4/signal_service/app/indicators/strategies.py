@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import numpy as np
 import pandas as pd
 
-from app.indicators.base import SignalStrategy
+from .base import SignalStrategy, signal_codes
 
 SIGNAL_NA = "N/A"
 SIGNAL_BUY = "BUY"
@@ -16,30 +17,54 @@ def any_missing(*vals) -> bool:
     return any(pd.isna(v) for v in vals)
 
 
+def _column(name: str, default: tuple, *params) -> str:
+    # Default parameters keep the plain column name (rsi, stoch_k, ...)
+    if params == default:
+        return name
+    return "_".join([name, *(f"{p:g}" if isinstance(p, float) else str(p) for p in params)])
+
+
 class RSISignal(SignalStrategy):
+    def __init__(self, window: int = 14, oversold: float = 30, overbought: float = 70):
+        self.params = {"window": window, "oversold": oversold, "overbought": overbought}
+        self._rsi = _column("rsi", (14,), window)
+        self.requires = (self._rsi,)
+
     @property
     def label(self) -> str:
-        return "RSI (14)"
+        return f"RSI ({self.params['window']})"
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
-        rsi = values.get("rsi")
+        rsi = values.get(self._rsi)
         if pd.isna(rsi):
             return SIGNAL_NA
-        if rsi < 30:
+        if rsi < self.params["oversold"]:
             return SIGNAL_BUY
-        if rsi > 70:
+        if rsi > self.params["overbought"]:
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        rsi = values[self._rsi]
+        return signal_codes(np.isnan(rsi), buy=rsi < self.params["oversold"], sell=rsi > self.params["overbought"])
+
 
 class MACDSignal(SignalStrategy):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.params = {"fast": fast, "slow": slow, "signal": signal}
+        self._macd = _column("macd", (12, 26, 9), fast, slow, signal)
+        self._signal = _column("macd_signal", (12, 26, 9), fast, slow, signal)
+        self.requires = (self._macd, self._signal)
+
     @property
     def label(self) -> str:
-        return "MACD"
+        if (self.params["fast"], self.params["slow"], self.params["signal"]) == (12, 26, 9):
+            return "MACD"
+        return "MACD ({fast}, {slow}, {signal})".format(**self.params)
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
-        macd = values.get("macd")
-        macd_signal = values.get("macd_signal")
+        macd = values.get(self._macd)
+        macd_signal = values.get(self._signal)
         if any_missing(macd, macd_signal):
             return SIGNAL_NA
         if macd > macd_signal:
@@ -48,36 +73,64 @@ class MACDSignal(SignalStrategy):
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        macd, macd_signal = values[self._macd], values[self._signal]
+        missing = np.isnan(macd) | np.isnan(macd_signal)
+        return signal_codes(missing, buy=macd > macd_signal, sell=macd < macd_signal)
+
 
 class StochasticSignal(SignalStrategy):
+    def __init__(self, window: int = 14, smooth: int = 3, oversold: float = 20, overbought: float = 80):
+        self.params = {"window": window, "smooth": smooth, "oversold": oversold, "overbought": overbought}
+        self._k = _column("stoch_k", (14, 3), window, smooth)
+        self._d = _column("stoch_d", (14, 3), window, smooth)
+        self.requires = (self._k, self._d)
+
     @property
     def label(self) -> str:
-        return "Stochastic Oscillator"
+        if (self.params["window"], self.params["smooth"]) == (14, 3):
+            return "Stochastic Oscillator"
+        return "Stochastic Oscillator ({window}, {smooth})".format(**self.params)
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
-        k = values.get("stoch_k")
-        d = values.get("stoch_d")
+        k = values.get(self._k)
+        d = values.get(self._d)
+        low, high = self.params["oversold"], self.params["overbought"]
         if any_missing(k, d):
             return SIGNAL_NA
-        if k < 20 and d < 20:
+        if k < low and d < low:
             return SIGNAL_BUY
-        if k > 80 and d > 80:
+        if k > high and d > high:
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        k, d = values[self._k], values[self._d]
+        low, high = self.params["oversold"], self.params["overbought"]
+        missing = np.isnan(k) | np.isnan(d)
+        return signal_codes(missing, buy=(k < low) & (d < low), sell=(k > high) & (d > high))
+
 
 class ADXSignal(SignalStrategy):
+    """Trend direction from close vs SMA, only when ADX shows a trend."""
+
+    def __init__(self, window: int = 14, trend: float = 20, ma_window: int = 20):
+        self.params = {"window": window, "trend": trend, "ma_window": ma_window}
+        self._adx = _column("adx", (14,), window)
+        self._sma = f"sma_{ma_window}"
+        self.requires = (self._adx, self._sma)
+
     @property
     def label(self) -> str:
-        return "ADX (14)"
+        return f"ADX ({self.params['window']})"
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
-        adx = values.get("adx")
+        adx = values.get(self._adx)
         close = latest.get("close")
-        sma20 = values.get("sma_20")
+        sma20 = values.get(self._sma)
         if any_missing(adx, close, sma20):
             return SIGNAL_NA
-        if adx < 20:
+        if adx < self.params["trend"]:
             return SIGNAL_HOLD
         if close > sma20:
             return SIGNAL_BUY
@@ -85,31 +138,54 @@ class ADXSignal(SignalStrategy):
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        adx, close, sma20 = values[self._adx], prices["close"], values[self._sma]
+        missing = np.isnan(adx) | np.isnan(close) | np.isnan(sma20)
+        return signal_codes(missing, hold=adx < self.params["trend"], buy=close > sma20, sell=close < sma20)
+
 
 class CCISignal(SignalStrategy):
+    def __init__(self, window: int = 20, threshold: float = 100):
+        self.params = {"window": window, "threshold": threshold}
+        self._cci = _column("cci", (20,), window)
+        self.requires = (self._cci,)
+
     @property
     def label(self) -> str:
-        return "CCI (20)"
+        return f"CCI ({self.params['window']})"
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
-        cci = values.get("cci")
+        cci = values.get(self._cci)
+        threshold = self.params["threshold"]
         if pd.isna(cci):
             return SIGNAL_NA
-        if cci < -100:
+        if cci < -threshold:
             return SIGNAL_BUY
-        if cci > 100:
+        if cci > threshold:
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        cci = values[self._cci]
+        threshold = self.params["threshold"]
+        return signal_codes(np.isnan(cci), buy=cci < -threshold, sell=cci > threshold)
+
 
 class MASignal(SignalStrategy):
     """
     Reusable MA comparison strategy.
-    Example: MASignal("SMA (20)", "sma_20")
+    Example: MASignal(kind="ema", window=50), or with an explicit column
+    MASignal("SMA (20)", "sma_20")
     """
-    def __init__(self, label: str, ma_key: str):
-        self._label = label
+    def __init__(self, label: Optional[str] = None, ma_key: Optional[str] = None, kind: str = "sma", window: int = 20):
+        if ma_key is None:
+            self.params = {"kind": kind, "window": window}
+            ma_key = f"{kind}_{window}"
+        else:
+            self.params = {"label": label, "ma_key": ma_key}
+        self._label = label or f"{kind.upper()} ({window})"
         self._ma_key = ma_key
+        self.requires = (ma_key,)
 
     @property
     def label(self) -> str:
@@ -126,16 +202,29 @@ class MASignal(SignalStrategy):
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        price, ma = prices["close"], values[self._ma_key]
+        missing = np.isnan(price) | np.isnan(ma)
+        return signal_codes(missing, buy=price > ma, sell=price < ma)
+
 
 class BollingerSignal(SignalStrategy):
+    def __init__(self, window: int = 20, deviations: float = 2):
+        self.params = {"window": window, "deviations": deviations}
+        self._lower = _column("bb_lower", (20, 2), window, deviations)
+        self._upper = _column("bb_upper", (20, 2), window, deviations)
+        self.requires = (self._lower, self._upper)
+
     @property
     def label(self) -> str:
-        return "Bollinger Bands"
+        if (self.params["window"], self.params["deviations"]) == (20, 2):
+            return "Bollinger Bands"
+        return "Bollinger Bands ({window}, {deviations})".format(**self.params)
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
         close = latest.get("close")
-        lower = values.get("bb_lower")
-        upper = values.get("bb_upper")
+        lower = values.get(self._lower)
+        upper = values.get(self._upper)
         if any_missing(close, lower, upper):
             return SIGNAL_NA
         if close < lower:
@@ -144,15 +233,25 @@ class BollingerSignal(SignalStrategy):
             return SIGNAL_SELL
         return SIGNAL_HOLD
 
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        close, lower, upper = prices["close"], values[self._lower], values[self._upper]
+        missing = np.isnan(close) | np.isnan(lower) | np.isnan(upper)
+        return signal_codes(missing, buy=close < lower, sell=close > upper)
+
 
 class VolumeSMASignal(SignalStrategy):
+    def __init__(self, window: int = 20):
+        self.params = {"window": window}
+        self._vol_sma = f"vol_sma_{window}"
+        self.requires = (self._vol_sma,)
+
     @property
     def label(self) -> str:
-        return "Volume SMA (20)"
+        return f"Volume SMA ({self.params['window']})"
 
     def compute(self, latest: pd.Series, values: Dict[str, Any]) -> str:
         volume = latest.get("volume")
-        vol_sma = values.get("vol_sma_20")
+        vol_sma = values.get(self._vol_sma)
         if any_missing(volume, vol_sma):
             return SIGNAL_NA
         if volume > vol_sma:
@@ -160,3 +259,18 @@ class VolumeSMASignal(SignalStrategy):
         if volume < vol_sma:
             return SIGNAL_SELL
         return SIGNAL_HOLD
+
+    def compute_series(self, prices: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        volume, vol_sma = prices["volume"], values[self._vol_sma]
+        missing = np.isnan(volume) | np.isnan(vol_sma)
+        return signal_codes(missing, buy=volume > vol_sma, sell=volume < vol_sma)
+
+
+# By class name, for engines built from a config (see build_engine)
+STRATEGIES = {
+    cls.__name__: cls
+    for cls in (
+        RSISignal, MACDSignal, StochasticSignal, ADXSignal, CCISignal,
+        MASignal, BollingerSignal, VolumeSMASignal,
+    )
+}
@@ -0,0 +1,374 @@
+"""
+NumPy indicator kernels.
+
+Every function takes float arrays with time on the last axis, so the same
+code handles one series (n,) or a stack of series (k, n). Results match the
+`ta` library (the previous implementation) to floating point tolerance,
+including its warm-up behaviour: NaN until the window is full, and ADX
+reported as 0 before its first full smoothing window.
+
+Windowed indicators (SMA, WMA, Bollinger, CCI, stochastic) are computed
+from sliding-window views, so series sharing an input share the window.
+Recursive ones (EMA, Wilder smoothing) use pandas' compiled ewm, since
+NumPy has no recursive filter primitive.
+
+Indicators with other parameters than the defaults are columns named
+with their parameters (rsi_21, sma_50, bb_upper_20_2.5, see parametric()).
+
+compute() evaluates a set of columns through the INDICATORS graph: only
+the requested indicators and their dependencies run, and windowed ones
+only over the trailing candles the requested values depend on.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .metrics import stage
+
+
+def windows(x: np.ndarray, window: int) -> np.ndarray:
+    """(..., n) -> (..., n - window + 1, window) view of trailing windows."""
+    if x.shape[-1] < window:
+        return np.empty(x.shape[:-1] + (0, window))
+    return sliding_window_view(x, window, axis=-1)
+
+
+def _pad_front(values: np.ndarray, n: int) -> np.ndarray:
+    """Left-pad the last axis with NaN up to length n."""
+    pad = n - values.shape[-1]
+    if pad <= 0:
+        return values
+    out = np.full(values.shape[:-1] + (n,), np.nan)
+    out[..., pad:] = values
+    return out
+
+
+def ewm(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    pandas ewm(alpha, adjust=False, min_periods).mean() along the last axis.
+    Each row starts at its own first non-NaN value.
+    """
+    x = np.asarray(x, dtype=float)
+    flat = x.reshape(-1, x.shape[-1])
+    out = pd.DataFrame(flat.T).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+    return out.to_numpy().T.reshape(x.shape)
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    return ewm(x, 2.0 / (span + 1), min_periods=span)
+
+
+def rolling_mean(win: np.ndarray, n: int) -> np.ndarray:
+    return _pad_front(win.mean(axis=-1), n)
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_mean(windows(x, window), x.shape[-1])
+
+
+def wma(win: np.ndarray, n: int) -> np.ndarray:
+    window = win.shape[-1]
+    weights = np.arange(1, window + 1) * 2.0 / (window * (window + 1))
+    return _pad_front(win @ weights, n)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    diff = np.diff(close, axis=-1, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    # Keep leading padding (stacked series) out of the averages
+    missing = np.isnan(close)
+    up[missing] = np.nan
+    down[missing] = np.nan
+
+    avg = ewm(np.stack([up, down]), 1.0 / window, min_periods=window)
+    avg_up, avg_down = avg[0], avg[1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+    return np.where(avg_down == 0, 100.0, out)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def stochastic(high, low, close, window: int = 14, smooth: int = 3):
+    n = close.shape[-1]
+    lowest = _pad_front(windows(low, window).min(axis=-1), n)
+    highest = _pad_front(windows(high, window).max(axis=-1), n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100.0 * (close - lowest) / (highest - lowest)
+    return k, sma(k, smooth)
+
+
+def true_range(high, low, close) -> np.ndarray:
+    prev_close = np.roll(close, 1, axis=-1)
+    prev_close[..., 0] = np.nan
+    return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+
+def first_valid(x: np.ndarray) -> np.ndarray:
+    """Index of the first non-NaN value along the last axis (n if none)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=-1), valid.argmax(axis=-1), x.shape[-1])
+
+
+def _wilder(x: np.ndarray, window: int, offset: np.ndarray) -> np.ndarray:
+    """
+    Wilder smoothing (alpha = 1 / window) seeded at index `offset` (per
+    row) with the mean of the `window` values ending there; NaN before.
+    """
+    n = x.shape[-1]
+    offset = np.broadcast_to(offset, x.shape[:-1])
+    idx = np.arange(n)
+
+    seed_at = np.minimum(offset, n - 1)[..., None]
+    win_means = _pad_front(windows(x, window).mean(axis=-1), n)
+    seed = np.take_along_axis(win_means, seed_at, axis=-1)
+
+    seeded = np.where(idx > offset[..., None], x, np.nan)
+    seeded = np.where(idx == offset[..., None], seed, seeded)
+    return ewm(seeded, 1.0 / window)
+
+
+def adx(high, low, close, window: int = 14, tr: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    ADX as computed by ta.trend.ADXIndicator: 0 until 2 * window - 1
+    candles after the first one.
+    """
+    start = first_valid(close)
+    if tr is None:
+        tr = true_range(high, low, close)
+
+    up = np.diff(high, axis=-1, prepend=np.nan)
+    down = -np.diff(low, axis=-1, prepend=np.nan)
+    pos = np.where((up > down) & (up > 0), up, 0.0)
+    neg = np.where((down > up) & (down > 0), down, 0.0)
+
+    # Smoothed TR, +DM and -DM in one pass, seeded `window` candles in
+    smoothed = _wilder(np.stack([tr, pos, neg]), window, start + window)
+    s_tr, s_pos, s_neg = smoothed[0], smoothed[1], smoothed[2]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_pos = np.where(s_tr != 0, 100.0 * s_pos / s_tr, 0.0)
+        di_neg = np.where(s_tr != 0, 100.0 * s_neg / s_tr, 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100.0 * np.abs(di_pos - di_neg) / di_sum, 0.0)
+
+    out = _wilder(dx, window, start + 2 * window - 1)
+    out = np.where(np.isnan(out), 0.0, out)
+    return np.where(np.isnan(close), np.nan, out)
+
+
+def cci(high, low, close, window: int = 20, constant: float = 0.015) -> np.ndarray:
+    n = close.shape[-1]
+    typical = (high + low + close) / 3.0
+    win = windows(typical, window)
+
+    mean = win.mean(axis=-1)
+    mad = np.abs(win - mean[..., None]).mean(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (typical - _pad_front(mean, n)) / (constant * _pad_front(mad, n))
+
+
+def bollinger(close, mean, window: int = 20, window_dev: float = 2):
+    std = _pad_front(windows(close, window).std(axis=-1), close.shape[-1])
+    return mean + window_dev * std, mean, mean - window_dev * std
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """
+    One node of the indicator graph. `inputs` are price columns or columns
+    of other indicators; `window` is how many input values one output value
+    depends on (None: the whole history, for recursive indicators).
+    """
+    name: str
+    columns: Tuple[str, ...]
+    inputs: Tuple[str, ...]
+    fn: Callable
+    window: Optional[int]
+
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+HLC = ("high", "low", "close")
+
+INDICATORS = [
+    Indicator("rsi", ("rsi",), ("close",), lambda c: rsi(c, 14), None),
+    Indicator("macd", ("macd", "macd_signal", "macd_hist"), ("close",), macd, None),
+    Indicator("stoch", ("stoch_k", "stoch_d"), HLC, lambda h, l, c: stochastic(h, l, c, 14, 3), 14 + 3 - 1),
+    Indicator("true_range", ("true_range",), HLC, true_range, 2),
+    Indicator("adx", ("adx",), HLC + ("true_range",), lambda h, l, c, tr: adx(h, l, c, 14, tr=tr), None),
+    Indicator("cci", ("cci",), HLC, lambda h, l, c: cci(h, l, c, 20), 20),
+    Indicator("sma_20", ("sma_20",), ("close",), lambda c: sma(c, 20), 20),
+    Indicator("ema_20", ("ema_20",), ("close",), lambda c: ema(c, 20), None),
+    Indicator("wma_20", ("wma_20",), ("close",), lambda c: wma(windows(c, 20), c.shape[-1]), 20),
+    Indicator("bollinger", ("bb_upper", "bb_middle", "bb_lower"), ("close", "sma_20"), bollinger, 20),
+    Indicator("vol_sma_20", ("vol_sma_20",), ("volume",), lambda v: sma(v, 20), 20),
+]
+
+_BY_COLUMN = {col: ind for ind in INDICATORS for col in ind.columns}
+
+# Other parameters are spelled into the column name, e.g. rsi_21, sma_50,
+# stoch_k_21_5, macd_signal_8_21_5, bb_upper_20_2.5 (see parametric()).
+_PARAMETRIC = (
+    re.compile(r"^(rsi|cci|adx|sma|ema|wma|vol_sma)_(\d+)$"),
+    re.compile(r"^stoch_([kd])_(\d+)_(\d+)$"),
+    re.compile(r"^(macd|macd_signal|macd_hist)_(\d+)_(\d+)_(\d+)$"),
+    re.compile(r"^bb_(upper|middle|lower)_(\d+)_(\d+(?:\.\d+)?)$"),
+)
+
+# Columns of compute_indicators (true_range is internal to ADX)
+COLUMNS = (
+    "rsi", "macd", "macd_signal", "macd_hist", "stoch_k", "stoch_d", "adx",
+    "cci", "sma_20", "ema_20", "wma_20", "bb_upper", "bb_middle", "bb_lower",
+    "vol_sma_20",
+)
+
+
+def parametric(col: str) -> Optional[Indicator]:
+    """
+    Indicator for a column with its parameters in the name (None if the
+    name is not one). Created once and then looked up like the defaults.
+    """
+    if col in _BY_COLUMN:
+        return _BY_COLUMN[col]
+
+    match = next((m for m in (p.match(col) for p in _PARAMETRIC) if m), None)
+    if match is None:
+        return None
+
+    kind, *params = match.groups()
+    if match.re is _PARAMETRIC[0]:
+        w = int(params[0])
+        if w < 2:
+            return None
+        ind = {
+            "rsi": lambda: Indicator(col, (col,), ("close",), lambda c: rsi(c, w), None),
+            "cci": lambda: Indicator(col, (col,), HLC, lambda h, l, c: cci(h, l, c, w), w),
+            "adx": lambda: Indicator(col, (col,), HLC + ("true_range",), lambda h, l, c, tr: adx(h, l, c, w, tr=tr), None),
+            "sma": lambda: Indicator(col, (col,), ("close",), lambda c: sma(c, w), w),
+            "ema": lambda: Indicator(col, (col,), ("close",), lambda c: ema(c, w), None),
+            "wma": lambda: Indicator(col, (col,), ("close",), lambda c: wma(windows(c, w), c.shape[-1]), w),
+            "vol_sma": lambda: Indicator(col, (col,), ("volume",), lambda v: sma(v, w), w),
+        }[kind]()
+    elif match.re is _PARAMETRIC[1]:
+        w, smooth = int(params[0]), int(params[1])
+        ind = Indicator(
+            f"stoch_{w}_{smooth}", (f"stoch_k_{w}_{smooth}", f"stoch_d_{w}_{smooth}"), HLC,
+            lambda h, l, c: stochastic(h, l, c, w, smooth), w + smooth - 1,
+        )
+    elif match.re is _PARAMETRIC[2]:
+        fast, slow, signal = (int(p) for p in params)
+        suffix = f"{fast}_{slow}_{signal}"
+        ind = Indicator(
+            f"macd_{suffix}", (f"macd_{suffix}", f"macd_signal_{suffix}", f"macd_hist_{suffix}"), ("close",),
+            lambda c: macd(c, fast, slow, signal), None,
+        )
+    else:
+        w, dev = int(params[0]), params[1]
+        suffix = f"{w}_{dev}"
+        ind = Indicator(
+            f"bollinger_{suffix}", (f"bb_upper_{suffix}", f"bb_middle_{suffix}", f"bb_lower_{suffix}"),
+            ("close", f"sma_{w}"), lambda c, m: bollinger(c, m, w, float(dev)), w,
+        )
+
+    for column in ind.columns:
+        _BY_COLUMN.setdefault(column, ind)
+    return ind
+
+
+def resolve(columns: Iterable[str]) -> List[Indicator]:
+    """Indicators needed for `columns`, dependencies first."""
+    order: List[Indicator] = []
+    seen = set()
+
+    def visit(col):
+        if col in PRICE_COLUMNS:
+            return
+        ind = _BY_COLUMN.get(col) or parametric(col)
+        if ind is None:
+            raise KeyError(f"Unknown indicator column: {col}")
+        if ind.name in seen:
+            return
+        seen.add(ind.name)
+        for dep in ind.inputs:
+            visit(dep)
+        order.append(ind)
+
+    for col in columns:
+        visit(col)
+    return order
+
+
+def price_inputs(columns: Iterable[str]) -> set:
+    """Price columns the given indicator columns are computed from."""
+    return {c for ind in resolve(columns) for c in ind.inputs if c in PRICE_COLUMNS}
+
+
+def _input_lengths(order: List[Indicator], columns, n: int, last: int) -> Dict[str, int]:
+    """
+    Trailing input length each indicator must run over so that its last
+    `needed` values are exact, walking from the requested columns down to
+    their dependencies.
+    """
+    wanted = set(columns)
+    needed = {ind.name: last for ind in order if wanted.intersection(ind.columns)}
+    lengths = {}
+
+    for ind in reversed(order):
+        k = needed.get(ind.name, 0)
+        length = n if ind.window is None else min(n, k + ind.window - 1)
+        lengths[ind.name] = length
+
+        for dep in ind.inputs:
+            if dep in _BY_COLUMN:
+                name = _BY_COLUMN[dep].name
+                needed[name] = max(needed.get(name, 0), length)
+
+    return lengths
+
+
+def compute(
+    arrays: Dict[str, np.ndarray],
+    columns: Iterable[str] = COLUMNS,
+    last: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Indicator columns from price arrays ({"high": ..., "close": ...}).
+
+    With `last`, only the trailing `last` values of each column are needed:
+    windowed indicators then run over just the candles those values depend
+    on, and everything before is NaN. Every column has the input length.
+    """
+    columns = tuple(columns)
+    order = resolve(columns)
+    n = arrays["close"].shape[-1]
+    if n == 0:
+        return {col: np.empty(arrays["close"].shape) for col in columns}
+    last = n if last is None else max(1, min(last, n))
+
+    lengths = _input_lengths(order, columns, n, last)
+    values: Dict[str, np.ndarray] = dict(arrays)
+
+    for ind in order:
+        length = lengths[ind.name]
+        with stage("indicator:" + ind.name):
+            result = ind.fn(*(values[c][..., values[c].shape[-1] - length:] for c in ind.inputs))
+        if len(ind.columns) == 1:
+            result = (result,)
+        values.update(zip(ind.columns, result))
+
+    return {col: _pad_front(values[col][..., -last:], n) for col in columns}
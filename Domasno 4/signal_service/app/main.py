@@ -1,12 +1,70 @@
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
-from typing import List, Optional
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+import orjson
 import pandas as pd
 
+from app import encoding, metrics, pool, tasks, wire
+from app.candle_source import CandleSourceError, StoreCandles, from_env as candle_source_from_env
+from app.compute import candles_frame, columns_frame, timeframe_window
 from app.indicators import DEFAULT_SIGNAL_ENGINE
-from app.indicator_calculator import compute_indicators
+from app.response_cache import ResponseCache
+from app.streaming import StateStore, StaleCandle, StreamState
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool.start_pool()
+    yield
+    pool.shutdown_pool()
+    await candle_source.close()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON rendered with app.encoding (orjson; NaN -> null)."""
+
+    def render(self, content: Any) -> bytes:
+        return encoding.dumps(content)
+
+
+app = FastAPI(
+    title="Signals Service",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+app.add_middleware(metrics.MetricsMiddleware)
 
-app = FastAPI(title="Signals Service", version="1.0.0")
+# Rendered /signals responses, keyed on the request body
+response_cache = ResponseCache()
+
+metrics.REGISTRY.counter(
+    "signals_response_cache_events_total", "Response cache lookups by outcome.",
+    lambda: {
+        ("hit",): response_cache.hits,
+        ("miss",): response_cache.misses,
+        ("collapsed",): response_cache.collapsed,
+        ("eviction",): response_cache.evictions,
+    },
+    labels=("event",),
+)
+metrics.REGISTRY.gauge("signals_response_cache_entries", "Cached responses.", lambda: response_cache.stats()["entries"])
+metrics.REGISTRY.gauge("signals_response_cache_bytes", "Bytes held by the response cache.", lambda: response_cache.size)
+
+# Candles for the symbol-addressed endpoints: the memory-mapped candle
+# files when CANDLE_STORE_DIR is set, else the ohlcv table
+candle_source = candle_source_from_env()
+
+# Incremental indicator states; persisted when SIGNALS_STATE_DIR is set,
+# which more than one uvicorn worker needs (see app.streaming)
+stream_states = StateStore(os.getenv("SIGNALS_STATE_DIR") or None)
 
 
 class Candle(BaseModel):
@@ -18,9 +76,84 @@ class Candle(BaseModel):
     volume: Optional[float] = None
 
 
-class SignalsRequest(BaseModel):
+Timeframe = Literal["daily", "weekly", "monthly"]
+
+
+class SeriesOptions(BaseModel):
     timeframe: str = Field(default="daily")
+    # Daily candles in, one snapshot per listed timeframe out (resampled here)
+    timeframes: Optional[List[Timeframe]] = None
+
+
+class CandleColumns(BaseModel):
+    """
+    Columnar variant of List[Candle]: one array per field, validated as
+    whole arrays instead of one model per candle.
+    """
+    date: Optional[List[Optional[str]]] = None
+    open: List[float]
+    high: List[float]
+    low: List[float]
+    close: List[float]
+    volume: Optional[List[Optional[float]]] = None
+
+    @model_validator(mode="after")
+    def _same_length(self):
+        n = len(self.close)
+        for name in ("date", "open", "high", "low", "volume"):
+            values = getattr(self, name)
+            if values is not None and len(values) != n:
+                raise ValueError(f"{name} has {len(values)} values, close has {n}")
+        return self
+
+    def columns(self) -> Dict[str, Optional[list]]:
+        return {name: getattr(self, name) for name in ("date", "open", "high", "low", "close", "volume")}
+
+
+class SignalsRequest(SeriesOptions):
+    candles: List[Candle]
+
+
+class SignalsColumnsRequest(SeriesOptions, CandleColumns):
+    pass
+
+
+class SignalsJob(BaseModel):
+    symbol: str
+    timeframe: str = Field(default="daily")
+    timeframes: Optional[List[Timeframe]] = None
+    candles: List[Candle]
+
+    def to_job(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "timeframes": self.timeframes,
+            "candles": [c.model_dump() for c in self.candles],
+        }
+
+
+class SignalsColumnsJob(CandleColumns):
+    symbol: str
+    timeframe: str = Field(default="daily")
+    timeframes: Optional[List[Timeframe]] = None
+
+    def to_job(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "timeframes": self.timeframes,
+            "columns": self.columns(),
+        }
+
+
+class BatchSignalsRequest(BaseModel):
+    jobs: List[Union[SignalsJob, SignalsColumnsJob]]
+
+
+class StreamRequest(BaseModel):
     candles: List[Candle]
+    reset: bool = False
 
 
 @app.get("/health")
@@ -28,16 +161,216 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/signals")
-def signals(req: SignalsRequest):
-    df = pd.DataFrame([c.model_dump() for c in req.candles])
+SERIES_BODY = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "schema": {
+                    "oneOf": [
+                        SignalsRequest.model_json_schema(),
+                        SignalsColumnsRequest.model_json_schema(),
+                    ]
+                }
+            },
+            wire.CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+        "required": True,
+    }
+}
+
+
+def parse_series(content_type: str, body: bytes) -> Tuple[SeriesOptions, pd.DataFrame]:
+    """
+    (options, candles) from the JSON SignalsRequest (a list of candles),
+    the JSON SignalsColumnsRequest (one array per field) or the columnar
+    binary format from app.wire (Content-Type: application/x-ohlcv-columns),
+    whose meta block carries the options.
+    """
+    try:
+        if content_type.startswith(wire.CONTENT_TYPE):
+            with metrics.stage("parse"):
+                try:
+                    meta, df = wire.decode_frame(body)
+                except wire.WireFormatError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                return SeriesOptions.model_validate(meta), df
+
+        with metrics.stage("parse"):
+            try:
+                data = orjson.loads(body)
+            except orjson.JSONDecodeError as e:
+                raise RequestValidationError([
+                    {"type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}", "input": {}}
+                ])
+
+            columnar = isinstance(data, dict) and "candles" not in data
+            req = (SignalsColumnsRequest if columnar else SignalsRequest).model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    with metrics.stage("frame"):
+        if columnar:
+            return req, columns_frame(req.columns())
+        return req, candles_frame([c.model_dump() for c in req.candles])
+
+
+async def cached_series_response(request: Request, route: str, task) -> Response:
+    """
+    task(df, options dict) (an app.tasks function, run in the worker pool) for
+    the series in the request body, served from response_cache when the
+    same series was computed recently.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    body_format = "wire" if content_type.startswith(wire.CONTENT_TYPE) else "json"
+    key = response_cache.key(route, DEFAULT_SIGNAL_ENGINE.config_key, body_format, body)
+
+    async def render():
+        with metrics.collect_stages() as stages:
+            options, df = parse_series(content_type, body)
+        metrics.observe_stages(stages)
+        return await pool.run(task, df, options.model_dump())
+
+    content = await response_cache.get_or_compute(key, render)
+    return Response(content, media_type="application/json")
+
+
+@app.post("/signals", openapi_extra=SERIES_BODY)
+async def signals(request: Request):
+    """
+    Signal snapshot for the latest candle of the series. With
+    "timeframes" the series is daily and the response holds one snapshot
+    per timeframe, resampled here ({"timeframes": {tf: snapshot}});
+    timeframes with fewer than MIN_CANDLES candles are N/A.
+    """
+    return await cached_series_response(request, "signals", tasks.signals)
+
+
+@app.post("/signals/history", openapi_extra=SERIES_BODY)
+async def signals_history(request: Request):
+    """
+    Every strategy's signal and the overall vote for every candle of the
+    series, as columns (for signal charts and backtests).
+    """
+    return await cached_series_response(request, "history", tasks.history)
+
+
+@app.get("/signals/{symbol}")
+async def symbol_signals(symbol: str, timeframe: Timeframe = "daily"):
+    """
+    Snapshot for a symbol from candles the service loads itself: daily
+    candles from the candle store files or the ohlcv table (kept in
+    memory for hot symbols),
+    resampled to `timeframe`, last MAX_CANDLES used (N/A below
+    MIN_CANDLES).
+    """
+    symbol = symbol.upper()
+    try:
+        daily = await candle_source.daily(symbol)
+    except CandleSourceError as e:
+        raise HTTPException(status_code=503, detail=f"Candle store unavailable: {e}")
+
+    if len(daily["date"]) == 0:
+        raise HTTPException(status_code=404, detail=f"No candles for {symbol}")
+
+    # Same candles -> same response: key on the latest date and count
+    key = response_cache.key(
+        "symbol", DEFAULT_SIGNAL_ENGINE.config_key, symbol, timeframe,
+        str(daily["date"][-1]), str(len(daily["date"])),
+    )
 
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    async def render():
+        if isinstance(candle_source, StoreCandles):
+            return await pool.run(
+                tasks.stored_symbol_snapshot, candle_source.store.root, symbol, timeframe, len(daily["date"]),
+            )
+        # Only the days the snapshot reads are pickled over to the worker
+        return await pool.run(tasks.symbol_snapshot, timeframe_window(daily, timeframe), timeframe)
 
-    df = compute_indicators(df)
-    snap = DEFAULT_SIGNAL_ENGINE.build_snapshot(df)
+    content = await response_cache.get_or_compute(key, render)
+    return Response(content, media_type="application/json")
 
-    snap["timeframe"] = req.timeframe
-    snap["candles_used"] = len(df)
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/pool/stats")
+def pool_stats():
+    """Worker pool load: time tasks waited for a worker vs computed."""
+    return pool.stats.to_dict()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus text format: request latency and sizes per route, time per
+    stage (parse, frame, indicator:*, strategy:*, serialize), worker pool
+    queue wait / compute, response cache counters.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/profile", response_class=PlainTextResponse)
+def sampled_profile(sort: Literal["cumulative", "tottime", "calls"] = "cumulative", limit: int = 40, reset: bool = False):
+    """Merged cProfile output of the tasks sampled with SIGNALS_PROFILE_RATE."""
+    report = metrics.profiles.report(limit=limit, sort=sort)
+    if reset:
+        metrics.profiles.clear()
+    return report
+
+
+@app.post("/signals/batch")
+async def signals_batch(req: BatchSignalsRequest):
+    """
+    Many (symbol, timeframe, candles) jobs in one request, spread over the
+    worker processes. Results come back in job order; a failing job gets
+    an "error" key instead of failing the whole batch. A job with
+    "timeframes" sends daily candles and gets {"timeframes": {tf: snapshot}}
+    as on /signals.
+    """
+    jobs = [j.to_job() for j in req.jobs]
+    size = pool.chunksize_for(len(jobs))
+    chunks = await asyncio.gather(*(
+        pool.run(tasks.batch, jobs[i:i + size]) for i in range(0, len(jobs), size)
+    ))
+    return {"results": [result for chunk in chunks for result in chunk]}
+
+
+def _stream_snapshot(state: StreamState, timeframe: Timeframe):
+    snap = state.snapshot()
+    snap["timeframe"] = timeframe
+    snap["candles_used"] = state.count
     return snap
+
+
+@app.post("/signals/stream/{symbol}/{timeframe}")
+def signals_stream(symbol: str, timeframe: Timeframe, req: StreamRequest):
+    """
+    Incremental signals for one series. The first call (or reset=true)
+    sends the history to start from; later calls send only the new
+    candles, or the last one again while it is still forming. Each candle
+    costs O(1). Candles older than the last one seen are rejected (409).
+    """
+    key = (symbol.upper(), timeframe)
+
+    with stream_states.lock(key):
+        current = None if req.reset else stream_states.get(key)
+        # Work on a copy so a rejected request leaves the state untouched
+        state = StreamState.from_dict(current.to_dict()) if current else StreamState()
+        try:
+            state.update_many(c.model_dump() for c in req.candles)
+        except StaleCandle as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        stream_states.put(key, state)
+
+    return _stream_snapshot(state, timeframe)
+
+
+@app.get("/signals/stream/{symbol}/{timeframe}")
+def signals_stream_latest(symbol: str, timeframe: Timeframe):
+    state = stream_states.get((symbol.upper(), timeframe))
+    if state is None:
+        raise HTTPException(status_code=404, detail="No stream state for this series")
+    return _stream_snapshot(state, timeframe)
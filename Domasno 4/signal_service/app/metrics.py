@@ -0,0 +1,292 @@
+"""
+Service metrics in the Prometheus text format (GET /metrics), without a
+client library: histograms, counters and gauges read at scrape time.
+
+Stage timing: code wraps its steps in stage("name"). Nothing is recorded
+unless a collect_stages() block is active in the current context, so the
+hooks in the kernels and the signal engine cost next to nothing when the
+engine runs elsewhere (e.g. embedded in Django). The worker pool collects
+the stages of each task and sends them back with the result, and the
+server records them in the signals_stage_seconds histogram.
+
+Sampled profiling: with SIGNALS_PROFILE_RATE > 0 that fraction of worker
+tasks runs under cProfile; the merged statistics are served at
+GET /metrics/profile.
+
+Only the standard library is used: the kernels import this module, and
+they are also imported by the Django app.
+"""
+from __future__ import annotations
+
+import io
+import math
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PROFILE_RATE = float(os.getenv("SIGNALS_PROFILE_RATE", "0"))
+
+# Latencies from 100 µs to 10 s
+TIME_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Payloads from 100 B to 10 MB
+SIZE_BUCKETS = tuple(10.0 ** e for e in (2, 2.5, 3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7))
+
+
+# -- stage timing ----------------------------------------------------------
+
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("signals_stages", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as stage `name` if stages are being collected."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, float]]:
+    """{stage: seconds} of every stage() run inside the block."""
+    stages: Dict[str, float] = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+
+
+# -- metric types ----------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float], labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labels = tuple(labels)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [per-bucket counts (+ overflow), sum, count]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for label_values, counts, total, count in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = _labels(self.labels, label_values, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lbl = _labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{lbl} {_number(total)}")
+            lines.append(f"{self.name}_count{lbl} {count}")
+        return lines
+
+
+class Callback:
+    """Counter or gauge whose values are read when scraped."""
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], object], labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.labels = tuple(labels)
+
+    def samples(self) -> List[str]:
+        value = self.fn()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [
+            f"{self.name}{_labels(self.labels, label_values)} {_number(v)}"
+            for label_values, v in sorted(value.items())
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Iterable[float] = TIME_BUCKETS, labels: Iterable[str] = ()) -> Histogram:
+        return self.register(Histogram(name, help, buckets, labels))
+
+    def counter(self, name: str, help: str, fn: Callable[[], object], labels: Iterable[str] = ()) -> Callback:
+        return self.register(Callback(name, help, "counter", fn, labels))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], object], labels: Iterable[str] = ()) -> Callback:
+        return self.register(Callback(name, help, "gauge", fn, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "signals_request_duration_seconds", "HTTP request latency.", labels=("method", "route", "status"),
+)
+REQUEST_BYTES = REGISTRY.histogram(
+    "signals_request_size_bytes", "HTTP request body size.", SIZE_BUCKETS, labels=("route",),
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "signals_response_size_bytes", "HTTP response body size.", SIZE_BUCKETS, labels=("route",),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "signals_stage_seconds", "Time per request stage (parse, frame, indicator:*, strategy:*, serialize).",
+    labels=("stage",),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "signals_pool_queue_wait_seconds", "Time a task waited for a free worker process.",
+)
+COMPUTE_SECONDS = REGISTRY.histogram(
+    "signals_pool_compute_seconds", "Time a task computed in a worker process.",
+)
+
+
+def observe_stages(stages: Dict[str, float]) -> None:
+    for name, seconds in stages.items():
+        STAGE_SECONDS.observe(seconds, name)
+
+
+# -- ASGI middleware -------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Latency, request and response size per route. The route is the
+    matched path template (/signals/{symbol}), so labels stay bounded.
+    """
+
+    def __init__(self, app, skip: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.skip = set(skip)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        sizes = {"request": 0, "response": 0}
+        status = {"code": 500}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path, str(status["code"]))
+            REQUEST_BYTES.observe(sizes["request"], path)
+            RESPONSE_BYTES.observe(sizes["response"], path)
+
+
+# -- sampled profiling -----------------------------------------------------
+
+class _Stats:
+    # pstats.Stats loads any object with create_stats() and .stats
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profiles:
+    """Merged cProfile statistics of the sampled worker tasks."""
+
+    def __init__(self):
+        self._stats: Optional[pstats.Stats] = None
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def add(self, raw_stats: dict) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(_Stats(raw_stats))
+            else:
+                self._stats.add(_Stats(raw_stats))
+            self.samples += 1
+
+    def report(self, limit: int = 40, sort: str = "cumulative") -> str:
+        with self._lock:
+            if self._stats is None:
+                return "No profiles sampled (set SIGNALS_PROFILE_RATE > 0).\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            out.write(f"{self.samples} sampled tasks\n")
+            self._stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats = None
+            self.samples = 0
+
+
+profiles = Profiles()
@@ -0,0 +1,140 @@
+"""
+Whole-market computation: the candles of N symbols laid out as aligned
+(symbols x candles) arrays, so every indicator and signal is computed for
+all symbols in one vectorized pass instead of one series at a time.
+
+Rows are right-aligned: each symbol's latest candle sits in the last
+column, and symbols with a shorter history (late listings) are padded with
+NaN in front. The kernels start every row at its first value, so each row
+gives exactly what compute_snapshot_df gives for that symbol alone.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .indicators import DEFAULT_SIGNAL_ENGINE, SignalEngine
+from .indicators.base import CODE_NA, SIGNAL_LABELS
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class Panel:
+    symbols: List[str]
+    dates: np.ndarray              # (symbols, candles) datetime64[ns], NaT = padding
+    prices: Dict[str, np.ndarray]  # column -> (symbols, candles) float
+    lengths: np.ndarray            # real candles per symbol
+
+    @property
+    def shape(self):
+        return self.dates.shape
+
+
+def panel_from_long(df: pd.DataFrame, max_candles: Optional[int] = None) -> Panel:
+    """
+    Panel from a long table (symbol, date, open, high, low, close[, volume]).
+    Like the per-symbol path, each symbol keeps its last `max_candles` rows
+    and drops rows without high/low/close.
+    """
+    df = df.copy()
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.sort_values(["symbol", "date"], kind="stable")
+
+    if max_candles is not None:
+        df = df.groupby("symbol", sort=False).tail(max_candles)
+    df = df.dropna(subset=["high", "low", "close"])
+
+    codes, symbols = pd.factorize(df["symbol"], sort=True)
+    lengths = np.bincount(codes, minlength=len(symbols))
+    width = int(lengths.max()) if len(lengths) else 0
+
+    # Column of every row: counted back from the symbol's last candle
+    row_end = np.cumsum(lengths)
+    position = np.arange(len(df)) - (row_end - lengths)[codes]
+    column = width - lengths[codes] + position
+
+    def layout(values, fill, dtype):
+        out = np.full((len(symbols), width), fill, dtype=dtype)
+        out[codes, column] = values
+        return out
+
+    prices = {
+        col: layout(df[col].to_numpy(dtype=float), np.nan, float)
+        for col in PRICE_COLUMNS
+        if col in df.columns
+    }
+    if "volume" not in prices:
+        prices["volume"] = np.full((len(symbols), width), np.nan)
+
+    dates = layout(df["date"].to_numpy("datetime64[ns]"), np.datetime64("NaT"), "datetime64[ns]")
+    return Panel(list(symbols), dates, prices, lengths)
+
+
+def compute_panel(
+    panel: Panel,
+    engine: SignalEngine = DEFAULT_SIGNAL_ENGINE,
+    min_candles: int = 0,
+    history: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Signal codes for every symbol: {"overall": codes, label: codes, ...}.
+    Codes are for the latest candle, shape (symbols,), or for every candle,
+    shape (symbols, candles), with history=True. Symbols with fewer than
+    `min_candles` candles are N/A.
+    """
+    n_symbols, width = panel.shape
+    if n_symbols == 0 or width == 0:
+        return {"overall": np.full(n_symbols, CODE_NA, dtype=np.int8)}
+
+    last = None if history else 1
+    values = kernels.compute(panel.prices, engine.required_columns, last=last)
+
+    if history:
+        prices = panel.prices
+    else:
+        prices = {col: arr[:, -1] for col, arr in panel.prices.items()}
+        values = {col: arr[:, -1] for col, arr in values.items()}
+
+    signals, overall = engine.evaluate(prices, values)
+
+    result = {**signals, "overall": overall}
+    too_short = panel.lengths < min_candles
+    for codes in result.values():
+        codes[too_short] = CODE_NA
+    if history:
+        # Padding in front of late listings has no signal
+        for codes in result.values():
+            codes[np.isnat(panel.dates)] = CODE_NA
+    return result
+
+
+def panel_overall(panel: Panel, **kwargs) -> Dict[str, str]:
+    """{symbol: overall signal of the latest candle} (see compute_panel)."""
+    overall = compute_panel(panel, **kwargs)["overall"]
+    return dict(zip(panel.symbols, SIGNAL_LABELS[overall]))
+
+
+def panel_latest(panel: Panel) -> Dict[str, Dict[str, Any]]:
+    """{symbol: latest candle}"""
+    return {
+        symbol: {col: panel.prices[col][i, -1] for col in panel.prices}
+        for i, symbol in enumerate(panel.symbols)
+    }
+
+
+def frames_to_long(frames: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Long table for panel_from_long from {symbol: candles DataFrame}."""
+    if not frames:
+        return pd.DataFrame(columns=["symbol", "date", *PRICE_COLUMNS])
+    return pd.concat(
+        [df.assign(symbol=symbol) for symbol, df in frames.items()],
+        ignore_index=True,
+    )
@@ -0,0 +1,171 @@
+"""
+Worker processes for the CPU-bound part of a request.
+
+Indicator and signal computation runs in a ProcessPoolExecutor, so requests
+are computed in parallel on all cores instead of taking turns on the GIL in
+the threadpool; the event loop only receives, validates and sends. Workers
+are spawned (not forked from the running server) and warm their signals
+engine in the initializer, and start_pool() starts all of them up front so
+the first requests don't pay for it.
+
+Every task records how long it waited for a free worker and how long it
+computed (see PoolStats / GET /pool/stats), and the time of each stage it
+ran (app.metrics); sampled tasks also bring back a cProfile run.
+"""
+import asyncio
+import cProfile
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import metrics
+
+# Worker processes for CPU-bound work. Defaults to one per core.
+WORKERS = int(os.getenv("SIGNALS_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PoolStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.tasks = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.compute_total = 0.0
+        self.compute_max = 0.0
+
+    def record(self, queue_wait: float, compute: float) -> None:
+        self.tasks += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.compute_total += compute
+        self.compute_max = max(self.compute_max, compute)
+
+    def to_dict(self) -> dict:
+        done = max(self.tasks, 1)
+        return {
+            "workers": WORKERS,
+            "tasks": self.tasks,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_wait_avg": self.queue_wait_total / done,
+            "queue_wait_max": self.queue_wait_max,
+            "compute_avg": self.compute_total / done,
+            "compute_max": self.compute_max,
+        }
+
+
+stats = PoolStats()
+
+metrics.REGISTRY.gauge("signals_pool_workers", "Worker processes.", lambda: WORKERS)
+metrics.REGISTRY.gauge("signals_pool_in_flight", "Tasks submitted and not finished.", lambda: stats.in_flight)
+metrics.REGISTRY.counter("signals_pool_tasks_total", "Tasks completed.", lambda: stats.tasks)
+metrics.REGISTRY.counter("signals_pool_failed_total", "Tasks that raised.", lambda: stats.failed)
+
+
+def _init_worker() -> None:
+    # Import the engine and run it once, so the first real task doesn't
+    # pay for imports and first-call setup.
+    from .tasks import warm_up
+
+    warm_up()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _pool
+
+
+async def start_pool() -> None:
+    """Start and warm every worker before serving."""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    # Each worker is started when a task finds no idle worker
+    await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(WORKERS)))
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _timed(fn: Callable, submitted: float, args: Tuple) -> Tuple[Any, float, float, Dict[str, float], Optional[dict]]:
+    # Wall clock: comparable between processes, unlike perf_counter
+    started = time.time()
+    profiler = None
+    if metrics.PROFILE_RATE > 0 and random.random() < metrics.PROFILE_RATE:
+        profiler = cProfile.Profile()
+
+    t0 = time.perf_counter()
+    with metrics.collect_stages() as stages:
+        result = profiler.runcall(fn, *args) if profiler else fn(*args)
+    compute = time.perf_counter() - t0
+
+    profile = None
+    if profiler is not None:
+        profiler.create_stats()
+        profile = profiler.stats
+    return result, max(0.0, started - submitted), compute, stages, profile
+
+
+async def run(fn: Callable, *args) -> Any:
+    """
+    fn(*args) in a worker process. fn and args must be picklable (fn a
+    module-level function of the app package, see app.tasks).
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+
+    stats.in_flight += 1
+    try:
+        result, queue_wait, compute, stages, profile = await loop.run_in_executor(
+            pool, _timed, fn, time.time(), args
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): the next task gets a new pool
+        stats.failed += 1
+        if _pool is pool:
+            _pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    except Exception:
+        stats.failed += 1
+        raise
+    finally:
+        stats.in_flight -= 1
+
+    stats.record(queue_wait, compute)
+    metrics.QUEUE_WAIT_SECONDS.observe(queue_wait)
+    metrics.COMPUTE_SECONDS.observe(compute)
+    metrics.observe_stages(stages)
+    if profile is not None:
+        metrics.profiles.add(profile)
+    return result
+
+
+def chunksize_for(n_jobs: int) -> int:
+    # A few chunks per worker: amortizes pickling without starving workers
+    return max(1, math.ceil(n_jobs / (WORKERS * 4)))
@@ -0,0 +1,62 @@
+"""
+Daily candles -> weekly / monthly with NumPy bucket boundaries.
+
+Buckets and labels follow pandas' "W" (weeks ending Sunday) and "ME"
+(calendar months, labelled by their last day) resample rules, the same as
+the rollup tables and core.utils.timeframes.resample_timeframe on the
+Django side: open = first, high = max, low = min, close = last,
+volume = sum.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+TIMEFRAMES = ("daily", "weekly", "monthly")
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def bucket_labels(dates: np.ndarray, timeframe: str) -> np.ndarray:
+    """Label (last day of the bucket) of every date, as datetime64[D]."""
+    days = dates.astype("datetime64[D]")
+    if timeframe == "daily":
+        return days
+    if timeframe == "weekly":
+        weekday = (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7  # Monday = 0
+        return days + (6 - weekday).astype("timedelta64[D]")
+    if timeframe == "monthly":
+        month = days.astype("datetime64[M]")
+        return (month + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    raise ValueError(f"Invalid timeframe: {timeframe}")
+
+
+def resample(columns: Dict[str, np.ndarray], timeframe: str) -> Dict[str, np.ndarray]:
+    """
+    columns: "date" (datetime64) plus open/high/low/close[/volume] float
+    arrays, oldest first, without missing prices. Returns the same columns
+    for `timeframe`, with "date" set to the bucket label.
+    """
+    if timeframe == "daily":
+        return columns
+
+    labels = bucket_labels(columns["date"], timeframe)
+    if len(labels) == 0:
+        return {name: values[:0] for name, values in columns.items()}
+
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(labels)] - 1
+
+    out = {
+        "date": labels[starts].astype("datetime64[ns]"),
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+    }
+    if "volume" in columns:
+        # pandas sums skip missing volumes
+        out["volume"] = np.add.reduceat(np.nan_to_num(columns["volume"]), starts)
+    return out
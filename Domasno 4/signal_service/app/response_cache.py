@@ -0,0 +1,130 @@
+"""
+In-memory cache of rendered /signals responses.
+
+Keys are a BLAKE2 hash of the route, the engine configuration and the raw
+request body (timeframe + candles), so a hit skips parsing as well as
+computing. Entries are evicted least-recently-used once the cached bytes
+exceed max_bytes, and expire after `ttl` seconds.
+
+Identical requests arriving while the first one is still being computed
+wait for that computation instead of starting their own (single-flight).
+The computation runs in a task of its own, so a request that goes away
+(client disconnect) does not cancel it for the others. Everything runs on
+the event loop, so no locking is needed.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+MAX_BYTES = int(os.getenv("SIGNALS_RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+TTL = float(os.getenv("SIGNALS_RESPONSE_CACHE_TTL", "300"))
+
+# Rough per-entry bookkeeping cost on top of the response bytes
+_ENTRY_OVERHEAD = 200
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = MAX_BYTES, ttl: float = TTL, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(*parts: Union[bytes, str]) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode()
+            # Length prefix keeps ("ab", "c") and ("a", "bc") apart
+            h.update(len(part).to_bytes(8, "little"))
+            h.update(part)
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, value = entry
+        if self._clock() >= expires:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: bytes) -> None:
+        cost = len(value) + _ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self.size += cost
+
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: bytes) -> None:
+        _, value = self._entries.pop(key)
+        self.size -= len(value) + _ENTRY_OVERHEAD
+
+    async def get_or_compute(self, key: bytes, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            self.misses += 1
+            task = self._inflight[key] = asyncio.ensure_future(self._compute(key, compute))
+            # Retrieve the error when every waiter has gone away
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        # A cancelled request stops waiting; the computation carries on
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: bytes, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        # Errors are passed to waiters but never cached
+        try:
+            value = await compute()
+        finally:
+            del self._inflight[key]
+
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collapsed": self.collapsed,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,445 @@
+"""
+Incremental indicators. A StreamState per (symbol, timeframe) takes candles
+one at a time and keeps every column of kernels.COLUMNS current in constant
+time per candle; the values match kernels.compute over the same candles.
+
+Recursive indicators (EMA, MACD, RSI, ADX) keep their running averages.
+Windowed ones keep the last `window` inputs and reduce over that fixed-size
+window (at most 20 values).
+
+States serialize to plain JSON (to_dict / from_dict). StateStore keeps them
+in memory and, when SIGNALS_STATE_DIR is set, writes each one through to
+disk so they survive restarts. The directory is also what lets several
+uvicorn workers stream the same series: the file is the state, updates
+take a file lock, and the in-memory copy is only a cache of the file.
+Without it, states live in one process and the service must run a single
+worker.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, run one worker
+    fcntl = None
+
+import pandas as pd
+
+from .kernels import COLUMNS
+from .indicators import DEFAULT_SIGNAL_ENGINE, SignalEngine
+
+STATE_VERSION = 1
+
+# States kept in memory per process (least recently used evicted)
+MAX_CACHED_STATES = int(os.getenv("SIGNALS_STREAM_CACHE", "4096"))
+
+# Threads updating series that hash to the same stripe wait for each other
+_LOCK_STRIPES = 64
+
+NAN = math.nan
+
+ADX_WINDOW = 14
+
+
+class StaleCandle(ValueError):
+    """Candle older than the last one the state has seen."""
+
+
+def _div(a: float, b: float) -> float:
+    # NumPy division semantics: inf / NaN instead of ZeroDivisionError
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+class _Ema:
+    """pandas ewm(alpha, adjust=False, min_periods) fed one value at a time."""
+
+    __slots__ = ("alpha", "min_periods", "value", "count")
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            # Inputs are only missing before their first value
+            pass
+        elif self.count == 0:
+            self.value = x
+            self.count = 1
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+            self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+    def state(self):
+        return [self.value, self.count]
+
+    def load(self, state):
+        self.value, self.count = state
+
+
+class _Window:
+    """The last `size` inputs."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, size: int):
+        self.values = deque(maxlen=size)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.values.maxlen
+
+    def push(self, x: float) -> bool:
+        self.values.append(x)
+        return self.full
+
+    def mean(self) -> float:
+        return sum(self.values) / len(self.values)
+
+    def state(self):
+        return list(self.values)
+
+    def load(self, state):
+        self.values.clear()
+        self.values.extend(state)
+
+
+def _ema(span: int) -> _Ema:
+    return _Ema(2.0 / (span + 1), span)
+
+
+class StreamState:
+    """
+    Indicator state of one candle series. update() adds the next candle, or
+    replaces the last one when it has the same date (a candle that is still
+    forming).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_date: Optional[str] = None
+        self.latest: Dict[str, Any] = {}
+        self.values: Dict[str, float] = {col: NAN for col in COLUMNS}
+
+        self._prev = [NAN, NAN, NAN]  # high, low, close of the previous candle
+        self._emas = {
+            "rsi_up": _Ema(1.0 / 14, 14),
+            "rsi_down": _Ema(1.0 / 14, 14),
+            "fast": _ema(12),
+            "slow": _ema(26),
+            "macd_signal": _ema(9),
+            "ema_20": _ema(20),
+        }
+        self._windows = {
+            "low_14": _Window(14),
+            "high_14": _Window(14),
+            "stoch_k_3": _Window(3),
+            "typical_20": _Window(20),
+            "close_20": _Window(20),
+            "volume_20": _Window(20),
+        }
+        # Wilder sums / averages of TR, +DM, -DM and DX (see kernels.adx)
+        self._adx = {"tr": 0.0, "pos": 0.0, "neg": 0.0, "dx": 0.0, "adx": NAN}
+        self._undo: Optional[Dict[str, Any]] = None
+
+    # ---- updates -------------------------------------------------------
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, float]:
+        """Apply one candle (date/open/high/low/close/volume); returns values."""
+        high, low, close = (_float(candle.get(k)) for k in ("high", "low", "close"))
+        if math.isnan(high) or math.isnan(low) or math.isnan(close):
+            # Same as compute_indicators dropping incomplete rows
+            return self.values
+
+        date = _date_key(candle.get("date"))
+        if date is not None and self.last_date is not None:
+            if date < self.last_date:
+                raise StaleCandle(f"Candle {date} is older than {self.last_date}")
+            if date == self.last_date and self._undo is not None:
+                self._restore(self._undo)
+
+        self._undo = self._snapshot_state()
+        self._apply(high, low, close, _float(candle.get("volume")))
+
+        self.last_date = date
+        self.latest = {
+            "date": date,
+            "open": _float(candle.get("open")),
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": candle.get("volume"),
+        }
+        return self.values
+
+    def update_many(self, candles: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+        for candle in candles:
+            self.update(candle)
+        return self.values
+
+    def _apply(self, high: float, low: float, close: float, volume: float) -> None:
+        t = self.count
+        prev_high, prev_low, prev_close = self._prev
+        emas, windows, v = self._emas, self._windows, self.values
+
+        # RSI
+        diff = close - prev_close
+        up = emas["rsi_up"].update(diff if diff > 0 else 0.0)
+        down = emas["rsi_down"].update(-diff if diff < 0 else 0.0)
+        v["rsi"] = 100.0 if down == 0 else 100.0 - _div(100.0, 1.0 + _div(up, down))
+
+        # MACD
+        line = emas["fast"].update(close) - emas["slow"].update(close)
+        signal = emas["macd_signal"].update(line)
+        v["macd"], v["macd_signal"], v["macd_hist"] = line, signal, line - signal
+
+        # Stochastic
+        full = windows["low_14"].push(low) & windows["high_14"].push(high)
+        if full:
+            lowest, highest = min(windows["low_14"].values), max(windows["high_14"].values)
+            k = _div(100.0 * (close - lowest), highest - lowest)
+        else:
+            k = NAN
+        v["stoch_k"] = k
+        v["stoch_d"] = windows["stoch_k_3"].mean() if windows["stoch_k_3"].push(k) else NAN
+
+        # ADX
+        v["adx"] = self._apply_adx(t, high, low, close, prev_high, prev_low, prev_close)
+
+        # CCI
+        typical = windows["typical_20"]
+        if typical.push((high + low + close) / 3.0):
+            mean = typical.mean()
+            mad = sum(abs(x - mean) for x in typical.values) / len(typical.values)
+            v["cci"] = _div(typical.values[-1] - mean, 0.015 * mad)
+        else:
+            v["cci"] = NAN
+
+        # SMA / WMA / Bollinger
+        closes = windows["close_20"]
+        if closes.push(close):
+            n = len(closes.values)
+            mean = closes.mean()
+            std = math.sqrt(sum((x - mean) ** 2 for x in closes.values) / n)
+            weighted = sum(i * x for i, x in enumerate(closes.values, start=1))
+            v["sma_20"] = v["bb_middle"] = mean
+            v["wma_20"] = weighted * 2.0 / (n * (n + 1))
+            v["bb_upper"] = mean + 2 * std
+            v["bb_lower"] = mean - 2 * std
+        else:
+            for col in ("sma_20", "wma_20", "bb_upper", "bb_middle", "bb_lower"):
+                v[col] = NAN
+
+        v["ema_20"] = emas["ema_20"].update(close)
+
+        # Volume SMA (a missing volume makes its windows NaN, like rolling())
+        volumes = windows["volume_20"]
+        v["vol_sma_20"] = volumes.mean() if volumes.push(volume) else NAN
+
+        self._prev = [high, low, close]
+        self.count = t + 1
+
+    def _apply_adx(self, t, high, low, close, prev_high, prev_low, prev_close) -> float:
+        w = ADX_WINDOW
+        a = 1.0 / w
+        s = self._adx
+        if t == 0:
+            return 0.0
+
+        tr = max(high, prev_close) - min(low, prev_close)
+        up, down = high - prev_high, prev_low - low
+        pos = up if up > down and up > 0 else 0.0
+        neg = down if down > up and down > 0 else 0.0
+
+        # TR/DM: summed over candles 1..w, then the mean seeds the average
+        if t <= w:
+            s["tr"] += tr
+            s["pos"] += pos
+            s["neg"] += neg
+            if t < w:
+                return 0.0
+            s["tr"], s["pos"], s["neg"] = s["tr"] / w, s["pos"] / w, s["neg"] / w
+        else:
+            s["tr"] = (1 - a) * s["tr"] + a * tr
+            s["pos"] = (1 - a) * s["pos"] + a * pos
+            s["neg"] = (1 - a) * s["neg"] + a * neg
+
+        di_pos = 100.0 * s["pos"] / s["tr"] if s["tr"] != 0 else 0.0
+        di_neg = 100.0 * s["neg"] / s["tr"] if s["tr"] != 0 else 0.0
+        di_sum = di_pos + di_neg
+        dx = 100.0 * abs(di_pos - di_neg) / di_sum if di_sum != 0 else 0.0
+
+        # DX: summed over candles w..2w-1, then averaged the same way
+        if t < 2 * w - 1:
+            s["dx"] += dx
+            return 0.0
+        if t == 2 * w - 1:
+            s["adx"] = (s["dx"] + dx) / w
+        else:
+            s["adx"] = (1 - a) * s["adx"] + a * dx
+        return s["adx"]
+
+    # ---- snapshots -----------------------------------------------------
+
+    def snapshot(self, engine: SignalEngine = DEFAULT_SIGNAL_ENGINE) -> Dict[str, Any]:
+        """Signals for the latest candle, in the /signals response format."""
+        if self.count == 0:
+            return engine.build_snapshot(None)
+
+        row = {**self.latest, **self.values}
+        return engine.build_snapshot(pd.DataFrame([row]))
+
+    # ---- serialization -------------------------------------------------
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "last_date": self.last_date,
+            "latest": dict(self.latest),
+            "values": dict(self.values),
+            "prev": list(self._prev),
+            "emas": {name: e.state() for name, e in self._emas.items()},
+            "windows": {name: w.state() for name, w in self._windows.items()},
+            "adx": dict(self._adx),
+        }
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.last_date = state["last_date"]
+        self.latest = dict(state["latest"])
+        self.values = dict(state["values"])
+        self._prev = list(state["prev"])
+        for name, e in self._emas.items():
+            e.load(state["emas"][name])
+        for name, w in self._windows.items():
+            w.load(state["windows"][name])
+        self._adx = dict(state["adx"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state (NaN is written as NaN, as json does)."""
+        return {"version": STATE_VERSION, **self._snapshot_state(), "undo": self._undo}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported stream state version {data.get('version')}")
+        state = cls()
+        state._restore(data)
+        state._undo = data.get("undo")
+        return state
+
+
+class StateStore:
+    """
+    StreamStates by (symbol, timeframe), at most `max_cached` of them in
+    memory. With a directory, every put() is written through (atomically,
+    a new file) and get() reads the file unless the cached copy is of the
+    same file version (inode + mtime), so a state another worker wrote is
+    never missed. lock(key) serializes updates of one series across
+    threads and, with a directory, across processes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_cached: int = MAX_CACHED_STATES):
+        self.directory = directory
+        self.max_cached = max_cached
+        # key -> (file version or None, state)
+        self._states: "OrderedDict[Tuple[str, str], Tuple[Any, StreamState]]" = OrderedDict()
+        self._stripes = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def lock(self, key: Tuple[str, str]) -> Iterator[None]:
+        with self._stripes[hash(key) % _LOCK_STRIPES]:
+            if not self.directory or fcntl is None:
+                yield
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(key) + ".lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        symbol, timeframe = key
+        name = f"{symbol}.{timeframe}.json".replace(os.sep, "_")
+        return os.path.join(self.directory, name)
+
+    def _cache(self, key: Tuple[str, str], version, state: StreamState) -> None:
+        with self._guard:
+            self._states[key] = (version, state)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_cached:
+                self._states.popitem(last=False)
+
+    def get(self, key: Tuple[str, str]) -> Optional[StreamState]:
+        with self._guard:
+            cached = self._states.get(key)
+            if cached is not None:
+                self._states.move_to_end(key)
+
+        if not self.directory:
+            return None if cached is None else cached[1]
+
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        version = (st.st_ino, st.st_mtime_ns)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            with open(path) as f:
+                state = StreamState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        self._cache(key, version, state)
+        return state
+
+    def put(self, key: Tuple[str, str], state: StreamState) -> None:
+        if not self.directory:
+            self._cache(key, None, state)
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp, path)
+
+        st = os.stat(path)
+        self._cache(key, (st.st_ino, st.st_mtime_ns), state)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+def _float(x) -> float:
+    return NAN if x is None else float(x)
+
+
+def _date_key(value) -> Optional[str]:
+    if value is None:
+        return None
+    ts = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(ts) else str(ts)
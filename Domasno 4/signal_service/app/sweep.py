@@ -0,0 +1,299 @@
+"""
+Parameter sweeps: every strategy over a grid of its thresholds and
+windows, backtested over the candle store and ranked.
+
+A grid is a list of entries, one per strategy to tune:
+
+    {"strategy": "RSISignal", "params": {fixed arguments},
+     "grid": {"window": [7, 14, 21], "oversold": [25, 30], ...}}
+
+and every combination of the "grid" lists is one point. Each point is
+one standalone strategy, traded by the rules of app.backtest (the overall
+vote is not swept).
+
+Work is split by symbol, not by point: a worker loads a symbol once,
+computes the union of the indicator columns the points read in one
+compute_indicators pass (rsi_14 once for every RSI threshold pair, sma_50
+once for the SMA and ADX points using it), and evaluates every point on
+those shared columns as one (points, candles) array. Points on the same
+columns cost a compute_series and a few array operations each.
+
+From signal_service/:
+
+    python -m app.sweep --store /data/candles --workers 8 --output sweep.json --save-best strategies.json
+
+strategies.json holds the best point of each grid entry in the format
+SIGNALS_STRATEGIES takes (see app.indicators).
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest import (
+    BUY_AND_HOLD,
+    BacktestOptions,
+    positions,
+    stored_symbols,
+    strategy_metrics,
+    strategy_returns,
+)
+from .candle_store import CandleStore
+from .compute import MIN_CANDLES
+from .indicator_calculator import compute_indicators
+from .indicators.base import SignalStrategy
+from .indicators.strategies import STRATEGIES
+from .resample import resample
+
+DEFAULT_GRID: List[Dict[str, Any]] = [
+    {"strategy": "RSISignal", "grid": {"window": [7, 14, 21], "oversold": [20, 25, 30, 35], "overbought": [65, 70, 75, 80]}},
+    {"strategy": "MACDSignal", "grid": {"fast": [8, 12], "slow": [21, 26], "signal": [5, 9]}},
+    {"strategy": "StochasticSignal", "grid": {"window": [9, 14, 21], "smooth": [3, 5], "oversold": [10, 20, 30], "overbought": [70, 80, 90]}},
+    {"strategy": "ADXSignal", "grid": {"window": [10, 14, 20], "trend": [15, 20, 25, 30], "ma_window": [20, 50]}},
+    {"strategy": "CCISignal", "grid": {"window": [14, 20, 30], "threshold": [50, 100, 150, 200]}},
+    {"strategy": "MASignal", "params": {"kind": "sma"}, "grid": {"window": [10, 20, 50, 100, 200]}},
+    {"strategy": "MASignal", "params": {"kind": "ema"}, "grid": {"window": [10, 20, 50, 100, 200]}},
+    {"strategy": "MASignal", "params": {"kind": "wma"}, "grid": {"window": [10, 20, 50]}},
+    {"strategy": "BollingerSignal", "grid": {"window": [10, 20, 30], "deviations": [1.5, 2, 2.5, 3]}},
+    {"strategy": "VolumeSMASignal", "grid": {"window": [10, 20, 50]}},
+]
+
+# Metrics a sweep can be ranked by; higher is better for each
+RANK_KEYS = ("median_return", "mean_return", "hit_rate", "mean_drawdown", "worst_drawdown")
+
+
+def expand(grid: List[Dict[str, Any]]) -> List[Tuple[int, SignalStrategy]]:
+    """(grid entry index, strategy) for every point of `grid`."""
+    points = []
+    for i, entry in enumerate(grid):
+        cls = STRATEGIES.get(entry["strategy"])
+        if cls is None:
+            raise ValueError(f"Unknown strategy {entry['strategy']!r}")
+        fixed = entry.get("params", {})
+        axes = entry.get("grid", {})
+        for combo in itertools.product(*axes.values()):
+            points.append((i, cls(**fixed, **dict(zip(axes, combo)))))
+    return points
+
+
+def sweep_candles(
+    candles: Dict[str, np.ndarray],
+    strategies: Sequence[SignalStrategy],
+    options: BacktestOptions = BacktestOptions(),
+) -> Dict[str, np.ndarray]:
+    """
+    {metric: array} over `strategies` plus buy & hold (last) for one candle
+    series, with the metrics of backtest.backtest_candles.
+    """
+    columns = tuple(dict.fromkeys(col for s in strategies for col in s.requires))
+    df = compute_indicators(pd.DataFrame(candles), columns=columns)
+    close = df["close"].to_numpy(dtype=float)
+    prices = {col: df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close", "volume") if col in df.columns}
+    values = {col: df[col].to_numpy(dtype=float, na_value=np.nan) for col in columns}
+
+    codes = np.stack([s.compute_series(prices, values) for s in strategies])
+    position = np.vstack([positions(codes, options.short), np.ones(len(close))])
+    codes = np.vstack([codes, np.zeros(len(close), dtype=codes.dtype)])
+
+    returns = strategy_returns(position, close, options.fee)
+    return strategy_metrics(codes, position, returns, close, options.horizon)
+
+
+# -- the whole store, in worker processes ----------------------------------
+
+_stores: Dict[str, CandleStore] = {}
+
+
+def _sweep_chunk(root: str, symbols: List[str], timeframes, grid, options) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = CandleStore(root)
+    strategies = [strategy for _, strategy in expand(grid)]
+
+    out = {}
+    for symbol in symbols:
+        daily = store.read(symbol)
+        if daily is None or not len(daily["date"]):
+            continue
+        by_timeframe = {}
+        for timeframe in timeframes:
+            candles = resample(daily, timeframe)
+            if len(candles["date"]) >= MIN_CANDLES[timeframe]:
+                by_timeframe[timeframe] = sweep_candles(candles, strategies, options)
+        out[symbol] = by_timeframe
+    return out
+
+
+def run_sweep(
+    root: str,
+    symbols: Optional[Sequence[str]] = None,
+    timeframes: Sequence[str] = ("daily",),
+    grid: List[Dict[str, Any]] = DEFAULT_GRID,
+    options: BacktestOptions = BacktestOptions(),
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+    """
+    {symbol: {timeframe: {metric: array over the points of `grid` plus buy
+    & hold}}} for `symbols` (default: all) of the candle store at `root`,
+    in `workers` processes (default: one per core; 1 runs in this process).
+    Timeframes with fewer than MIN_CANDLES candles are left out.
+    """
+    symbols = list(symbols) if symbols is not None else stored_symbols(root)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(symbols) < 2:
+        return _sweep_chunk(root, symbols, timeframes, grid, options)
+
+    size = max(1, math.ceil(len(symbols) / (workers * 4)))
+    chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_sweep_chunk, root, chunk, timeframes, grid, options) for chunk in chunks]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def _aggregate(metrics: List[Dict[str, np.ndarray]]) -> List[Dict[str, Any]]:
+    # Per point (and buy & hold) over the symbols, as backtest.summarize
+    stack = {name: np.stack([m[name] for m in metrics]) for name in metrics[0]}
+    signals = stack["signals"].sum(axis=0)
+    hits = stack["hits"].sum(axis=0)
+    columns = {
+        "mean_return": stack["total_return"].mean(axis=0),
+        "median_return": np.median(stack["total_return"], axis=0),
+        "mean_drawdown": stack["max_drawdown"].mean(axis=0),
+        "worst_drawdown": stack["max_drawdown"].min(axis=0),
+        "trades": stack["trades"].mean(axis=0),
+        "exposure": stack["exposure"].mean(axis=0),
+    }
+    return [
+        {
+            "signals": int(signals[i]),
+            "hits": int(hits[i]),
+            "hit_rate": float(hits[i] / signals[i]) if signals[i] else None,
+            **{name: float(column[i]) for name, column in columns.items()},
+        }
+        for i in range(len(signals))
+    ]
+
+
+def summarize(
+    results: Dict[str, Dict[str, Dict[str, np.ndarray]]],
+    grid: List[Dict[str, Any]] = DEFAULT_GRID,
+    rank: str = "median_return",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {timeframe: {"symbols", "buy & hold", "results"}} over the symbols of
+    run_sweep, "results" being one row per point (strategy, params, label,
+    aggregates), best `rank` first.
+    """
+    if rank not in RANK_KEYS:
+        raise ValueError(f"Cannot rank by {rank!r} (one of {', '.join(RANK_KEYS)})")
+    points = expand(grid)
+
+    by_timeframe: Dict[str, List[Dict[str, np.ndarray]]] = {}
+    for symbol in sorted(results):
+        for timeframe, metrics in results[symbol].items():
+            by_timeframe.setdefault(timeframe, []).append(metrics)
+
+    out = {}
+    for timeframe, metrics in by_timeframe.items():
+        *rows, baseline = _aggregate(metrics)
+        rows = [
+            {"entry": entry, "strategy": type(strategy).__name__, "label": strategy.label, "params": dict(strategy.params), **row}
+            for (entry, strategy), row in zip(points, rows)
+        ]
+        # None (no signals) last; the sort is stable, so ties keep grid order
+        rows.sort(key=lambda row: (row[rank] is not None, row[rank] or 0.0), reverse=True)
+        out[timeframe] = {"symbols": len(metrics), BUY_AND_HOLD: baseline, "results": rows}
+    return out
+
+
+def best_config(summary: Dict[str, Any], timeframe: str, grid: List[Dict[str, Any]] = DEFAULT_GRID) -> List[Dict[str, Any]]:
+    """
+    The top-ranked point of every grid entry on `timeframe`, in grid order,
+    as a strategy list for build_engine / SIGNALS_STRATEGIES.
+    """
+    best: Dict[int, Dict[str, Any]] = {}
+    for row in summary[timeframe]["results"]:
+        best.setdefault(row["entry"], row)
+    return [
+        {"strategy": best[i]["strategy"], "params": best[i]["params"]}
+        for i in range(len(grid)) if i in best
+    ]
+
+
+def _report(summary: Dict[str, Dict[str, Any]], top: int) -> None:
+    def pct(value):
+        return "-" if value is None else f"{value:.1%}"
+
+    for timeframe, result in summary.items():
+        baseline = result[BUY_AND_HOLD]
+        print(f"\n{timeframe}: {result['symbols']} symbols, buy & hold median {pct(baseline['median_return'])}")
+        print(f"{'strategy':<34}{'params':<52}{'mean ret':>10}{'median':>10}{'hit rate':>10}{'mean dd':>10}{'trades':>8}")
+        for row in result["results"][:top]:
+            params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+            print(
+                f"{row['label']:<34}{params:<52}{pct(row['mean_return']):>10}{pct(row['median_return']):>10}"
+                f"{pct(row['hit_rate']):>10}{pct(row['mean_drawdown']):>10}{row['trades']:>8.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over a candle store.")
+    parser.add_argument("--store", default=os.getenv("CANDLE_STORE_DIR"), help="candle store directory (default: CANDLE_STORE_DIR)")
+    parser.add_argument("--symbols", help="comma-separated (default: every symbol in the store)")
+    parser.add_argument("--timeframes", default="daily", help="comma-separated (default: daily)")
+    parser.add_argument("--grid", help="grid JSON file (default: DEFAULT_GRID)")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--fee", type=float, default=BacktestOptions.fee)
+    parser.add_argument("--horizon", type=int, default=BacktestOptions.horizon)
+    parser.add_argument("--short", action="store_true", help="SELL goes short instead of flat")
+    parser.add_argument("--rank", default="median_return", choices=RANK_KEYS)
+    parser.add_argument("--top", type=int, default=20, help="rows printed per timeframe")
+    parser.add_argument("--output", help="write the ranked results as JSON")
+    parser.add_argument("--save-best", help="write the best point of each grid entry (first timeframe) as a SIGNALS_STRATEGIES file")
+    args = parser.parse_args()
+    if not args.store:
+        parser.error("--store (or CANDLE_STORE_DIR) is required")
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    options = BacktestOptions(fee=args.fee, horizon=args.horizon, short=args.short)
+    symbols = args.symbols.split(",") if args.symbols else None
+    timeframes = tuple(tf for tf in args.timeframes.split(",") if tf)
+
+    start = time.perf_counter()
+    results = run_sweep(args.store, symbols, timeframes, grid, options, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results, grid, args.rank)
+    _report(summary, args.top)
+    print(f"\n{len(expand(grid))} points x {len(results)} symbols in {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"options": asdict(options), "rank": args.rank, "grid": grid, "summary": summary}, f, indent=2)
+    if args.save_best:
+        if timeframes[0] not in summary:
+            raise SystemExit(f"No {timeframes[0]} results to save")
+        with open(args.save_best, "w") as f:
+            json.dump(best_config(summary, timeframes[0], grid), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
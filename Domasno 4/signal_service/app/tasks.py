@@ -0,0 +1,75 @@
+"""
+Functions the endpoints run in the worker processes (app.pool.run). Each
+computes a response and renders it to JSON there, so only the rendered
+bytes travel back to the event loop.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CandleStore
+from .compute import compute_history_df, compute_job, compute_snapshot_df, compute_timeframes, compute_timeframes_df
+from .encoding import dumps
+from .metrics import stage
+
+
+def render(content) -> bytes:
+    with stage("serialize"):
+        return dumps(content)
+
+
+def signals(df: pd.DataFrame, options: Dict[str, Any]) -> bytes:
+    """POST /signals; options as in main.SeriesOptions."""
+    if options.get("timeframes"):
+        return render({"timeframes": compute_timeframes_df(df, options["timeframes"])})
+    return render(compute_snapshot_df(df, options["timeframe"]))
+
+
+def history(df: pd.DataFrame, options: Dict[str, Any]) -> bytes:
+    """POST /signals/history"""
+    return render(compute_history_df(df, options["timeframe"]))
+
+
+def symbol_snapshot(daily: Dict[str, np.ndarray], timeframe: str) -> bytes:
+    """GET /signals/{symbol}"""
+    return render(compute_timeframes(daily, (timeframe,))[timeframe])
+
+
+_stores: Dict[str, CandleStore] = {}
+
+
+def stored_symbol_snapshot(root: str, symbol: str, timeframe: str, count: int) -> bytes:
+    """
+    GET /signals/{symbol} with the candle store: the worker maps the file
+    itself, so the candles are not pickled over from the server. Only the
+    first `count` candles are used (what the server saw when it keyed
+    the response).
+    """
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = CandleStore(root)
+
+    daily = store.read(symbol)
+    daily = {name: values[:count] for name, values in daily.items()}
+    return render(compute_timeframes(daily, (timeframe,))[timeframe])
+
+
+def batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """A chunk of POST /signals/batch jobs."""
+    return [compute_job(job) for job in jobs]
+
+
+def warm_up() -> None:
+    """One small /signals computation (worker initializer)."""
+    n = 200
+    close = 100 + np.sin(np.arange(n) / 5)
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="D"),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": np.ones(n),
+    })
+    signals(df, {"timeframe": "daily"})
@@ -0,0 +1,136 @@
+"""
+Columnar binary encoding of a candle series, content type
+"application/x-ohlcv-columns". Used instead of JSON between the Django
+app and /signals; decoding maps the buffers straight into NumPy arrays.
+
+Layout (little-endian):
+
+    4s      magic     b"OHLC"
+    u2      version   1
+    u2      reserved
+    u4      n         number of candles
+    u4      meta_len  length of the meta block
+    bytes   meta      UTF-8 JSON object, e.g. {"timeframe": "daily"}
+    bytes   padding   to an 8-byte boundary
+    i8[n]   date      nanoseconds since the epoch (NaT = int64 min)
+    f8[n]   open, high, low, close, volume   (NaN = missing)
+
+encode_frame sends missing open/high/low/close as 0.0, like the JSON
+candles from the Django client, so both paths give the service the
+same frame.
+
+This module only depends on NumPy/pandas so the Django side can import it.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+CONTENT_TYPE = "application/x-ohlcv-columns"
+
+MAGIC = b"OHLC"
+VERSION = 1
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Missing prices sent by encode_frame (missing volumes stay NaN)
+MISSING_PRICE = 0.0
+
+_HEADER = struct.Struct("<4sHHII")
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def encode_columns(
+    dates: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    meta: Dict[str, Any] | None = None,
+) -> bytes:
+    """
+    dates: datetime64 array (or int64 nanoseconds); columns: the
+    PRICE_COLUMNS as float arrays of the same length (volume may be absent).
+    """
+    n = len(dates)
+    meta_raw = json.dumps(meta or {}).encode()
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, 0, n, len(meta_raw)),
+        meta_raw,
+        b"\0" * _pad(_HEADER.size + len(meta_raw)),
+        np.asarray(dates).astype("datetime64[ns]").view("<i8").tobytes(),
+    ]
+
+    for name in PRICE_COLUMNS:
+        col = columns.get(name)
+        if col is None:
+            col = np.full(n, np.nan)
+        col = np.ascontiguousarray(col, dtype="<f8")
+        if len(col) != n:
+            raise WireFormatError(f"Column {name} has {len(col)} values, expected {n}")
+        parts.append(col.tobytes())
+
+    return b"".join(parts)
+
+
+def encode_frame(df: pd.DataFrame, **meta) -> bytes:
+    """Encode a candle DataFrame (date + PRICE_COLUMNS)."""
+    dates = pd.to_datetime(df["date"], errors="coerce").to_numpy("datetime64[ns]")
+    columns = {
+        name: df[name].to_numpy(dtype=float)
+        for name in PRICE_COLUMNS
+        if name in df.columns
+    }
+    for name in ("open", "high", "low", "close"):
+        if name in columns:
+            columns[name] = np.nan_to_num(columns[name], nan=MISSING_PRICE)
+    return encode_columns(dates, columns, meta)
+
+
+def decode_columns(buf: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Returns (meta, columns). The arrays are read-only views into `buf`;
+    "date" is datetime64[ns].
+    """
+    if len(buf) < _HEADER.size:
+        raise WireFormatError("Buffer too short")
+
+    magic, version, _, n, meta_len = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise WireFormatError("Not an OHLC buffer")
+    if version != VERSION:
+        raise WireFormatError(f"Unsupported version {version}")
+
+    offset = _HEADER.size + meta_len
+    try:
+        meta = json.loads(bytes(buf[_HEADER.size:offset]) or b"{}")
+    except ValueError:
+        raise WireFormatError("Invalid meta block")
+    offset += _pad(offset)
+
+    expected = offset + 8 * n * (1 + len(PRICE_COLUMNS))
+    if len(buf) != expected:
+        raise WireFormatError(f"Expected {expected} bytes, got {len(buf)}")
+
+    columns = {"date": np.frombuffer(buf, dtype="<i8", count=n, offset=offset).view("datetime64[ns]")}
+    offset += 8 * n
+
+    for name in PRICE_COLUMNS:
+        columns[name] = np.frombuffer(buf, dtype="<f8", count=n, offset=offset)
+        offset += 8 * n
+
+    return meta, columns
+
+
+def decode_frame(buf: bytes) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    meta, columns = decode_columns(buf)
+    return meta, pd.DataFrame(columns, copy=False)
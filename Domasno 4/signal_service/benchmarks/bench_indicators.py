@@ -0,0 +1,52 @@
+"""
+CPU time per call: ta (previous implementation) vs the NumPy kernels, and
+the /signals path (latest row only, only what the engine's strategies read)
+for the default engine and a trimmed RSI + MACD engine. Run from
+signal_service/:
+
+    python -m benchmarks.bench_indicators [--repeat 50]
+"""
+import argparse
+import time
+from functools import partial
+
+from app.compute import compute_snapshot_df
+from app.indicator_calculator import compute_indicators
+from app.indicators import MACDSignal, RSISignal, SignalEngine
+from tests.candles import make_candles
+from tests.ta_reference import compute_indicators_ta
+
+SIZES = (120, 500, 5000)
+
+TRIMMED_ENGINE = SignalEngine(strategies=[RSISignal(), MACDSignal()])
+
+CASES = {
+    "ta": compute_indicators_ta,
+    "kernels": compute_indicators,
+    "snapshot": partial(compute_snapshot_df, timeframe="daily"),
+    "rsi+macd": partial(compute_snapshot_df, timeframe="daily", engine=TRIMMED_ENGINE),
+}
+
+
+def per_call_ms(fn, df, repeat: int) -> float:
+    fn(df)  # warm-up
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(df)
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'candles':>8}" + "".join(f"{name + ' ms':>14}" for name in CASES))
+    for n in SIZES:
+        df = make_candles(n)
+        row = [per_call_ms(fn, df, args.repeat) for fn in CASES.values()]
+        print(f"{n:>8}" + "".join(f"{ms:>14.2f}" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Request parsing and response rendering of /signals, per call: the list of
+candle objects (SignalsRequest) vs the columnar JSON variant
+(SignalsColumnsRequest) vs the binary wire format, and fastapi's
+jsonable_encoder + JSONResponse vs app.encoding (orjson). Run from
+signal_service/:
+
+    python -m benchmarks.bench_json [--candles 500] [--repeat 200]
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import encoding, wire
+from app.compute import candles_frame, compute_history_df, compute_snapshot_df
+from app.main import SignalsRequest, parse_series
+from tests.candles import make_candles
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def previous_parse(body: bytes):
+    # Before the columnar variant: pydantic model per candle
+    req = SignalsRequest.model_validate_json(body)
+    return candles_frame([c.model_dump() for c in req.candles])
+
+
+def previous_render(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candles", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    df = make_candles(args.candles)
+    dates = [d.isoformat() for d in df["date"]]
+    prices = {name: df[name].tolist() for name in ("open", "high", "low", "close", "volume")}
+
+    rows_body = json.dumps({
+        "timeframe": "daily",
+        "candles": [
+            {"date": d, **{name: values[i] for name, values in prices.items()}}
+            for i, d in enumerate(dates)
+        ],
+    }).encode()
+    columns_body = json.dumps({"timeframe": "daily", "date": dates, **prices}).encode()
+    wire_body = wire.encode_frame(df, timeframe="daily")
+
+    parsing = {
+        "rows (previous)": (rows_body, lambda: previous_parse(rows_body)),
+        "rows": (rows_body, lambda: parse_series("application/json", rows_body)),
+        "columns": (columns_body, lambda: parse_series("application/json", columns_body)),
+        "wire": (wire_body, lambda: parse_series(wire.CONTENT_TYPE, wire_body)),
+    }
+    print(f"parse, {args.candles} candles")
+    print(f"{'format':>16}{'bytes':>10}{'ms':>10}")
+    for name, (body, fn) in parsing.items():
+        print(f"{name:>16}{len(body):>10}{per_call_ms(fn, args.repeat):>10.3f}")
+
+    responses = {
+        "snapshot": compute_snapshot_df(df, "daily"),
+        "history": compute_history_df(df, "daily"),
+    }
+    print("\nrender")
+    print(f"{'response':>16}{'previous ms':>14}{'orjson ms':>12}")
+    for name, content in responses.items():
+        previous = per_call_ms(lambda: previous_render(content), args.repeat)
+        current = per_call_ms(lambda: encoding.dumps(content), args.repeat)
+        print(f"{name:>16}{previous:>14.3f}{current:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Load and latency suite for the signals service, in-process: the FastAPI
+app is driven through httpx's ASGI transport (no network, lifespan and
+worker pool included), and compute_indicators /
+DEFAULT_SIGNAL_ENGINE.build_snapshot are called directly, on synthetic
+candles of each size.
+
+Reports throughput, p50/p95/p99 latency and allocations (tracemalloc, in
+this process only: work done in the pool's workers is not seen) per case,
+size and concurrency level. Results are written as JSON and can be
+compared with a stored baseline; the exit status is 1 when a case got
+slower than the tolerance allows. Run from signal_service/:
+
+    python -m benchmarks.bench_service --output results.json
+    python -m benchmarks.bench_service --concurrency 1,8,32 --baseline results.json
+
+The response cache is disabled so every request is computed (--cache
+keeps it).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from app import wire
+from app.indicator_calculator import compute_indicators
+from app.indicators import DEFAULT_SIGNAL_ENGINE
+from tests.candles import make_candles
+
+SIZES = (120, 500, 5000)
+CONCURRENCY = (1, 4, 16)
+
+# "METHOD path" -> body builder (returns body, content type) per HTTP case
+HTTP_CASES = {
+    "POST /signals": lambda df: columns_request(df),
+    "POST /signals (wire)": lambda df: (wire.encode_frame(df, timeframe="daily"), wire.CONTENT_TYPE),
+    "POST /signals/history": lambda df: columns_request(df),
+}
+
+DIRECT_CASES = ("compute_indicators", "build_snapshot")
+
+
+def columns_request(df):
+    body = {
+        "timeframe": "daily",
+        "date": [d.isoformat() for d in df["date"]],
+        **{name: df[name].tolist() for name in ("open", "high", "low", "close", "volume")},
+    }
+    return json.dumps(body).encode(), "application/json"
+
+
+def summarize(latencies: List[float], wall: float) -> Dict[str, float]:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall if wall > 0 else float("inf"),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def allocations(fn: Callable[[], object], samples: int = 5) -> Dict[str, float]:
+    """Peak and retained traced memory per call, in KiB."""
+    fn()
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kib": float(np.mean(peaks)) / 1024,
+        "alloc_retained_kib": float(np.mean(retained)) / 1024,
+    }
+
+
+def run_direct(case: str, n: int, requests: int) -> Dict[str, float]:
+    df = make_candles(n)
+    if case == "compute_indicators":
+        fn = lambda: compute_indicators(df)
+    else:
+        indicators = compute_indicators(df)
+        fn = lambda: DEFAULT_SIGNAL_ENGINE.build_snapshot(indicators)
+
+    fn()  # warm-up
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - start
+
+    return {**summarize(latencies, wall), **allocations(fn)}
+
+
+async def run_http(client: httpx.AsyncClient, case: str, body: bytes, content_type: str, concurrency: int, requests: int) -> Dict[str, float]:
+    path = case.split()[1]
+    headers = {"Content-Type": content_type}
+
+    async def call():
+        resp = await client.post(path, content=body, headers=headers)
+        resp.raise_for_status()
+
+    await call()  # warm-up
+    latencies = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    return summarize(latencies, wall)
+
+
+async def run_http_cases(args) -> List[Dict]:
+    from app import main
+
+    if not args.cache:
+        main.response_cache.max_bytes = 0
+
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for case in args.http_cases:
+                for n in args.sizes:
+                    body, content_type = HTTP_CASES[case](make_candles(n))
+                    for concurrency in args.concurrency:
+                        result = await run_http(client, case, body, content_type, concurrency, args.requests)
+                        result.update(await http_allocations(client, case, body, content_type))
+                        results.append({"case": case, "candles": n, "concurrency": concurrency, **result})
+                        report(results[-1])
+    return results
+
+
+async def http_allocations(client, case, body, content_type, samples: int = 5) -> Dict[str, float]:
+    path = case.split()[1]
+    headers = {"Content-Type": content_type}
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await client.post(path, content=body, headers=headers)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kib": float(np.mean(peaks)) / 1024,
+        "alloc_retained_kib": float(np.mean(retained)) / 1024,
+    }
+
+
+def report(result: Dict) -> None:
+    print(
+        f"{result['case']:<24}{result['candles']:>7}{result['concurrency']:>6}"
+        f"{result['throughput']:>12.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+        f"{result['p99_ms']:>10.2f}{result['alloc_peak_kib']:>12.1f}",
+        flush=True,
+    )
+
+
+def key(result: Dict):
+    return result["case"], result["candles"], result["concurrency"]
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> bool:
+    """Print the change against the baseline; False if anything regressed."""
+    previous = {key(r): r for r in baseline["results"]}
+    ok = True
+
+    print(f"\n{'case':<24}{'candles':>7}{'conc':>6}{'p50':>10}{'p99':>10}{'req/s':>10}")
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+
+        p50 = result["p50_ms"] / old["p50_ms"] - 1
+        p99 = result["p99_ms"] / old["p99_ms"] - 1
+        rps = result["throughput"] / old["throughput"] - 1
+        regressed = p50 > tolerance or rps < -tolerance
+        ok &= not regressed
+
+        print(
+            f"{result['case']:<24}{result['candles']:>7}{result['concurrency']:>6}"
+            f"{p50:>+10.1%}{p99:>+10.1%}{rps:>+10.1%}" + ("  REGRESSION" if regressed else "")
+        )
+    return ok
+
+
+def parse_ints(value: str):
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=parse_ints, default=SIZES)
+    parser.add_argument("--concurrency", type=parse_ints, default=CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=200, help="calls per case, size and concurrency")
+    parser.add_argument("--only", choices=("direct", "http"), help="run only one group of cases")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+    args.http_cases = tuple(HTTP_CASES)
+
+    print(f"{'case':<24}{'candles':>7}{'conc':>6}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>12}")
+
+    results = []
+    if args.only != "http":
+        for case in DIRECT_CASES:
+            for n in args.sizes:
+                results.append({"case": case, "candles": n, "concurrency": 1, **run_direct(case, n, args.requests)})
+                report(results[-1])
+    if args.only != "direct":
+        results.extend(asyncio.run(run_http_cases(args)))
+
+    from app import pool
+
+    output = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": pool.WORKERS,
+            "requests": args.requests,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
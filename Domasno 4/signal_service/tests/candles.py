@@ -0,0 +1,27 @@
+"""Synthetic candles for the tests and the benchmarks."""
+import numpy as np
+import pandas as pd
+
+
+def make_candles(n: int, seed: int = 0, start: float = 100.0) -> pd.DataFrame:
+    """Random-walk daily candles, oldest first."""
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = np.concatenate([[start], close[:-1]])[:n]
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({
+        "date": pd.date_range("2015-01-01", periods=n, freq="D"),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(1e3, 1e6, n),
+    })
+
+
+def make_candle_rows(df: pd.DataFrame) -> list:
+    """Candles as the (date, open, high, low, close, volume) rows the writer takes."""
+    return [
+        (d.date(), o, h, l, c, v)
+        for d, o, h, l, c, v in df[["date", "open", "high", "low", "close", "volume"]].itertuples(index=False)
+    ]
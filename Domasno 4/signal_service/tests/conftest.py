@@ -0,0 +1,29 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from tests.candles import make_candle_rows, make_candles
+
+# The candle store writer lives in the ingestion pipe; it is loaded by path
+# (its package is also called `app`)
+CANDLE_STORE_WRITER = Path(__file__).resolve().parents[3] / "Domasno 1" / "app" / "storage" / "candle_store.py"
+
+
+@pytest.fixture
+def candles():
+    return make_candles
+
+
+@pytest.fixture
+def candle_rows():
+    return make_candle_rows
+
+
+@pytest.fixture
+def writer():
+    """The pipe's candle_store module (CandleStore with append())."""
+    spec = importlib.util.spec_from_file_location("pipe_candle_store", CANDLE_STORE_WRITER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
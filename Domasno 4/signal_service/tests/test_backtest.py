@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from app.backtest import (
+    BUY_AND_HOLD,
+    OVERALL,
+    BacktestOptions,
+    backtest_candles,
+    backtest_symbol,
+    positions,
+    run_backtest,
+    summarize,
+)
+from app.compute import daily_columns
+from app.indicator_calculator import compute_indicators
+from app.indicators import DEFAULT_SIGNAL_ENGINE
+from app.indicators.base import CODE_BUY, CODE_HOLD, CODE_NA, CODE_SELL
+
+
+def hit_counts(labels, close, horizon):
+    signals = hits = 0
+    for t in range(len(close) - horizon):
+        if labels[t] == "BUY":
+            signals += 1
+            hits += close[t + horizon] > close[t]
+        elif labels[t] == "SELL":
+            signals += 1
+            hits += close[t + horizon] < close[t]
+    return signals, hits
+
+
+def simulate(labels, close, fee, short=False):
+    """Candle-by-candle: (total return, max drawdown) of one signal column."""
+    position = prev = 0.0
+    growth = []
+    for t in range(len(close)):
+        r = prev * (close[t] / close[t - 1] - 1) if t else 0.0
+        if labels[t] == "BUY":
+            position = 1.0
+        elif labels[t] == "SELL":
+            position = -1.0 if short else 0.0
+        growth.append(1 + r - fee * abs(position - prev))
+        prev = position
+
+    equity = np.cumprod(growth)
+    drawdown = min(0.0, (equity / np.maximum.accumulate(np.maximum(equity, 1.0)) - 1).min())
+    return equity[-1] - 1, drawdown
+
+
+def test_positions_forward_fill():
+    codes = np.array([[CODE_NA, CODE_HOLD, CODE_BUY, CODE_HOLD, CODE_NA, CODE_SELL, CODE_HOLD, CODE_BUY]])
+    np.testing.assert_array_equal(positions(codes), [[0, 0, 1, 1, 1, 0, 0, 1]])
+    np.testing.assert_array_equal(positions(codes, short=True), [[0, 0, 1, 1, 1, -1, -1, 1]])
+
+
+@pytest.mark.parametrize("short", [False, True])
+def test_matches_candle_by_candle(candles, short):
+    df = candles(600, seed=3)
+    options = BacktestOptions(fee=0.002, horizon=3, short=short)
+    result = backtest_candles(daily_columns(df), options=options)
+
+    history = DEFAULT_SIGNAL_ENGINE.build_history(
+        compute_indicators(df, columns=DEFAULT_SIGNAL_ENGINE.required_columns)
+    )
+    close = df["close"].to_numpy()
+    for label in ("RSI (14)", OVERALL):
+        labels = history[label].tolist()
+        total, drawdown = simulate(labels, close, options.fee, short)
+        signals, hits = hit_counts(labels, close, options.horizon)
+
+        metrics = result[label]
+        assert metrics["total_return"] == pytest.approx(total)
+        assert metrics["max_drawdown"] == pytest.approx(drawdown)
+        assert (metrics["signals"], metrics["hits"]) == (signals, hits)
+
+    assert result[BUY_AND_HOLD]["total_return"] == pytest.approx((1 - options.fee) * close[-1] / close[0] - 1)
+
+
+def test_short_timeframes_skipped(candles):
+    result = backtest_symbol(daily_columns(candles(600)))
+    assert "strategies" in result["daily"] and "strategies" in result["weekly"]
+    assert "strategies" not in result["monthly"]
+    assert result["monthly"]["candles"] < 48
+
+
+def test_parallel_matches_serial(writer, tmp_path, candles, candle_rows):
+    pipe = writer.CandleStore(tmp_path)
+    for i in range(6):
+        pipe.append(f"S{i}USDT", candle_rows(candles(500 + 50 * i, seed=i)))
+
+    serial = run_backtest(str(tmp_path), timeframes=("daily", "weekly"), workers=1)
+    parallel = run_backtest(str(tmp_path), timeframes=("daily", "weekly"), workers=2)
+    assert sorted(serial) == [f"S{i}USDT" for i in range(6)]
+    assert parallel == serial
+
+    summary = summarize(serial)
+    assert summary["daily"][OVERALL]["symbols"] == 6
+    assert summary["weekly"][BUY_AND_HOLD]["hit_rate"] is None
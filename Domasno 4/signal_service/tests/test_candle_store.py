@@ -0,0 +1,61 @@
+import asyncio
+
+import numpy as np
+
+from app import tasks
+from app.candle_source import StoreCandles
+from app.candle_store import CandleStore
+from app.compute import compute_timeframes, daily_columns
+from app.encoding import dumps
+
+
+def test_round_trip(writer, tmp_path, candles, candle_rows):
+    df = candles(300)
+    assert writer.CandleStore(tmp_path).append("BTCUSDT", candle_rows(df)) == 300
+
+    columns = CandleStore(str(tmp_path)).read("BTCUSDT")
+    expected = daily_columns(df)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(columns[name], values)
+    assert not columns["close"].flags.writeable
+
+
+def test_date_range_and_missing_symbol(writer, tmp_path, candles, candle_rows):
+    df = candles(100)
+    writer.CandleStore(tmp_path).append("BTCUSDT", candle_rows(df))
+    store = CandleStore(str(tmp_path))
+
+    columns = store.read("BTCUSDT", start="2015-01-10", end="2015-01-19")
+    assert len(columns["date"]) == 10
+    assert str(columns["date"][0])[:10] == "2015-01-10"
+    np.testing.assert_array_equal(columns["close"], df["close"].to_numpy()[9:19])
+
+    assert store.read("ETHUSDT") is None
+
+
+def test_appends_seen_by_open_reader(writer, tmp_path, candles, monkeypatch, candle_rows):
+    monkeypatch.setattr(writer, "MIN_CAPACITY", 64)
+    df = candles(200)
+    pipe = writer.CandleStore(tmp_path)
+    store = CandleStore(str(tmp_path))
+
+    pipe.append("BTCUSDT", candle_rows(df[:50]))
+    assert len(store.read("BTCUSDT")["date"]) == 50
+
+    # In place, then past the capacity (file swapped)
+    pipe.append("BTCUSDT", candle_rows(df[:60]))
+    assert len(store.read("BTCUSDT")["date"]) == 60
+    pipe.append("BTCUSDT", candle_rows(df))
+    np.testing.assert_array_equal(store.read("BTCUSDT")["close"], df["close"].to_numpy())
+
+
+def test_stored_symbol_snapshot(writer, tmp_path, candles, candle_rows):
+    df = candles(900)
+    writer.CandleStore(tmp_path).append("BTCUSDT", candle_rows(df))
+
+    daily = asyncio.run(StoreCandles(str(tmp_path)).daily("BTCUSDT"))
+    for timeframe in ("daily", "weekly"):
+        expected = dumps(compute_timeframes(daily_columns(df), (timeframe,))[timeframe])
+        assert tasks.stored_symbol_snapshot(str(tmp_path), "BTCUSDT", timeframe, len(daily["date"])) == expected
+
+    assert len(asyncio.run(StoreCandles(str(tmp_path)).daily("ETHUSDT"))["date"]) == 0
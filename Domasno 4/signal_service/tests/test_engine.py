@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.compute import compute_snapshot_df
+from app.indicators import DEFAULT_SIGNAL_ENGINE, MACDSignal, RSISignal, SignalEngine
+from app.indicators.base import SIGNAL_CODES, SIGNAL_LABELS, SignalStrategy
+from app.indicators.service import majority_vote, majority_vote_codes
+from app.indicator_calculator import compute_indicators
+
+
+def test_required_columns():
+    assert DEFAULT_SIGNAL_ENGINE.required_columns == (
+        "rsi", "macd", "macd_signal", "stoch_k", "stoch_d", "adx", "sma_20",
+        "cci", "ema_20", "wma_20", "bb_lower", "bb_upper", "vol_sma_20",
+    )
+
+
+def test_snapshot_matches_full_computation(candles):
+    df = candles(500, seed=11)
+    snap = compute_snapshot_df(df, "daily")
+    full = DEFAULT_SIGNAL_ENGINE.build_snapshot(compute_indicators(df))
+
+    assert snap["signals"] == full["signals"]
+    assert snap["overall"] == full["overall"]
+    assert snap["values"].keys() == full["values"].keys()
+    for key, value in full["values"].items():
+        assert abs(snap["values"][key] - value) <= 1e-9 * max(1.0, abs(value)), key
+
+
+def test_trimmed_engine(candles):
+    engine = SignalEngine(strategies=[RSISignal(), MACDSignal()])
+    snap = compute_snapshot_df(candles(300), "daily", engine)
+
+    assert set(snap["values"]) == {"rsi", "macd", "macd_signal"}
+    assert set(snap["signals"]) == {"RSI (14)", "MACD"}
+
+
+def test_history_matches_scalar_snapshots(candles):
+    df = compute_indicators(candles(400, seed=12))
+    history = DEFAULT_SIGNAL_ENGINE.build_history(df)
+
+    for i in (0, 19, 33, 150, 399):
+        snap = DEFAULT_SIGNAL_ENGINE.build_snapshot(df.iloc[:i + 1])
+        row = history.iloc[i]
+        assert row["overall"] == snap["overall"], i
+        assert {label: row[label] for label in snap["signals"]} == snap["signals"], i
+
+
+def test_majority_vote_codes():
+    votes = [
+        ["BUY", "BUY", "SELL"],
+        ["SELL", "HOLD", "SELL"],
+        ["BUY", "SELL", "HOLD"],
+        ["N/A", "N/A", "N/A"],
+        ["N/A", "BUY", "N/A"],
+    ]
+    codes = np.array([[SIGNAL_CODES[s] for s in column] for column in zip(*votes)])
+    overall = SIGNAL_LABELS[majority_vote_codes(codes)]
+    assert list(overall) == [majority_vote(v) for v in votes]
+
+
+def test_scalar_only_strategy_falls_back(candles):
+    class AboveOpen(SignalStrategy):
+        label = "Above open"
+
+        def compute(self, latest, values):
+            return "BUY" if latest.get("close") > latest.get("open") else "SELL"
+
+    df = compute_indicators(candles(50))
+    history = SignalEngine(strategies=[AboveOpen()]).build_history(df)
+    expected = np.where(df["close"] > df["open"], "BUY", "SELL")
+    assert list(history["Above open"]) == list(expected)
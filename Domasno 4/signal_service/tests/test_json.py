@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.exceptions import RequestValidationError
+
+from app import wire
+from app.encoding import dumps
+from app.main import parse_series
+
+
+def test_dumps_numpy_and_missing_values():
+    content = {
+        "nan": np.float64("nan"),
+        "inf": float("inf"),
+        "int": np.int64(3),
+        "array": np.array([1.5, np.nan]),
+        "na": pd.NA,
+        "nat": pd.NaT,
+        "ts": pd.Timestamp("2024-01-02"),
+        "decimal": Decimal("1.25"),
+    }
+    assert json.loads(dumps(content)) == {
+        "nan": None,
+        "inf": None,
+        "int": 3,
+        "array": [1.5, None],
+        "na": None,
+        "nat": None,
+        "ts": "2024-01-02T00:00:00",
+        "decimal": 1.25,
+    }
+
+
+def request_bodies(df):
+    dates = [d.isoformat() for d in df["date"]]
+    prices = {name: df[name].tolist() for name in ("open", "high", "low", "close", "volume")}
+    rows = {
+        "timeframe": "weekly",
+        "candles": [{"date": d, **{k: v[i] for k, v in prices.items()}} for i, d in enumerate(dates)],
+    }
+    columns = {"timeframe": "weekly", "date": dates, **prices}
+    return json.dumps(rows).encode(), json.dumps(columns).encode()
+
+
+def test_columns_parse_like_rows(candles):
+    rows, columns = request_bodies(candles(50, seed=41))
+
+    rows_options, rows_df = parse_series("application/json", rows)
+    columns_options, columns_df = parse_series("application/json", columns)
+
+    assert columns_options.timeframe == rows_options.timeframe == "weekly"
+    pd.testing.assert_frame_equal(columns_df, rows_df[columns_df.columns])
+
+
+def test_columns_must_have_equal_lengths(candles):
+    _, columns = request_bodies(candles(50, seed=42))
+    data = json.loads(columns)
+    data["low"] = data["low"][:-1]
+
+    with pytest.raises(RequestValidationError):
+        parse_series("application/json", json.dumps(data).encode())
+
+
+def test_wire_parses_like_columns(candles):
+    df = candles(50, seed=43)
+    df.loc[[0, 7], "open"] = np.nan
+    df.loc[3, "volume"] = np.nan
+
+    # Missing prices as the Django client sends them in JSON
+    def column(name, missing):
+        return [missing if np.isnan(v) else v for v in df[name].tolist()]
+
+    columns = {
+        "timeframe": "weekly",
+        "date": [d.isoformat() for d in df["date"]],
+        **{name: column(name, 0.0) for name in ("open", "high", "low", "close")},
+        "volume": column("volume", None),
+    }
+
+    json_options, json_df = parse_series("application/json", json.dumps(columns).encode())
+    wire_options, wire_df = parse_series(wire.CONTENT_TYPE, wire.encode_frame(df, timeframe="weekly"))
+
+    assert wire_options.timeframe == json_options.timeframe == "weekly"
+    assert (wire_df.loc[[0, 7], "open"] == 0.0).all()
+    # pandas may parse the ISO dates at a coarser resolution than ns
+    json_df = json_df.astype({"date": "datetime64[ns]"})
+    pd.testing.assert_frame_equal(wire_df, json_df[wire_df.columns])
+
+
+def test_invalid_json():
+    with pytest.raises(RequestValidationError):
+        parse_series("application/json", b"{not json")
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from app import kernels
+from app.indicator_calculator import compute_indicators
+from tests.ta_reference import compute_indicators_ta
+
+COLUMNS = list(kernels.COLUMNS)
+
+
+def assert_matches_ta(df):
+    ours = compute_indicators(df)
+    ref = compute_indicators_ta(df)
+    for col in COLUMNS:
+        np.testing.assert_allclose(
+            ours[col].to_numpy(dtype=float),
+            ref[col].to_numpy(dtype=float),
+            rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col,
+        )
+
+
+@pytest.mark.parametrize("n", [30, 60, 120, 500, 5000])
+def test_matches_ta(candles, n):
+    assert_matches_ta(candles(n, seed=n))
+
+
+def test_flat_prices(candles):
+    # Zero ranges: stochastic/CCI divide by zero, RSI has no losses
+    df = candles(120)
+    df[["open", "high", "low", "close"]] = 50.0
+    assert_matches_ta(df)
+
+
+def test_missing_rows_and_volume(candles):
+    df = candles(200, seed=3)
+    df.loc[[5, 40, 41], "close"] = np.nan
+    df.loc[[10, 11], "volume"] = np.nan
+    assert_matches_ta(df)
+
+    no_volume = compute_indicators(df.drop(columns=["volume"]))
+    assert no_volume["vol_sma_20"].isna().all()
+
+
+def test_stacked_series_match_single(candles):
+    # Shorter series left-padded with NaN give the same values per row
+    a, b = candles(300, seed=1), candles(250, seed=2)
+
+    def stack(col):
+        out = np.full((2, 300), np.nan)
+        out[0] = a[col]
+        out[1, 50:] = b[col]
+        return out
+
+    prices = ("high", "low", "close", "volume")
+    stacked = kernels.compute({c: stack(c) for c in prices})
+    single = kernels.compute({c: b[c].to_numpy() for c in prices})
+
+    for col in ("rsi", "macd_signal", "stoch_d", "adx", "cci", "wma_20", "bb_upper", "ema_20"):
+        np.testing.assert_allclose(stacked[col][1, 50:], single[col], rtol=1e-9, equal_nan=True, err_msg=col)
+
+
+@pytest.mark.parametrize("n", [0, 5, 25, 500])
+def test_latest_only_matches_full(candles, n):
+    df = candles(n, seed=7)
+    full = compute_indicators(df)
+    latest = compute_indicators(df, latest_only=True)
+
+    assert len(latest) == n
+    for col in COLUMNS:
+        np.testing.assert_allclose(
+            latest[col].to_numpy(dtype=float)[-1:],
+            full[col].to_numpy(dtype=float)[-1:],
+            rtol=1e-12, equal_nan=True, err_msg=col,
+        )
+        assert latest[col].iloc[:-1].isna().all(), col
+
+
+def test_resolve_dependencies():
+    names = [ind.name for ind in kernels.resolve(["bb_upper", "adx"])]
+    assert names == ["sma_20", "bollinger", "true_range", "adx"]
+
+    with pytest.raises(KeyError):
+        kernels.resolve(["nope"])
+
+
+def test_parametric_columns(candles):
+    df = candles(300, seed=5)
+    default = compute_indicators(df)
+    named = {
+        "rsi": "rsi_14", "cci": "cci_20", "adx": "adx_14", "stoch_k": "stoch_k_14_3",
+        "stoch_d": "stoch_d_14_3", "macd_signal": "macd_signal_12_26_9", "bb_upper": "bb_upper_20_2",
+    }
+    ours = compute_indicators(df, columns=list(named.values()) + ["sma_50"])
+    for col, name in named.items():
+        np.testing.assert_array_equal(ours[name].to_numpy(dtype=float), default[col].to_numpy(dtype=float), err_msg=name)
+    np.testing.assert_allclose(ours["sma_50"], df["close"].rolling(50).mean(), rtol=1e-12)
@@ -0,0 +1,40 @@
+from app import metrics
+from app.compute import compute_snapshot_df
+from app.indicators import DEFAULT_SIGNAL_ENGINE
+
+
+def test_histogram_text_format():
+    registry = metrics.Registry()
+    hist = registry.histogram("t_seconds", "Test.", buckets=(0.1, 1.0), labels=("stage",))
+    hist.observe(0.05, 'a"b')
+    hist.observe(0.5, 'a"b')
+    hist.observe(5.0, 'a"b')
+    registry.gauge("t_gauge", "Gauge.", lambda: 3)
+
+    assert registry.render().splitlines() == [
+        "# HELP t_seconds Test.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{stage="a\\"b",le="0.1"} 1',
+        't_seconds_bucket{stage="a\\"b",le="1.0"} 2',
+        't_seconds_bucket{stage="a\\"b",le="+Inf"} 3',
+        't_seconds_sum{stage="a\\"b"} 5.55',
+        't_seconds_count{stage="a\\"b"} 3',
+        "# HELP t_gauge Gauge.",
+        "# TYPE t_gauge gauge",
+        "t_gauge 3.0",
+    ]
+
+
+def test_stages_collected_only_when_asked(candles):
+    df = candles(300, seed=51)
+
+    with metrics.stage("outside"):
+        compute_snapshot_df(df, "daily")
+
+    with metrics.collect_stages() as stages:
+        compute_snapshot_df(df, "daily")
+
+    assert "outside" not in stages
+    assert "indicator:rsi" in stages and "indicators:prepare" in stages
+    assert {f"strategy:{s.label}" for s in DEFAULT_SIGNAL_ENGINE._strategies} <= stages.keys()
+    assert all(seconds >= 0 for seconds in stages.values())
@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.compute import compute_snapshot_df
+from app.indicator_calculator import compute_indicators
+from app.indicators import DEFAULT_SIGNAL_ENGINE
+from app.indicators.base import SIGNAL_LABELS
+from app.panel import compute_panel, frames_to_long, panel_from_long, panel_overall
+
+
+def make_frames(candles):
+    # Different lengths: late listings get NaN padding in front
+    return {f"S{i}": candles(n, seed=i) for i, n in enumerate([600, 320, 150, 90, 40])}
+
+
+def test_layout(candles):
+    frames = make_frames(candles)
+    panel = panel_from_long(frames_to_long(frames), max_candles=500)
+
+    assert panel.shape == (5, 500)
+    assert list(panel.lengths) == [500, 320, 150, 90, 40]
+
+    row = panel.symbols.index("S3")
+    np.testing.assert_array_equal(panel.prices["close"][row, -90:], frames["S3"]["close"])
+    assert np.isnan(panel.prices["close"][row, :-90]).all()
+
+
+def test_latest_matches_per_symbol(candles):
+    frames = make_frames(candles)
+    panel = panel_from_long(frames_to_long(frames), max_candles=500)
+
+    overall = panel_overall(panel, min_candles=60)
+    for symbol, df in frames.items():
+        expected = compute_snapshot_df(df.tail(500), "daily")["overall"] if len(df) >= 60 else "N/A"
+        assert overall[symbol] == expected, symbol
+
+
+def test_history_matches_per_symbol(candles):
+    frames = make_frames(candles)
+    panel = panel_from_long(frames_to_long(frames))
+    history = compute_panel(panel, history=True)
+
+    for i, symbol in enumerate(panel.symbols):
+        df = frames[symbol]
+        expected = DEFAULT_SIGNAL_ENGINE.build_history(compute_indicators(df))["overall"]
+        row = SIGNAL_LABELS[history["overall"][i]]
+        assert list(row[-len(df):]) == list(expected), symbol
+        assert (row[:-len(df)] == "N/A").all()
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app import pool, tasks
+
+
+@pytest.fixture
+def worker_pool(monkeypatch):
+    monkeypatch.setattr(pool, "WORKERS", 2)
+    pool.stats.reset()
+    yield pool
+    pool.shutdown_pool()
+
+
+def test_run_matches_in_process(worker_pool, candles):
+    df = candles(300, seed=31)
+    options = {"timeframe": "daily", "timeframes": None}
+
+    async def go():
+        await worker_pool.start_pool()
+        return await asyncio.gather(*(worker_pool.run(tasks.signals, df, options) for _ in range(4)))
+
+    results = asyncio.run(go())
+
+    assert results == [tasks.signals(df, options)] * 4
+    stats = worker_pool.stats.to_dict()
+    assert stats["tasks"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["compute_avg"] > 0
+
+
+def test_errors_propagate(worker_pool):
+    async def go():
+        return await worker_pool.run(tasks.history, None, {"timeframe": "daily"})
+
+    with pytest.raises(Exception):
+        asyncio.run(go())
+    assert worker_pool.stats.failed == 1
@@ -0,0 +1,102 @@
+import asyncio
+
+from app.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResponseCache(max_bytes=3 * (100 + 200), ttl=60)
+    for name in "abc":
+        cache.put(cache.key(name), b"x" * 100)
+
+    cache.get(cache.key("a"))          # a becomes most recent
+    cache.put(cache.key("d"), b"x" * 100)
+
+    assert cache.get(cache.key("b")) is None
+    assert cache.get(cache.key("a")) is not None
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_bytes
+
+
+def test_ttl():
+    clock = Clock()
+    cache = ResponseCache(max_bytes=10_000, ttl=5, clock=clock)
+    cache.put(b"k", b"v")
+
+    clock.now = 4.9
+    assert cache.get(b"k") == b"v"
+    clock.now = 5.0
+    assert cache.get(b"k") is None
+    assert cache.size == 0
+
+
+def test_key_separates_parts():
+    assert ResponseCache.key("ab", "c") != ResponseCache.key("a", "bc")
+
+
+def test_single_flight():
+    cache = ResponseCache(max_bytes=10_000, ttl=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"result"
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_compute(b"k", compute) for _ in range(5)))
+        again = await cache.get_or_compute(b"k", compute)
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert results == [b"result"] * 5 and again == b"result"
+    assert calls == 1
+    assert (cache.misses, cache.collapsed, cache.hits) == (1, 4, 1)
+
+
+def test_errors_are_shared_not_cached():
+    cache = ResponseCache(max_bytes=10_000, ttl=60)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad candles")
+
+    async def run():
+        return await asyncio.gather(
+            cache.get_or_compute(b"k", fail),
+            cache.get_or_compute(b"k", fail),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.get(b"k") is None
+
+
+def test_cancelled_request_does_not_cancel_waiters():
+    cache = ResponseCache(max_bytes=10_000, ttl=60)
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return b"result"
+
+    async def run():
+        first = asyncio.ensure_future(cache.get_or_compute(b"k", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_compute(b"k", compute))
+        await asyncio.sleep(0.005)
+        first.cancel()  # the client that started it disconnects
+        return first, await second
+
+    first, second = asyncio.run(run())
+    assert first.cancelled()
+    assert second == b"result"
+    assert cache.get(b"k") == b"result"
@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import kernels
+from app.streaming import StaleCandle, StateStore, StreamState
+
+
+def records(df):
+    out = df.to_dict("records")
+    for row in out:
+        row["date"] = row["date"].isoformat()
+    return out
+
+
+def assert_values(values, expected, i):
+    for col in kernels.COLUMNS:
+        np.testing.assert_allclose(values[col], expected[col][i], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{col}[{i}]")
+
+
+def test_matches_kernels_at_every_candle(candles):
+    df = candles(300, seed=5)
+    df.loc[[40, 41], "volume"] = np.nan
+    full = kernels.compute({c: df[c].to_numpy() for c in ("high", "low", "close", "volume")})
+
+    state = StreamState()
+    for i, row in enumerate(records(df)):
+        assert_values(state.update(row), full, i)
+
+
+def test_serialization_round_trip(candles):
+    rows = records(candles(200, seed=6))
+    straight = StreamState().update_many(rows)
+
+    state = StreamState()
+    state.update_many(rows[:120])
+    state = StreamState.from_dict(json.loads(json.dumps(state.to_dict())))
+    resumed = state.update_many(rows[120:])
+
+    assert resumed == pytest.approx(straight, nan_ok=True)
+
+
+def test_forming_candle_is_replaced(candles):
+    rows = records(candles(100, seed=8))
+    expected = StreamState().update_many(rows)
+
+    state = StreamState()
+    state.update_many(rows[:-1])
+    state.update({**rows[-1], "close": rows[-1]["close"] * 1.1})
+    assert state.update(rows[-1]) == pytest.approx(expected, nan_ok=True)
+    assert state.count == 100
+
+    with pytest.raises(StaleCandle):
+        state.update(rows[10])
+
+
+def test_store_persists(tmp_path, candles):
+    rows = records(candles(50))
+    state = StreamState()
+    state.update_many(rows)
+    StateStore(str(tmp_path)).put(("BTCUSDT", "daily"), state)
+
+    loaded = StateStore(str(tmp_path)).get(("BTCUSDT", "daily"))
+    assert loaded.count == 50
+    assert loaded.values == pytest.approx(state.values, nan_ok=True)
+    assert StateStore(str(tmp_path)).get(("ETHUSDT", "daily")) is None
+
+
+def test_store_sees_other_workers_updates(tmp_path, candles):
+    # Two stores on one directory stand for two uvicorn workers
+    rows = records(candles(60))
+    first, second = StateStore(str(tmp_path)), StateStore(str(tmp_path))
+    key = ("BTCUSDT", "daily")
+
+    state = StreamState()
+    state.update_many(rows[:50])
+    first.put(key, state)
+
+    for i, store in enumerate([second, first, second], start=50):
+        with store.lock(key):
+            state = store.get(key)
+            state.update(rows[i])
+            store.put(key, state)
+
+    expected = StreamState()
+    expected.update_many(rows[:53])
+    for store in (first, second):
+        assert store.get(key).count == 53
+        assert store.get(key).values == pytest.approx(expected.values, nan_ok=True)
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = StateStore(max_cached=2)
+    for symbol in ("A", "B", "C"):
+        store.put((symbol, "daily"), StreamState())
+    assert len(store) == 2
+    assert store.get(("A", "daily")) is None
+
+    persisted = StateStore(str(tmp_path), max_cached=2)
+    for symbol in ("A", "B", "C"):
+        persisted.put((symbol, "daily"), StreamState())
+    assert len(persisted) == 2
+    assert persisted.get(("A", "daily")) is not None  # reloaded from disk
@@ -0,0 +1,67 @@
+import pytest
+
+from app.backtest import BUY_AND_HOLD, BacktestOptions, backtest_candles
+from app.compute import compute_timeframes, daily_columns
+from app.indicators import DEFAULT_SIGNAL_ENGINE, DEFAULT_STRATEGIES, SignalEngine, build_engine
+from app.indicators.strategies import MASignal, RSISignal
+from app.sweep import best_config, expand, run_sweep, summarize, sweep_candles
+
+GRID = [
+    {"strategy": "RSISignal", "grid": {"window": [7, 14], "oversold": [25, 30]}},
+    {"strategy": "MASignal", "params": {"kind": "ema"}, "grid": {"window": [10, 50]}},
+    {"strategy": "BollingerSignal", "params": {"window": 20}, "grid": {"deviations": [1.5, 2.5]}},
+]
+
+
+def test_default_params_keep_snapshots(candles):
+    legacy = SignalEngine([RSISignal(), MASignal("SMA (20)", "sma_20")])
+    configured = build_engine([DEFAULT_STRATEGIES[0], DEFAULT_STRATEGIES[5]])
+    assert configured.required_columns == legacy.required_columns == ("rsi", "sma_20")
+
+    daily = daily_columns(candles(400))
+    expected = compute_timeframes(daily, ("daily",), engine=legacy)["daily"]
+    assert compute_timeframes(daily, ("daily",), engine=configured)["daily"] == expected
+
+    # Rebuilding from the config gives the same engine
+    assert build_engine(DEFAULT_SIGNAL_ENGINE.config).config_key == DEFAULT_SIGNAL_ENGINE.config_key
+    assert RSISignal(oversold=25).label == RSISignal().label
+    assert SignalEngine([RSISignal(oversold=25)]).config_key != SignalEngine([RSISignal()]).config_key
+
+
+def test_points_match_backtest(candles):
+    candles_ = daily_columns(candles(500, seed=4))
+    options = BacktestOptions(fee=0.002, horizon=2)
+    strategies = [strategy for _, strategy in expand(GRID)]
+    assert len(strategies) == 8
+
+    metrics = sweep_candles(candles_, strategies, options)
+    for i, strategy in enumerate(strategies):
+        expected = backtest_candles(candles_, SignalEngine([strategy]), options)[strategy.label]
+        for name, column in metrics.items():
+            assert column[i] == pytest.approx(expected[name]), (strategy.params, name)
+    assert metrics["total_return"][-1] == pytest.approx(
+        backtest_candles(candles_, options=options)[BUY_AND_HOLD]["total_return"]
+    )
+
+
+def test_parallel_matches_serial(writer, tmp_path, candles, candle_rows):
+    pipe = writer.CandleStore(tmp_path)
+    for i in range(5):
+        pipe.append(f"S{i}USDT", candle_rows(candles(400 + 50 * i, seed=i)))
+
+    serial = run_sweep(str(tmp_path), timeframes=("daily", "weekly"), grid=GRID, workers=1)
+    parallel = run_sweep(str(tmp_path), timeframes=("daily", "weekly"), grid=GRID, workers=2)
+    assert summarize(parallel, GRID) == summarize(serial, GRID)
+
+    summary = summarize(serial, GRID, rank="mean_return")
+    rows = summary["daily"]["results"]
+    assert summary["daily"]["symbols"] == 5 and summary["weekly"]["symbols"] == 4
+    assert len(rows) == 8
+    assert [row["mean_return"] for row in rows] == sorted((row["mean_return"] for row in rows), reverse=True)
+
+    best = best_config(summary, "daily", GRID)
+    assert [entry["strategy"] for entry in best] == ["RSISignal", "MASignal", "BollingerSignal"]
+    assert best[1]["params"]["kind"] == "ema"
+    top_rsi = next(row for row in rows if row["strategy"] == "RSISignal")
+    assert best[0]["params"] == top_rsi["params"]
+    assert len(build_engine(best).required_columns) == 4
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.compute import (
+    MAX_CANDLES, MIN_CANDLES, compute_snapshot_df, compute_timeframes, compute_timeframes_df,
+    daily_columns, timeframe_window,
+)
+from app.resample import resample
+
+RULES = {"weekly": "W", "monthly": "ME"}
+
+
+def pandas_resample(df, timeframe):
+    agg = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    out = df.set_index("date").resample(RULES[timeframe]).agg(agg)
+    return out.dropna(subset=["open", "high", "low", "close"]).reset_index()
+
+
+@pytest.mark.parametrize("timeframe", ["weekly", "monthly"])
+def test_resample_matches_pandas(candles, timeframe):
+    # Starts mid-week and mid-month
+    df = candles(1000, seed=21)
+    df["date"] = df["date"] + pd.Timedelta(days=10)
+
+    got = resample(daily_columns(df), timeframe)
+    expected = pandas_resample(df, timeframe)
+
+    np.testing.assert_array_equal(got["date"], expected["date"].to_numpy("datetime64[ns]"))
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(got[name], expected[name], rtol=1e-12, err_msg=name)
+
+
+def test_timeframes_match_separate_snapshots(candles):
+    df = candles(4000, seed=22)
+    snaps = compute_timeframes_df(df)
+
+    assert set(snaps) == {"daily", "weekly", "monthly"}
+    for timeframe, snap in snaps.items():
+        tf_df = df if timeframe == "daily" else pandas_resample(df, timeframe)
+        expected = compute_snapshot_df(tf_df.tail(MAX_CANDLES).reset_index(drop=True), timeframe)
+
+        assert snap["timeframe"] == timeframe
+        assert snap["candles_used"] == expected["candles_used"]
+        assert snap["signals"] == expected["signals"]
+        assert snap["overall"] == expected["overall"]
+        for key, value in expected["values"].items():
+            assert snap["values"][key] == pytest.approx(value, rel=1e-9, nan_ok=True), (timeframe, key)
+
+
+def test_short_timeframes_are_na(candles):
+    # ~26 months: enough daily and weekly candles, too few monthly ones
+    snaps = compute_timeframes_df(candles(800, seed=23))
+
+    assert snaps["daily"]["overall"] != "N/A"
+    assert snaps["monthly"]["overall"] == "N/A"
+    assert snaps["monthly"]["signals"] == {}
+    assert snaps["monthly"]["candles_used"] < MIN_CANDLES["monthly"]
+
+
+def test_unsorted_daily_input(candles):
+    df = candles(900, seed=24)
+    shuffled = df.sample(frac=1, random_state=0)
+
+    assert compute_timeframes_df(shuffled, ["weekly"]) == compute_timeframes_df(df, ["weekly"])
+
+
+@pytest.mark.parametrize("timeframe", ["daily", "weekly", "monthly"])
+def test_timeframe_window_gives_same_snapshot(candles, timeframe):
+    # Starts mid-week and mid-month, long enough for 500+ monthly candles
+    df = candles(16000, seed=24)
+    df["date"] = df["date"] + pd.Timedelta(days=10)
+    daily = daily_columns(df)
+
+    window = timeframe_window(daily, timeframe)
+
+    assert len(window["date"]) < len(daily["date"])
+    assert compute_timeframes(window, (timeframe,)) == compute_timeframes(daily, (timeframe,))
+
+
+def test_timeframe_window_keeps_short_series(candles):
+    daily = daily_columns(candles(300, seed=25))
+    assert timeframe_window(daily, "weekly") is daily